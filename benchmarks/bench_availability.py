@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: free-slot search for suggest_meeting_time. Compares the old
+scan (every 30-minute step tested against every busy block, re-parsing the
+ISO timestamps inside the loop) with the availability module (parse once,
+sort-and-sweep merge, intersect with preferred windows).
+Run from the repo root: python -m benchmarks.bench_availability
+"""
+
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from hushh_mcp.agents.schedule_agent.availability import MINUTE_MS, free_slots, parse_intervals
+
+DAYS = 7
+DURATION = 60  # minutes
+REPEAT = 3
+BUSY_BLOCKS = (100, 1000, 5000)
+
+WINDOW_START = datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+def legacy_suggest(busy_times, preferred_times):
+    # The loop from suggest_meeting_time before the availability module
+    available_times = []
+    current_time = WINDOW_START
+    end_time = current_time + timedelta(days=DAYS)
+    while current_time < end_time:
+        slot_end = current_time + timedelta(minutes=DURATION)
+        is_available = True
+        for busy in busy_times:
+            busy_start = datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
+            busy_end = datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
+            if (current_time < busy_end and slot_end > busy_start):
+                is_available = False
+                break
+        if preferred_times:
+            is_preferred = False
+            for pref in preferred_times:
+                pref_start = datetime.fromisoformat(pref['start'])
+                pref_end = datetime.fromisoformat(pref['end'])
+                if current_time >= pref_start and slot_end <= pref_end:
+                    is_preferred = True
+                    break
+            is_available = is_available and is_preferred
+        if is_available:
+            available_times.append({'start': current_time.isoformat(), 'end': slot_end.isoformat()})
+        current_time += timedelta(minutes=30)
+    return available_times
+
+def sweep_suggest(busy_times, preferred_times):
+    start_ms = int(WINDOW_START.timestamp() * 1000)
+    slots = free_slots(
+        parse_intervals(busy_times),
+        start_ms,
+        start_ms + DAYS * 24 * 60 * MINUTE_MS,
+        DURATION * MINUTE_MS,
+        preferred=parse_intervals(preferred_times)
+    )
+    return [{'start': s, 'end': e} for s, e in slots]
+
+def build_calendar(rng, blocks):
+    # Short busy blocks spread over a horizon long enough that the week stays partly free,
+    # as when several participants' calendars are combined
+    horizon_minutes = DAYS * 24 * 60 * max(1, blocks // 200)
+    busy = []
+    for _ in range(blocks):
+        start = WINDOW_START + timedelta(minutes=rng.randrange(0, horizon_minutes, 15))
+        end = start + timedelta(minutes=rng.choice([15, 30, 45, 60]))
+        busy.append({'start': start.isoformat().replace('+00:00', 'Z'), 'end': end.isoformat().replace('+00:00', 'Z')})
+    preferred = []
+    for day in range(DAYS):
+        day_start = WINDOW_START + timedelta(days=day)
+        preferred.append({'start': (day_start + timedelta(hours=9)).isoformat(),
+                          'end': (day_start + timedelta(hours=18)).isoformat()})
+    return busy, preferred
+
+def bench(label, fn, busy, preferred):
+    elapsed = min(timeit.repeat(lambda: fn(busy, preferred), number=1, repeat=REPEAT))
+    print(f"    {label:<24} {elapsed * 1e3:>9.2f} ms")
+    return elapsed
+
+def main():
+    rng = random.Random(5)
+    print(f"Window: {DAYS} days, {DURATION}-minute meetings on a 30-minute grid, best of {REPEAT}")
+    for blocks in BUSY_BLOCKS:
+        busy, preferred = build_calendar(rng, blocks)
+        assert len(legacy_suggest(busy, preferred)) == len(sweep_suggest(busy, preferred))
+        print(f"  {blocks:,} busy blocks ({len(sweep_suggest(busy, preferred))} free slots)")
+        legacy = bench("legacy nested scan", legacy_suggest, busy, preferred)
+        sweep = bench("parse once + sweep", sweep_suggest, busy, preferred)
+        print(f"    speedup {legacy / sweep:>21.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: consent token issue/validate throughput, v1 (text) vs v2 (binary).
+Run from the repo root: python -m benchmarks.bench_consent_tokens
+"""
+
+import hashlib
+import hmac
+import timeit
+
+from hushh_mcp.config import SECRET_KEY
+from hushh_mcp.consent import token as token_module
+from hushh_mcp.consent.token import issue_token
+from hushh_mcp.constants import ConsentScope
+
+N = 20000
+REPEAT = 5
+USER_ID = "user_benchmark_123"
+AGENT_ID = "inbox_agent"
+SCOPE = ConsentScope.GMAIL_READ
+
+def bench(label, fn, n=N):
+    # Best of REPEAT runs to keep scheduler noise out of the comparison
+    elapsed = min(timeit.repeat(fn, number=n, repeat=REPEAT))
+    print(f"  {label:<28} {n / elapsed:>12,.0f} ops/s   ({elapsed / n * 1e6:.2f} µs/op)")
+
+def main():
+    print(f"Consent tokens: best of {REPEAT} x {N:,} iterations")
+
+    raw = f"{USER_ID}|{AGENT_ID}|{SCOPE.value}|1700000000000|1700604800000".encode()
+    print("\nHMAC signer")
+    bench("hmac.new per call", lambda: hmac.new(SECRET_KEY.encode(), raw, hashlib.sha256).digest())
+    bench("pre-keyed copy", lambda: token_module._mac(raw))
+    for version in (1, 2):
+        sample = issue_token(USER_ID, AGENT_ID, SCOPE, version=version).token
+        print(f"\nv{version}  ({len(sample)} chars)")
+        bench("issue_token", lambda: issue_token(USER_ID, AGENT_ID, SCOPE, version=version))
+        # Bypass the verified-token cache so every call pays decode + HMAC
+        bench("verify (uncached)", lambda: token_module._parse_and_verify(sample))
+        bench("validate_token (cached)", lambda: token_module.validate_token(sample, SCOPE))
+
+if __name__ == "__main__":
+    main()
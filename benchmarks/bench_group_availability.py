@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: group scheduling with per-participant working hours and
+timezones. Compares a direct scan (every 30-minute candidate checked against
+every participant's busy blocks and working hours) with the bitmap engine on
+Python integer bitsets and, when installed, on NumPy boolean arrays.
+Run from the repo root: python -m benchmarks.bench_group_availability
+"""
+
+import random
+import timeit
+
+from hushh_mcp.agents.schedule_agent import bitmap
+from hushh_mcp.agents.schedule_agent.availability import MINUTE_MS, merge_intervals, overlaps_any, parse_instant
+from hushh_mcp.agents.schedule_agent.bitmap import SlotGrid, find_group_slots, resolve_timezone
+
+DAYS = 30
+DURATION = 60  # minutes
+REPEAT = 3
+TEAMS = (10, 50, 200)
+ZONES = ["UTC", "Europe/Berlin", "America/New_York", "Asia/Kolkata"]
+
+START = parse_instant("2024-01-15T00:00:00Z")
+
+def build_team(rng, size):
+    team = []
+    for _ in range(size):
+        busy = []
+        for _ in range(rng.randint(20, 60)):
+            start = START + rng.randrange(0, DAYS * 24 * 4) * 15 * MINUTE_MS
+            busy.append((start, start + rng.choice([15, 30, 60, 90]) * MINUTE_MS))
+        team.append({"busy": busy, "timezone": rng.choice(ZONES), "working_hours": (6, 22)})
+    return team
+
+def direct_scan(team):
+    # Interval checks per candidate; busy blocks merged and working hours built once per timezone
+    grid = SlotGrid(START, DAYS)
+    working = {}
+    for p in team:
+        if p["timezone"] not in working:
+            working[p["timezone"]] = grid.working_intervals(resolve_timezone(p["timezone"]), p["working_hours"])
+    prepared = [(merge_intervals(p["busy"]), working[p["timezone"]]) for p in team]
+    starts = []
+    for candidate in range(START, START + DAYS * 24 * 60 * MINUTE_MS, 30 * MINUTE_MS):
+        end = candidate + DURATION * MINUTE_MS
+        if all(
+            not overlaps_any(busy, candidate, end) and any(s <= candidate and end <= e for s, e in working)
+            for busy, working in prepared
+        ):
+            starts.append(candidate)
+    return starts
+
+def bench(label, fn, team):
+    elapsed = min(timeit.repeat(lambda: fn(team), number=1, repeat=REPEAT))
+    print(f"    {label:<28} {elapsed * 1e3:>9.2f} ms")
+
+def main():
+    rng = random.Random(8)
+    print(f"Horizon: {DAYS} days, 15-minute slots, {DURATION}-minute meetings, best of {REPEAT}")
+    for size in TEAMS:
+        team = build_team(rng, size)
+        found = len(find_group_slots(team, START, DAYS, DURATION, max_results=10 ** 6, use_numpy=False))
+        print(f"  {size} participants ({found} candidate slots)")
+        bench("direct interval scan", direct_scan, team)
+        bench("bitmap, integer bitsets", lambda t: find_group_slots(t, START, DAYS, DURATION, use_numpy=False), team)
+        if bitmap.np is not None:
+            bench("bitmap, NumPy", lambda t: find_group_slots(t, START, DAYS, DURATION, use_numpy=True), team)
+    if bitmap.np is None:
+        print("  (NumPy not installed; only the integer bitset engine was measured)")
+
+if __name__ == "__main__":
+    main()
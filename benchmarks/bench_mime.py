@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: email body extraction over a synthetic corpus of Gmail API
+payloads (nested multipart, html-only, non-UTF-8 charsets, large newsletters).
+Compares the old two-level text/plain-only extractor with the MIME walker,
+uncapped and with a preview-sized byte cap.
+Run from the repo root: python -m benchmarks.bench_mime
+"""
+
+import base64
+import random
+import timeit
+
+from hushh_mcp.agents.inbox_agent.mime import extract_body
+
+MESSAGES = 2000
+REPEAT = 5
+PREVIEW_BYTES = 4096
+
+def legacy_extract(payload):
+    body = ""
+    if 'parts' in payload:
+        for part in payload['parts']:
+            if part['mimeType'] == 'text/plain':
+                if 'data' in part['body']:
+                    body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8', errors='replace')
+                    break
+            elif part['mimeType'] == 'multipart/alternative' and 'parts' in part:
+                for subpart in part['parts']:
+                    if subpart['mimeType'] == 'text/plain' and 'data' in subpart['body']:
+                        body = base64.urlsafe_b64decode(subpart['body']['data']).decode('utf-8', errors='replace')
+                        break
+    elif payload['mimeType'] == 'text/plain' and 'data' in payload['body']:
+        body = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8', errors='replace')
+    return body
+
+def _part(mime_type, text, charset="utf-8"):
+    data = text.encode(charset)
+    return {
+        "mimeType": mime_type,
+        "headers": [{"name": "Content-Type", "value": f"{mime_type}; charset={charset}"}],
+        "body": {"data": base64.urlsafe_b64encode(data).decode(), "size": len(data)}
+    }
+
+def _multipart(subtype, *parts):
+    return {"mimeType": f"multipart/{subtype}", "headers": [], "body": {"size": 0}, "parts": list(parts)}
+
+def _nest(payload, depth):
+    for subtype in ["related", "mixed", "alternative"][:depth]:
+        payload = _multipart(subtype, payload)
+    return payload
+
+def build_corpus(rng):
+    paragraph = "Quarterly numbers attached. Let's review before Friday's meeting. "
+    newsletter_row = "<tr><td><a href='https://example.com'>Deal</a></td><td>&euro;9.99</td></tr>"
+    corpus = []
+    for i in range(MESSAGES):
+        kind = i % 5
+        if kind == 0:    # plain single part
+            payload = _part("text/plain", paragraph * rng.randint(2, 20))
+        elif kind == 1:  # alternative, nested 1-4 deep
+            payload = _nest(_multipart("alternative",
+                                       _part("text/plain", paragraph * 10),
+                                       _part("text/html", f"<p>{paragraph * 10}</p>")), rng.randint(1, 4))
+        elif kind == 2:  # html only
+            payload = _multipart("mixed", _part("text/html", f"<div>{paragraph * 15}</div>"))
+        elif kind == 3:  # latin-1 plain inside related/mixed
+            payload = _nest(_part("text/plain", "Café crème, s'il vous plaît. " * 20, "iso-8859-1"), 2)
+        else:            # ~1 MB html newsletter
+            payload = _multipart("alternative", _part("text/html", "<table>" + newsletter_row * 12000 + "</table>"))
+        corpus.append(payload)
+    return corpus
+
+def bench(label, fn, corpus):
+    found = sum(1 for payload in corpus if fn(payload))
+    elapsed = min(timeit.repeat(lambda: [fn(p) for p in corpus], number=1, repeat=REPEAT))
+    print(f"  {label:<28} {elapsed / len(corpus) * 1e6:>9.1f} µs/msg   bodies found: {found}/{len(corpus)}")
+
+def main():
+    corpus = build_corpus(random.Random(7))
+    print(f"Corpus: {len(corpus):,} payloads, best of {REPEAT}")
+    bench("legacy (2 levels, plain)", legacy_extract, corpus)
+    bench("walker (uncapped)", extract_body, corpus)
+    bench(f"walker (cap {PREVIEW_BYTES} B)", lambda p: extract_body(p, max_bytes=PREVIEW_BYTES), corpus)
+
+if __name__ == "__main__":
+    main()
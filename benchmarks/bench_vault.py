@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-record vault overhead with a non-hex key (like AGENT_MASTER_KEY).
+Compares the old per-call key derivation + Cipher construction against the key
+registry and the bulk encrypt_many/decrypt_many calls.
+Run from the repo root: python -m benchmarks.bench_vault
+"""
+
+import base64
+import hashlib
+import json
+import os
+import timeit
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from hushh_mcp.types import EncryptedPayload
+from hushh_mcp.vault.encrypt import encrypt_data, decrypt_data, encrypt_many, decrypt_many
+
+N = 5000
+REPEAT = 5
+KEY = "default-key-change-in-production"
+
+# Roughly the size of a stored Gmail credential blob
+RECORD = json.dumps({
+    "token": "ya29." + "x" * 180,
+    "refresh_token": "1//" + "y" * 100,
+    "token_uri": "https://oauth2.googleapis.com/token",
+    "client_id": "1234567890-abc.apps.googleusercontent.com",
+    "client_secret": "GOCSPX-" + "z" * 28,
+    "scopes": ["https://www.googleapis.com/auth/gmail.readonly"]
+})
+
+def legacy_encrypt(plaintext: str, key_hex: str) -> EncryptedPayload:
+    try:
+        key = bytes.fromhex(key_hex)
+    except ValueError:
+        key = hashlib.sha256(key_hex.encode('utf-8')).digest()
+    iv = os.urandom(12)
+    encryptor = Cipher(algorithms.AES(key), modes.GCM(iv), backend=default_backend()).encryptor()
+    ciphertext = encryptor.update(plaintext.encode('utf-8')) + encryptor.finalize()
+    return EncryptedPayload(
+        ciphertext=base64.b64encode(ciphertext).decode('utf-8'),
+        iv=base64.b64encode(iv).decode('utf-8'),
+        tag=base64.b64encode(encryptor.tag).decode('utf-8'),
+        encoding="base64",
+        algorithm="aes-256-gcm"
+    )
+
+def legacy_decrypt(payload: EncryptedPayload, key_hex: str) -> str:
+    try:
+        key = bytes.fromhex(key_hex)
+    except ValueError:
+        key = hashlib.sha256(key_hex.encode('utf-8')).digest()
+    iv = base64.b64decode(payload.iv)
+    decryptor = Cipher(algorithms.AES(key), modes.GCM(iv, base64.b64decode(payload.tag)),
+                       backend=default_backend()).decryptor()
+    return (decryptor.update(base64.b64decode(payload.ciphertext)) + decryptor.finalize()).decode('utf-8')
+
+def bench(label, fn, records=N):
+    elapsed = min(timeit.repeat(fn, number=1, repeat=REPEAT))
+    print(f"  {label:<32} {elapsed / records * 1e6:>8.2f} µs/record")
+
+def main():
+    records = [RECORD] * N
+    payload = encrypt_data(RECORD, KEY)
+    payloads = [payload] * N
+    print(f"Vault records: {N:,} x {len(RECORD)} bytes, best of {REPEAT}")
+
+    print("\nencrypt")
+    bench("legacy (derive + Cipher per call)", lambda: [legacy_encrypt(r, KEY) for r in records])
+    bench("encrypt_data (key registry)", lambda: [encrypt_data(r, KEY) for r in records])
+    bench("encrypt_many", lambda: encrypt_many(records, KEY))
+
+    print("\ndecrypt")
+    bench("legacy (derive + Cipher per call)", lambda: [legacy_decrypt(p, KEY) for p in payloads])
+    bench("decrypt_data (key registry)", lambda: [decrypt_data(p, KEY) for p in payloads])
+    bench("decrypt_many", lambda: decrypt_many(payloads, KEY))
+
+if __name__ == "__main__":
+    main()
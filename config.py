@@ -36,5 +36,48 @@ BACKEND_URL = os.getenv('BACKEND_URL', 'https://5ef39224041b.ngrok-free.app')
 # Agent Master Key for encryption
 AGENT_MASTER_KEY = os.getenv('AGENT_MASTER_KEY', 'default-key-change-in-production')
 
+# Gmail credential store (SQLite)
+GMAIL_TOKEN_DB_PATH = os.getenv('GMAIL_TOKEN_DB_PATH', 'user_tokens_inbox.sqlite3')
+
+# Gmail service pool
+GMAIL_SERVICE_POOL_SIZE = int(os.getenv('GMAIL_SERVICE_POOL_SIZE', '256'))
+GMAIL_SERVICE_IDLE_TTL_S = int(os.getenv('GMAIL_SERVICE_IDLE_TTL_S', '900'))
+GMAIL_TOKEN_REFRESH_MARGIN_S = int(os.getenv('GMAIL_TOKEN_REFRESH_MARGIN_S', '300'))
+
+# Local encrypted cache of parsed Gmail messages
+MESSAGE_CACHE_PATH = os.getenv('MESSAGE_CACHE_PATH', 'inbox_message_cache.sqlite3')
+MESSAGE_CACHE_MAX_BYTES = int(os.getenv('MESSAGE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Incremental inbox sync (Gmail history API)
+INBOX_SYNC = os.getenv('INBOX_SYNC', 'enabled').lower() == 'enabled'
+INBOX_SYNC_PATH = os.getenv('INBOX_SYNC_PATH', 'inbox_sync.sqlite3')
+
+# Cap on decoded bytes per email body (0 = no cap)
+EMAIL_BODY_MAX_BYTES = int(os.getenv('EMAIL_BODY_MAX_BYTES', str(256 * 1024))) or None
+
+# Most emails accepted by one /analyze or content generation request
+ANALYZE_MAX_EMAILS = int(os.getenv('ANALYZE_MAX_EMAILS', '500'))
+
+# Category rule table for /categorize (defaults to the one shipped with the inbox agent)
+EMAIL_CATEGORIES_PATH = os.getenv('EMAIL_CATEGORIES_PATH') or None
+
+# Local keyword search index over cached emails
+SEARCH_INDEX = os.getenv('SEARCH_INDEX', 'enabled').lower() == 'enabled'
+SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', 'inbox_search.sqlite3')
+
+# Calendar free/busy results are reused for this long (0 = always query)
+FREEBUSY_CACHE_TTL_S = int(os.getenv('FREEBUSY_CACHE_TTL_S', '60'))
+
+# Meeting suggestions: 'sweep' (merged busy intervals) or 'bitmap' (per-participant
+# working hours/timezones, ranked by preferences; uses NumPy when installed)
+SCHEDULE_ENGINE = os.getenv('SCHEDULE_ENGINE', 'sweep')
+SCHEDULE_MAX_DAYS = int(os.getenv('SCHEDULE_MAX_DAYS', '60'))
+
+# Local calendar event store kept current with Calendar syncToken
+CALENDAR_SYNC = os.getenv('CALENDAR_SYNC', 'enabled').lower() == 'enabled'
+CALENDAR_SYNC_PATH = os.getenv('CALENDAR_SYNC_PATH', 'calendar_events.sqlite3')
+CALENDAR_SYNC_INTERVAL_S = int(os.getenv('CALENDAR_SYNC_INTERVAL_S', '30'))
+CALENDAR_SYNC_LOOKBACK_DAYS = int(os.getenv('CALENDAR_SYNC_LOOKBACK_DAYS', '90'))
+
 # Debug flag
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true' 
\ No newline at end of file
@@ -4,86 +4,37 @@ Part of the Hushh Modular Consent Protocol (MCP)
 """
 
 import logging
-import openai
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+
+from hushh_mcp.llm.client import get_llm_client
+from hushh_mcp.agents.inbox_agent.categorizer import load_categorizer
 
 logger = logging.getLogger(__name__)
 
 class EmailAIFeatures:
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize EmailAIFeatures with optional API key."""
+    def __init__(self, api_key: Optional[str] = None, categories_path: Optional[str] = None):
+        """Initialize EmailAIFeatures with optional API key and category rules file."""
         self.api_key = api_key
         self.logger = logging.getLogger(__name__)
         
-        # Configure OpenAI if API key is provided
-        if api_key:
-            openai.api_key = api_key
+        # All completions go through the shared async client (concurrency limits, timeouts, retries)
+        self.llm = get_llm_client(api_key)
+        
+        # Keyword rules are compiled once and reused for every batch
+        self.categorizer = load_categorizer(categories_path)
 
-    def generate_smart_reply(self, email: Dict, style: str = 'professional') -> str:
+    async def generate_smart_reply(self, email: Dict, style: str = 'professional', user_id: Optional[str] = None) -> str:
         """Generate a smart reply for an email using ChatGPT."""
         try:
-            # Extract email details
-            subject = email.get('subject', 'No Subject')
-            sender = email.get('from', 'Unknown')
-            body = email.get('body', '')
-            
-            # Create a comprehensive prompt for ChatGPT
-            style_instructions = {
-                'professional': 'Write a professional, courteous, and business-appropriate response.',
-                'casual': 'Write a friendly, casual, and conversational response.',
-                'formal': 'Write a formal, respectful, and official response.',
-                'brief': 'Write a brief, concise, and to-the-point response.',
-                'detailed': 'Write a detailed, comprehensive, and thorough response.'
-            }
-            
-            style_instruction = style_instructions.get(style, style_instructions['professional'])
-            
-            prompt = f"""
-                You are an AI assistant helping to compose email replies. Please read the following email carefully and generate a thoughtful, appropriate response.
-
-                Original Email:
-                Subject: {subject}
-                From: {sender}
-                Content: {body}
-
-                Instructions:
-                - {style_instruction}
-                - Address the main points and questions in the original email
-                - Be helpful and constructive
-                - Match the tone appropriately
-                - Do not include email headers (To:, From:, Subject:) in your response
-                - Generate only the body content of the reply
-                - Make the response complete and comprehensive - do not truncate or summarize
-
-                Please generate the complete reply:
-                """
-
             # Use OpenAI to generate the reply with maximum token allowance
-            if self.api_key:
-                response = openai.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": "You are a helpful email assistant. Generate complete, thoughtful email replies based on the content provided. Always provide the full response without truncation."
-                        },
-                        {
-                            "role": "user", 
-                            "content": prompt
-                        }
-                    ],
-                    max_tokens=2000,  # Increased token limit for complete responses
-                    temperature=0.7,  # Balanced creativity
-                    top_p=1.0,
-                    frequency_penalty=0.0,
-                    presence_penalty=0.0
-                )
+            if self.llm.available:
+                response = await self.llm.complete(user_id=user_id, **self._smart_reply_request(email, style))
                 
                 # Extract the complete response
-                reply_content = response.choices[0].message.content.strip()
+                reply_content = response.strip()
                 
                 # Log the generated reply for debugging
-                self.logger.info(f"Generated smart reply for email '{subject[:50]}...' - Length: {len(reply_content)} characters")
+                self.logger.info(f"Generated smart reply for email '{email.get('subject', 'No Subject')[:50]}...' - Length: {len(reply_content)} characters")
                 
                 return reply_content
             else:
@@ -96,6 +47,86 @@ class EmailAIFeatures:
             # Return a more informative fallback
             return self._generate_fallback_reply(email, style)
 
+    async def stream_smart_reply(self, email: Dict, style: str = 'professional', user_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream a smart reply as the model writes it. Falls back to the canned reply if nothing was produced."""
+        if not self.llm.available:
+            self.logger.warning("No OpenAI API key provided, using fallback reply")
+            yield self._generate_fallback_reply(email, style)
+            return
+        
+        started = False
+        try:
+            async for delta in self.llm.stream(user_id=user_id, **self._smart_reply_request(email, style)):
+                if not started:
+                    # Match generate_smart_reply, which strips the reply
+                    delta = delta.lstrip()
+                    if not delta:
+                        continue
+                started = True
+                yield delta
+        except Exception as e:
+            if started:
+                raise
+            self.logger.error(f"Error streaming smart reply: {str(e)}")
+            yield self._generate_fallback_reply(email, style)
+
+    def _smart_reply_request(self, email: Dict, style: str) -> Dict:
+        """Model, messages and sampling parameters for a smart reply."""
+        # Extract email details
+        subject = email.get('subject', 'No Subject')
+        sender = email.get('from', 'Unknown')
+        body = email.get('body', '')
+        
+        # Create a comprehensive prompt for ChatGPT
+        style_instructions = {
+            'professional': 'Write a professional, courteous, and business-appropriate response.',
+            'casual': 'Write a friendly, casual, and conversational response.',
+            'formal': 'Write a formal, respectful, and official response.',
+            'brief': 'Write a brief, concise, and to-the-point response.',
+            'detailed': 'Write a detailed, comprehensive, and thorough response.'
+        }
+        
+        style_instruction = style_instructions.get(style, style_instructions['professional'])
+        
+        prompt = f"""
+            You are an AI assistant helping to compose email replies. Please read the following email carefully and generate a thoughtful, appropriate response.
+
+            Original Email:
+            Subject: {subject}
+            From: {sender}
+            Content: {body}
+
+            Instructions:
+            - {style_instruction}
+            - Address the main points and questions in the original email
+            - Be helpful and constructive
+            - Match the tone appropriately
+            - Do not include email headers (To:, From:, Subject:) in your response
+            - Generate only the body content of the reply
+            - Make the response complete and comprehensive - do not truncate or summarize
+
+            Please generate the complete reply:
+            """
+        
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": "You are a helpful email assistant. Generate complete, thoughtful email replies based on the content provided. Always provide the full response without truncation."
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ],
+            "max_tokens": 2000,  # Increased token limit for complete responses
+            "temperature": 0.7,  # Balanced creativity
+            "top_p": 1.0,
+            "frequency_penalty": 0.0,
+            "presence_penalty": 0.0
+        }
+
     def _generate_fallback_reply(self, email: Dict, style: str) -> str:
         """Generate a fallback reply when OpenAI is not available."""
         subject = email.get('subject', 'No Subject')
@@ -111,28 +142,9 @@ class EmailAIFeatures:
             return f"Thank you for your message regarding '{subject}'. I will review your email and provide a detailed response shortly.\n\nBest regards"
 
     def categorize_emails(self, emails: List[Dict]) -> List[Dict]:
-        """Categorize emails into categories."""
+        """Categorize emails using the rule table (subject, sender and body)."""
         try:
-            categories = []
-            for email in emails:
-                # Simple categorization based on keywords
-                subject = email.get('subject', '').lower()
-                if any(word in subject for word in ['meeting', 'calendar', 'schedule']):
-                    category = 'Meeting'
-                elif any(word in subject for word in ['urgent', 'important', 'asap']):
-                    category = 'Urgent'
-                elif any(word in subject for word in ['invoice', 'payment', 'bill']):
-                    category = 'Finance'
-                else:
-                    category = 'General'
-                
-                categories.append({
-                    'id': email.get('id'),
-                    'category': category,
-                    'confidence': 0.8
-                })
-            
-            return categories
+            return self.categorizer.classify_many(emails)
             
         except Exception as e:
             self.logger.error(f"Error categorizing emails: {str(e)}")
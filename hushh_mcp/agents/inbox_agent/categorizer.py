@@ -0,0 +1,131 @@
+# hushh_mcp/agents/inbox_agent/categorizer.py
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "categories.json")
+
+# Joins one field of every email into a single scan; never part of a keyword
+_SEPARATOR = "\x00"
+
+# ==================== Pattern Compilation ====================
+
+def compile_keywords(keywords: Sequence[str]) -> "re.Pattern":
+    """
+    One regex for all keywords, built from a character trie so that shared
+    prefixes are tested once (`invite`/`invitation` -> `invit(?:ation|e)`).
+    Keywords match case-insensitively (callers lowercase the text) at the
+    start of a word; the longest keyword wins.
+    """
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        ends_here = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if ends_here else group
+
+    return re.compile(r"\b" + build(trie))
+
+# ==================== Rule-table Categorizer ====================
+
+class EmailCategorizer:
+    """
+    Scores emails against a table of categories, each a list of keywords.
+
+    A keyword found in a field adds `field weight * category weight` to its
+    category (once per email and field, so long bodies don't drown the
+    subject). The highest score wins; ties go to the category listed first,
+    and emails with no match get the default category.
+    """
+
+    def __init__(
+        self,
+        categories: List[Dict],
+        fields: Optional[Dict[str, float]] = None,
+        default: str = "General",
+        body_chars: Optional[int] = 2000
+    ):
+        self.names = [c["name"] for c in categories]
+        self.fields = fields or {"subject": 3.0, "from": 2.0, "body": 1.0}
+        self.default = default
+        self.body_chars = body_chars
+
+        # keyword -> [(category index, weight)]; a keyword may feed several categories
+        self._keywords: Dict[str, List[Tuple[int, float]]] = {}
+        for index, category in enumerate(categories):
+            weight = float(category.get("weight", 1.0))
+            for keyword in category["keywords"]:
+                self._keywords.setdefault(keyword.lower(), []).append((index, weight))
+        self._pattern = compile_keywords(self._keywords)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_RULES_PATH) -> "EmailCategorizer":
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+        return cls(
+            rules["categories"],
+            fields=rules.get("fields"),
+            default=rules.get("default", "General"),
+            body_chars=rules.get("body_chars", 2000)
+        )
+
+    def classify(self, email: Dict) -> Dict:
+        return self.classify_many([email])[0]
+
+    def classify_many(self, emails: Sequence[Dict]) -> List[Dict]:
+        """
+        Categorize a batch. Each field of the whole batch is lowercased and
+        scanned as one string, so the per-email cost is a slice and a join
+        rather than a regex call per keyword list.
+        """
+        scores = [[0.0] * len(self.names) for _ in emails]
+        for field, field_weight in self.fields.items():
+            texts = [self._field_text(email, field) for email in emails]
+            corpus = _SEPARATOR.join(texts)
+
+            # Matches arrive in position order, so the owning email only moves forward
+            email_index, email_end = 0, len(texts[0]) if texts else 0
+            seen = set()
+            for match in self._pattern.finditer(corpus):
+                while match.start() > email_end:
+                    email_index += 1
+                    email_end += 1 + len(texts[email_index])
+                keyword = match.group()
+                if (email_index, keyword) in seen:
+                    continue
+                seen.add((email_index, keyword))
+                for category, weight in self._keywords[keyword]:
+                    scores[email_index][category] += field_weight * weight
+
+        results = []
+        for email, email_scores in zip(emails, scores):
+            total = sum(email_scores)
+            if total <= 0:
+                category, confidence = self.default, 0.5
+            else:
+                best = max(range(len(email_scores)), key=lambda i: (email_scores[i], -i))
+                category, confidence = self.names[best], round(email_scores[best] / total, 2)
+            results.append({'id': email.get('id'), 'category': category, 'confidence': confidence})
+        return results
+
+    def _field_text(self, email: Dict, field: str) -> str:
+        text = email.get(field) or ''
+        if field == 'body' and self.body_chars is not None:
+            text = text[:self.body_chars]
+        # lower() can change length for a few characters, so offsets are taken after it
+        return text.lower().replace(_SEPARATOR, ' ')
+
+def load_categorizer(path: Optional[str] = None) -> EmailCategorizer:
+    return EmailCategorizer.from_file(path or DEFAULT_RULES_PATH)
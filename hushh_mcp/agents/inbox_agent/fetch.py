@@ -0,0 +1,158 @@
+# hushh_mcp/agents/inbox_agent/fetch.py
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Gmail accepts up to 100 calls per batch but starts rate-limiting well before that;
+# 50 is the size Google recommends for messages.get.
+GMAIL_BATCH_SIZE = 50
+
+# ==================== Batched Message Fetch ====================
+
+def fetch_messages(
+    service: Any,
+    message_ids: Sequence[str],
+    format: str = 'full',
+    metadata_headers: Optional[List[str]] = None,
+    batch_size: int = GMAIL_BATCH_SIZE
+) -> List[Optional[Dict]]:
+    """
+    Fetch many Gmail messages using HTTP batch requests (one round-trip per
+    `batch_size` ids). Results come back in the order of `message_ids`.
+
+    Messages that fail inside a batch are retried one by one; a message that
+    still fails is returned as None so callers can apply their own fallback.
+    """
+    ids = list(message_ids)
+    if not ids:
+        return []
+
+    fetched: Dict[str, Dict] = {}
+    failed: List[str] = []
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            failed.append(request_id)
+        else:
+            fetched[request_id] = response
+
+    unique_ids = list(dict.fromkeys(ids))
+    for start in range(0, len(unique_ids), batch_size):
+        chunk = unique_ids[start:start + batch_size]
+        batch = service.new_batch_http_request(callback=on_response)
+        for message_id in chunk:
+            batch.add(_get_request(service, message_id, format, metadata_headers), request_id=message_id)
+        try:
+            batch.execute()
+        except Exception as e:
+            print(f"⚠️ Batch fetch failed, falling back to single requests: {str(e)}")
+            failed.extend(mid for mid in chunk if mid not in fetched and mid not in failed)
+
+    for message_id in failed:
+        try:
+            fetched[message_id] = _get_request(service, message_id, format, metadata_headers).execute()
+        except Exception as e:
+            print(f"❌ Error fetching email {message_id[:8]}: {str(e)}")
+
+    return [fetched.get(message_id) for message_id in ids]
+
+def _get_request(service: Any, message_id: str, format: str, metadata_headers: Optional[List[str]]):
+    params = {'userId': 'me', 'id': message_id, 'format': format}
+    if metadata_headers:
+        params['metadataHeaders'] = metadata_headers
+    return service.users().messages().get(**params)
+
+# ==================== Cached, Parsed Fetch ====================
+
+def fetch_parsed_messages(
+    service: Any,
+    user_id: str,
+    message_ids: Sequence[str],
+    cache: Optional[Any],
+    parse: Callable[[Dict], Dict]
+) -> List[Optional[Dict]]:
+    """
+    Return parsed messages for `message_ids`, reading from `cache` (a MessageCache)
+    first and batch-fetching only the misses. Unfetchable messages are None.
+    """
+    ids = list(message_ids)
+    parsed: Dict[str, Dict] = {}
+    if cache is not None:
+        try:
+            parsed = cache.get_many(user_id, ids)
+        except Exception as e:
+            print(f"⚠️ Message cache read failed: {str(e)}")
+    missing = [message_id for message_id in dict.fromkeys(ids) if message_id not in parsed]
+
+    fresh: Dict[str, Dict] = {}
+    for message_id, message in zip(missing, fetch_messages(service, missing)):
+        if message is None:
+            continue
+        try:
+            fresh[message_id] = parse(message)
+        except Exception as e:
+            print(f"❌ Error parsing email {message_id[:8]}: {str(e)}")
+
+    if cache is not None and fresh:
+        try:
+            cache.put_many(user_id, fresh)
+        except Exception as e:
+            print(f"⚠️ Message cache write failed: {str(e)}")
+    parsed.update(fresh)
+    return [parsed.get(message_id) for message_id in ids]
+
+# ==================== Streaming Fetch ====================
+
+def iter_parsed_messages(
+    service: Any,
+    user_id: str,
+    message_ids: Sequence[str],
+    cache: Optional[Any],
+    parse: Callable[[Dict], Dict],
+    format: str = 'full',
+    metadata_headers: Optional[List[str]] = None,
+    store: bool = True,
+    max_workers: int = 8
+) -> Iterator[Tuple[int, str, Optional[Dict]]]:
+    """
+    Yield (position, message_id, parsed or None) as each message becomes ready:
+    cache hits first, then misses in completion order from a bounded pool of
+    single-message requests. Used by the streaming endpoints, where the first
+    result matters more than total round-trips.
+    """
+    ids = list(message_ids)
+    cached: Dict[str, Dict] = {}
+    if cache is not None:
+        try:
+            cached = cache.get_many(user_id, ids)
+        except Exception as e:
+            print(f"⚠️ Message cache read failed: {str(e)}")
+
+    missing = []
+    for position, message_id in enumerate(ids):
+        if message_id in cached:
+            yield position, message_id, cached[message_id]
+        else:
+            missing.append((position, message_id))
+    if not missing:
+        return
+
+    def fetch_one(message_id: str) -> Optional[Dict]:
+        try:
+            message = _get_request(service, message_id, format, metadata_headers).execute()
+            parsed = parse(message)
+        except Exception as e:
+            print(f"❌ Error fetching email {message_id[:8]}: {str(e)}")
+            return None
+        if cache is not None and store:
+            try:
+                cache.put(user_id, message_id, parsed)
+            except Exception as e:
+                print(f"⚠️ Message cache write failed: {str(e)}")
+        return parsed
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+        futures = {pool.submit(fetch_one, message_id): (position, message_id) for position, message_id in missing}
+        for future in as_completed(futures):
+            position, message_id = futures[future]
+            yield position, message_id, future.result()
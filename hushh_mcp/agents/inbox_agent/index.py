@@ -5,29 +5,41 @@ Part of the Hushh Modular Consent Protocol (MCP)
 
 import os
 import json
-import pickle
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Union
 import base64
 import email
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse
 from google.auth.transport.requests import Request as GoogleRequest
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
-import openai
+from googleapiclient.http import HttpRequest
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 
 from ...consent.token import issue_token, validate_token
-from ...vault.encrypt import encrypt_data, decrypt_data
+from ...llm.client import get_llm_client
+from ...llm.mapreduce import map_reduce, map_reduce_stream, truncate_to_tokens
+from ...config import LLM_ITEM_MAX_TOKENS
+from ...vault.encrypt import seal_record
+from ...vault.store import CredentialStore
 from ...types import UserID, AgentID, EncryptedPayload
 from ...constants import ConsentScope
 from .manifest import AGENT_ID, SCOPES, DESCRIPTION
 from .ai_features import EmailAIFeatures
+from .service_pool import GmailServicePool
+from .fetch import fetch_messages, fetch_parsed_messages, iter_parsed_messages
+from .message_cache import MessageCache
+from .sync import InboxSync, is_index_cursor
+from .search import SearchIndex
+from .mime import extract_body
 
 # Import configuration
 import sys
@@ -37,14 +49,27 @@ from config import (
     GOOGLE_CLIENT_SECRET as GMAIL_CLIENT_SECRET,
     OPENAI_API_KEY,
     BACKEND_URL,
-    AGENT_MASTER_KEY
+    AGENT_MASTER_KEY,
+    GMAIL_TOKEN_DB_PATH,
+    GMAIL_SERVICE_POOL_SIZE,
+    GMAIL_SERVICE_IDLE_TTL_S,
+    GMAIL_TOKEN_REFRESH_MARGIN_S,
+    MESSAGE_CACHE_PATH,
+    MESSAGE_CACHE_MAX_BYTES,
+    INBOX_SYNC,
+    INBOX_SYNC_PATH,
+    EMAIL_BODY_MAX_BYTES,
+    ANALYZE_MAX_EMAILS,
+    EMAIL_CATEGORIES_PATH,
+    SEARCH_INDEX,
+    SEARCH_INDEX_PATH
 )
 
-# Configure OpenAI
-openai.api_key = OPENAI_API_KEY
+# Shared async LLM client (concurrency limits, timeouts, retries)
+llm = get_llm_client(OPENAI_API_KEY)
 
 # Initialize AI features
-ai_features = EmailAIFeatures(OPENAI_API_KEY)
+ai_features = EmailAIFeatures(OPENAI_API_KEY, categories_path=EMAIL_CATEGORIES_PATH)
 
 app = FastAPI(title="Inbox to Insight Agent", description=DESCRIPTION)
 
@@ -64,55 +89,50 @@ GMAIL_CLIENT_CONFIG = {
     }
 }
 
-# Token storage
-user_token_store: Dict[str, EncryptedPayload] = {}
-
-def load_user_tokens():
-    """Load encrypted user tokens from file"""
-    try:
-        with open('user_tokens_inbox.pkl', 'rb') as f:
-            return pickle.load(f)
-    except FileNotFoundError:
-        return {}
-
-def save_user_tokens(tokens: Dict[str, EncryptedPayload]):
-    """Save encrypted user tokens to file"""
-    with open('user_tokens_inbox.pkl', 'wb') as f:
-        pickle.dump(tokens, f)
+# Token storage: one encrypted row per user in SQLite (compact raw-bytes records
+# when VAULT_COMPACT_PAYLOADS is enabled). Rows are loaded lazily per request;
+# the legacy pickle file is imported once if the database is still empty.
+user_token_store = CredentialStore(GMAIL_TOKEN_DB_PATH, legacy_pickle_path='user_tokens_inbox.pkl')
+
+def _build_gmail_service(creds: Credentials):
+    """Build a Gmail client whose requests each get their own Http (httplib2 is not thread-safe)."""
+    def request_builder(http, *args, **kwargs):
+        return HttpRequest(AuthorizedHttp(creds, http=httplib2.Http()), *args, **kwargs)
+    return build('gmail', 'v1', credentials=creds, requestBuilder=request_builder)
+
+# Keyword search over every message that reaches the cache (None when SEARCH_INDEX is disabled)
+search_index = SearchIndex(SEARCH_INDEX_PATH, AGENT_MASTER_KEY) if SEARCH_INDEX else None
+
+# Parsed messages, encrypted at rest, so acting on an email doesn't refetch it from Gmail
+message_cache = MessageCache(
+    MESSAGE_CACHE_PATH,
+    AGENT_MASTER_KEY,
+    max_bytes=MESSAGE_CACHE_MAX_BYTES,
+    on_store=search_index.add_many if search_index else None
+)
 
-# Load tokens on startup
-user_token_store = load_user_tokens()
+# Local inbox index kept current from Gmail history (None when INBOX_SYNC is disabled)
+inbox_sync = InboxSync(INBOX_SYNC_PATH, message_cache=message_cache, search_index=search_index) if INBOX_SYNC else None
+
+# Built services are pooled per (user, credential version); tokens are refreshed in the background
+gmail_service_pool = GmailServicePool(
+    user_token_store,
+    AGENT_MASTER_KEY,
+    GMAIL_SCOPES,
+    _build_gmail_service,
+    maxsize=GMAIL_SERVICE_POOL_SIZE,
+    idle_ttl_ms=GMAIL_SERVICE_IDLE_TTL_S * 1000,
+    refresh_margin_ms=GMAIL_TOKEN_REFRESH_MARGIN_S * 1000
+)
 
 def get_gmail_service(user_id: str):
     """Get authenticated Gmail service for user"""
-    if user_id not in user_token_store:
-        raise HTTPException(status_code=401, detail="No Gmail tokens for user")
-    
     try:
-        decrypted = decrypt_data(user_token_store[user_id], AGENT_MASTER_KEY)
-        creds_data = json.loads(decrypted)
-        
-        # Debug: Check what we have in storage
-        print(f"🔍 Stored credentials keys: {list(creds_data.keys())}")
-        
-        creds = Credentials.from_authorized_user_info(creds_data, GMAIL_SCOPES)
-        
-        # Check if credentials are expired
-        if creds.expired:
-            if creds.refresh_token:
-                print("🔄 Refreshing expired token...")
-                creds.refresh(GoogleRequest())
-                # Update stored credentials
-                user_token_store[user_id] = encrypt_data(creds.to_json(), AGENT_MASTER_KEY)
-                save_user_tokens(user_token_store)
-                print("✅ Token refreshed successfully!")
-            else:
-                raise HTTPException(
-                    status_code=401, 
-                    detail="Token expired and no refresh token available. Please re-authorize."
-                )
-        
-        return build('gmail', 'v1', credentials=creds)
+        return gmail_service_pool.get(user_id)
+    except LookupError:
+        raise HTTPException(status_code=401, detail="No Gmail tokens for user")
+    except PermissionError as e:
+        raise HTTPException(status_code=401, detail=str(e))
     except Exception as e:
         print(f"❌ Gmail service error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to authenticate with Gmail: {str(e)}")
@@ -164,9 +184,8 @@ def gmail_callback(code: str = Query(...), state: str = Query(...)):
         
         # Encrypt and store credentials
         print("🔒 Encrypting and storing credentials...")
-        encrypted = encrypt_data(creds.to_json(), AGENT_MASTER_KEY)
+        encrypted = seal_record(creds.to_json(), AGENT_MASTER_KEY)
         user_token_store[user_id] = encrypted
-        save_user_tokens(user_token_store)
         print("💾 Credentials saved to storage")
         
         # Issue consent tokens
@@ -206,7 +225,7 @@ def test_gmail_connection(
         print(f"🔍 Token provided: {token[:20]}...")
         
         # Debug: Check if user exists in token store
-        print(f"📊 Users in token store: {list(user_token_store.keys())}")
+        print(f"📊 Users in token store: {len(user_token_store)}")
         print(f"🔍 Looking for user: {user_id}")
         
         is_valid, error_msg, parsed_token = validate_token(token, ConsentScope.GMAIL_READ)
@@ -235,12 +254,79 @@ def test_gmail_connection(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Gmail connection failed: {str(e)}")
 
+def list_inbox_page(service, user_id: str, max_results: int, page_token: Optional[str]):
+    """One page of inbox message refs: the synced local index when available, else Gmail's list"""
+    messages_for_page = None
+    if inbox_sync is not None and (not page_token or is_index_cursor(page_token)):
+        # Incremental sync: apply history deltas, then page the local inbox index
+        if not page_token:
+            try:
+                changes = inbox_sync.sync(service, user_id)
+                print(f"🔄 Inbox sync: {changes}")
+                if not inbox_sync.is_complete(user_id):
+                    # Older pages are indexed in the background; Gmail's list serves until then
+                    inbox_sync.start_backfill(service, user_id)
+            except Exception as e:
+                print(f"⚠️ Inbox sync failed, listing from Gmail: {str(e)}")
+        if page_token or inbox_sync.is_complete(user_id):
+            page_ids, next_page_token = inbox_sync.page(user_id, max_results, page_token)
+            messages_for_page = [{'id': message_id} for message_id in page_ids]
+    
+    if messages_for_page is None:
+        # Use Gmail's built-in pagination with pageToken
+        list_params = {
+            'userId': 'me',
+            'maxResults': max_results,
+            'q': 'in:inbox'
+        }
+        
+        if page_token:
+            list_params['pageToken'] = page_token
+        
+        print(f"📋 Getting {max_results} messages...")
+        results = service.users().messages().list(**list_params).execute()
+        
+        messages_for_page = results.get('messages', [])
+        next_page_token = results.get('nextPageToken')
+    
+    return messages_for_page, next_page_token
+
+def format_email_item(position: int, message_id: str, parsed: Optional[Dict], view: str) -> Dict:
+    """Shape one /emails entry, falling back to placeholder info when the message couldn't be loaded"""
+    if parsed is None:
+        print(f"❌ Error processing email {message_id[:8]}: message could not be fetched")
+        # Fallback to basic info
+        email_item = {
+            'id': message_id,
+            'subject': f'Email #{position+1}',
+            'from': 'Gmail User',
+            'date': 'Recent',
+            'snippet': f'Email content from message {message_id[:8]}...',
+            'hasAttachments': False
+        }
+        if view != 'summary':
+            email_item['body'] = 'Content unavailable'
+        return email_item
+    
+    email_item = {
+        'id': message_id,
+        'subject': parsed['subject'] or '(No subject)',
+        'from': parsed['from'] or 'Unknown sender',
+        'date': parsed['date'] or 'Unknown date',
+        'snippet': parsed['snippet'],
+        'hasAttachments': parsed['hasAttachments']
+    }
+    if view != 'summary':
+        email_item['body'] = parsed['body']  # Full email content
+    return email_item
+
 @app.get("/emails")
 def get_emails(
     token: str = Query(...),
     user_id: str = Query(...),
     max_results: int = Query(5, le=10),  # Even smaller default for testing
-    page_token: str = Query(None)  # Use Gmail's pageToken for proper pagination
+    page_token: str = Query(None),  # Use Gmail's pageToken for proper pagination
+    view: str = Query('full', pattern='^(full|summary)$')  # 'summary' skips bodies; see /emails/{email_id}
     ):
     """Fetch recent emails from Gmail with proper pagination"""
     # Validate consent token
@@ -257,68 +343,23 @@ def get_emails(
             
         service = get_gmail_service(user_id)
         
-        # Use Gmail's built-in pagination with pageToken
-        list_params = {
-            'userId': 'me',
-            'maxResults': max_results,
-            'q': 'in:inbox'
-        }
-        
-        if page_token:
-            list_params['pageToken'] = page_token
-        
-        print(f"📋 Getting {max_results} messages...")
-        results = service.users().messages().list(**list_params).execute()
-        
-        messages_for_page = results.get('messages', [])
-        next_page_token = results.get('nextPageToken')
+        messages_for_page, next_page_token = list_inbox_page(service, user_id, max_results, page_token)
         
         print(f"📬 Found {len(messages_for_page)} messages")
         print(f"🔄 Next page token: {'Available' if next_page_token else 'None'}")
         
-        # Get actual email details
+        # Get actual email details (cache first, then batched; failures come back as None)
+        page_ids = [msg['id'] for msg in messages_for_page]
+        if view == 'summary':
+            parsed_messages = load_summaries(service, user_id, page_ids)
+        else:
+            parsed_messages = load_messages(service, user_id, page_ids)
         emails = []
-        for i, msg in enumerate(messages_for_page):
-            try:
-                print(f"📩 Processing email {i+1}/{len(messages_for_page)}: {msg['id'][:8]}...")
-                
-                # Get full message details
-                full_message = service.users().messages().get(
-                    userId='me',
-                    id=msg['id'],
-                    format='full'
-                ).execute()
-                
-                # Extract headers
-                headers = {h['name']: h['value'] for h in full_message['payload'].get('headers', [])}
-                
-                # Extract body content
-                body_content = extract_email_body(full_message['payload'])
-                
-                emails.append({
-                    'id': msg['id'],
-                    'subject': headers.get('Subject', '(No subject)'),
-                    'from': headers.get('From', 'Unknown sender'),
-                    'date': headers.get('Date', 'Unknown date'),
-                    'snippet': full_message.get('snippet', ''),
-                    'body': body_content,  # Full email content
-                    'hasAttachments': len(full_message['payload'].get('parts', [])) > 1
-                })
-                
-            except Exception as e:
-                print(f"❌ Error processing email {msg['id'][:8]}: {str(e)}")
-                # Fallback to basic info
-                emails.append({
-                    'id': msg['id'],
-                    'subject': f'Email #{i+1}',
-                    'from': 'Gmail User',
-                    'date': 'Recent',
-                    'snippet': f'Email content from message {msg["id"][:8]}...',
-                    'body': 'Content unavailable',
-                    'hasAttachments': False
-                })
+        for i, (msg, parsed) in enumerate(zip(messages_for_page, parsed_messages)):
+            print(f"📩 Processing email {i+1}/{len(messages_for_page)}: {msg['id'][:8]}...")
+            emails.append(format_email_item(i, msg['id'], parsed, view))
         
-        print(f"✅ Processed {len(emails)} emails with full content!")
+        print(f"✅ Processed {len(emails)} emails ({view} view)!")
         
         # Return emails with Gmail's pagination token
         return {
@@ -336,6 +377,124 @@ def get_emails(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch emails: {str(e)}")
 
+@app.get("/emails/stream")
+def stream_emails(
+    token: str = Query(...),
+    user_id: str = Query(...),
+    max_results: int = Query(5, le=10),
+    page_token: str = Query(None),
+    view: str = Query('full', pattern='^(full|summary)$'),
+    format: str = Query('ndjson', pattern='^(ndjson|sse)$')
+    ):
+    """Stream one page of emails as each is ready, then a final pagination record"""
+    is_valid, error_msg, parsed_token = validate_token(token, ConsentScope.GMAIL_READ)
+    if not is_valid:
+        raise HTTPException(status_code=403, detail=f"Consent validation failed: {error_msg}")
+    
+    # Resolve auth and the page listing up front so failures still surface as HTTP errors
+    try:
+        service = get_gmail_service(user_id)
+        messages_for_page, next_page_token = list_inbox_page(service, user_id, max_results, page_token)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch emails: {str(e)}")
+    
+    if view == 'summary':
+        fetch_options = {'parse': parse_summary, 'format': 'metadata', 'metadata_headers': SUMMARY_HEADERS, 'store': False}
+    else:
+        fetch_options = {'parse': parse_message}
+    
+    def encode(record_type: str, data: Dict) -> str:
+        if format == 'sse':
+            return f"event: {record_type}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps({"type": record_type, **data}) + "\n"
+    
+    def records():
+        sent = 0
+        try:
+            page_ids = [msg['id'] for msg in messages_for_page]
+            for position, message_id, parsed in iter_parsed_messages(service, user_id, page_ids, message_cache, **fetch_options):
+                sent += 1
+                yield encode("email", {"position": position, "email": format_email_item(position, message_id, parsed, view)})
+        except Exception as e:
+            print(f"❌ Email stream error: {str(e)}")
+            yield encode("error", {"detail": f"Failed to fetch emails: {str(e)}"})
+        yield encode("pagination", {"pagination": {
+            "has_more": bool(next_page_token),
+            "next_page_token": next_page_token,
+            "emails_on_page": sent,
+            "max_results": max_results
+        }})
+    
+    media_type = "text/event-stream" if format == 'sse' else "application/x-ndjson"
+    return StreamingResponse(records(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@app.get("/emails/{email_id}")
+def get_email_detail(
+    email_id: str,
+    token: str = Query(...),
+    user_id: str = Query(...)
+    ):
+    """Fetch one email with its full body (pairs with /emails?view=summary)"""
+    is_valid, error_msg, parsed_token = validate_token(token, ConsentScope.GMAIL_READ)
+    if not is_valid:
+        raise HTTPException(status_code=403, detail=f"Consent validation failed: {error_msg}")
+    
+    try:
+        service = get_gmail_service(user_id)
+        message = load_messages(service, user_id, [email_id])[0]
+        if message is None:
+            raise HTTPException(status_code=404, detail=f"Email {email_id} not found")
+        
+        return {
+            "email": {
+                'id': email_id,
+                'thread_id': message['thread_id'],
+                'subject': message['subject'] or '(No subject)',
+                'from': message['from'] or 'Unknown sender',
+                'date': message['date'] or 'Unknown date',
+                'snippet': message['snippet'],
+                'body': message['body'],
+                'hasAttachments': message['hasAttachments'],
+                'labels': message['labels']
+            }
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch email: {str(e)}")
+
+@app.get("/search")
+def search_emails(
+    token: str = Query(...),
+    user_id: str = Query(...),
+    q: str = Query(..., min_length=1),
+    max_results: int = Query(20, ge=1, le=100)
+    ):
+    """Keyword search over the user's locally indexed emails (no Gmail calls)"""
+    is_valid, error_msg, parsed_token = validate_token(token, ConsentScope.GMAIL_READ)
+    if not is_valid:
+        raise HTTPException(status_code=403, detail=f"Consent validation failed: {error_msg}")
+    if parsed_token.user_id != user_id:
+        raise HTTPException(status_code=403, detail="User ID mismatch")
+    if search_index is None:
+        raise HTTPException(status_code=503, detail="Search index is disabled")
+    
+    started = time.perf_counter()
+    try:
+        results = search_index.search(user_id, q, max_results=max_results)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search emails: {str(e)}")
+    
+    return {
+        "query": q,
+        "results": results,
+        "indexed_emails": search_index.count(user_id),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
 @app.post("/analyze")
 async def analyze_emails(request: Request):
     """Analyze selected emails and generate insights"""
@@ -350,30 +509,23 @@ async def analyze_emails(request: Request):
     if not is_valid:
         raise HTTPException(status_code=403, detail=f"Consent validation failed: {error_msg}")
     
+    if len(email_ids) > ANALYZE_MAX_EMAILS:
+        raise HTTPException(status_code=400, detail=f"Too many emails: at most {ANALYZE_MAX_EMAILS} per analysis")
+    
     try:
         service = get_gmail_service(user_id)
         
         # Fetch email contents
         email_contents = []
-        for email_id in email_ids[:10]:  # Limit to 10 emails for analysis
+        for email_id, message in zip(email_ids, load_messages(service, user_id, email_ids)):
             try:
-                message = service.users().messages().get(
-                    userId='me',
-                    id=email_id,
-                    format='full'
-                ).execute()
-                
-                headers = message['payload'].get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-                from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-                
-                # Extract body text
-                body = extract_email_body(message['payload'])
+                if message is None:
+                    raise ValueError("message could not be fetched")
                 
                 email_contents.append({
-                    'subject': subject,
-                    'from': from_email,
-                    'body': body[:1000]  # Limit body length
+                    'subject': message['subject'] or 'No Subject',
+                    'from': message['from'] or 'Unknown',
+                    'body': message['body']
                 })
                 
             except Exception as e:
@@ -381,7 +533,7 @@ async def analyze_emails(request: Request):
                 continue
         
         # Generate AI insights
-        insights = generate_ai_insights(email_contents, analysis_type)
+        insights = await generate_ai_insights(email_contents, analysis_type, user_id=user_id)
         
         return {"insights": insights}
     
@@ -445,26 +597,19 @@ async def generate_content(request: Request):
             # Get email content
             try:
                 service = get_gmail_service(user_id)
-                message = service.users().messages().get(
-                    userId='me',
-                    id=email_id,
-                    format='full'
-                ).execute()
-                
-                headers = message['payload'].get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-                from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-                body = extract_email_body(message['payload'])
+                message = load_messages(service, user_id, [email_id])[0]
+                if message is None:
+                    raise ValueError(f"Email {email_id} could not be fetched")
                 
                 email = {
                     'id': email_id,
-                    'subject': subject,
-                    'from': from_email,
-                    'body': body
+                    'subject': message['subject'] or 'No Subject',
+                    'from': message['from'] or 'Unknown',
+                    'body': message['body']
                 }
                 
                 # Generate smart reply
-                reply = ai_features.generate_smart_reply(email, style)
+                reply = await ai_features.generate_smart_reply(email, style, user_id=user_id)
                 return {"content": reply}
                 
             except Exception as e:
@@ -487,31 +632,26 @@ async def generate_content(request: Request):
                     status_code=400,
                     detail="Missing email_ids in payload"
                 )
+            if len(email_ids) > ANALYZE_MAX_EMAILS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Too many emails: at most {ANALYZE_MAX_EMAILS} per request"
+                )
             
             try:
                 service = get_gmail_service(user_id)
                 
                 # Fetch email contents
                 email_contents = []
-                for email_id in email_ids[:10]:  # Limit to 10 emails for analysis
+                for email_id, message in zip(email_ids, load_messages(service, user_id, email_ids)):
                     try:
-                        message = service.users().messages().get(
-                            userId='me',
-                            id=email_id,
-                            format='full'
-                        ).execute()
-                        
-                        headers = message['payload'].get('headers', [])
-                        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-                        from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-                        
-                        # Extract body text
-                        body = extract_email_body(message['payload'])
+                        if message is None:
+                            raise ValueError("message could not be fetched")
                         
                         email_contents.append({
-                            'subject': subject,
-                            'from': from_email,
-                            'body': body[:1000]  # Limit body length
+                            'subject': message['subject'] or 'No Subject',
+                            'from': message['from'] or 'Unknown',
+                            'body': message['body']
                         })
                         
                     except Exception as e:
@@ -520,10 +660,10 @@ async def generate_content(request: Request):
                 
                 # Generate content using AI
                 if content_type in ['summary', 'proposal', 'analysis']:
-                    content = generate_ai_content(email_contents, content_type, custom_prompt)
+                    content = await generate_ai_content(email_contents, content_type, custom_prompt, user_id=user_id)
                 else:
                     # Fallback to summary for unknown types
-                    content = generate_ai_content(email_contents, 'summary', custom_prompt)
+                    content = await generate_ai_content(email_contents, 'summary', custom_prompt, user_id=user_id)
                 
                 return {"content": content}
                 
@@ -566,23 +706,15 @@ async def categorize_emails(request: Request):
         service = get_gmail_service(user_id)
         emails = []
         
-        for email_id in email_ids:
-            message = service.users().messages().get(
-                userId='me',
-                id=email_id,
-                format='full'
-            ).execute()
-            
-            headers = message['payload'].get('headers', [])
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-            from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-            body = extract_email_body(message['payload'])
+        for email_id, message in zip(email_ids, load_messages(service, user_id, email_ids)):
+            if message is None:
+                continue  # already logged by fetch_messages
             
             emails.append({
                 'id': email_id,
-                'subject': subject,
-                'from': from_email,
-                'body': body
+                'subject': message['subject'] or 'No Subject',
+                'from': message['from'] or 'Unknown',
+                'body': message['body']
             })
         
         categories = ai_features.categorize_emails(emails)
@@ -607,30 +739,40 @@ async def generate_reply(request: Request):
     
     try:
         service = get_gmail_service(user_id)
-        message = service.users().messages().get(
-            userId='me',
-            id=email_id,
-            format='full'
-        ).execute()
-        
-        headers = message['payload'].get('headers', [])
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-        from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-        body = extract_email_body(message['payload'])
+        message = load_messages(service, user_id, [email_id])[0]
+        if message is None:
+            raise ValueError(f"Email {email_id} could not be fetched")
         
         email = {
             'id': email_id,
-            'subject': subject,
-            'from': from_email,
-            'body': body
+            'subject': message['subject'] or 'No Subject',
+            'from': message['from'] or 'Unknown',
+            'body': message['body']
         }
         
-        reply = ai_features.generate_smart_reply(email, style)
+        reply = await ai_features.generate_smart_reply(email, style, user_id=user_id)
         return {"reply": reply}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate reply: {str(e)}")
 
+@app.post("/generate/stream")
+async def stream_generated_content(request: Request):
+    """Stream a smart reply or generated content as server-sent events"""
+    data = await request.json()
+    return await generation_stream_response(request, data)
+
+@app.post("/smart-reply/stream")
+async def stream_reply(request: Request):
+    """Stream a smart reply for an email as server-sent events"""
+    data = await request.json()
+    return await generation_stream_response(request, {
+        "token": data.get('token'),
+        "user_id": data.get('user_id'),
+        "message_type": "smart_reply",
+        "payload": {"email_id": data.get('email_id'), "style": data.get('style', 'professional')}
+    })
+
 class InboxAgent:
     def __init__(self, openai_api_key: Optional[str] = None):
         """Initialize InboxAgent with optional OpenAI API key."""
@@ -704,19 +846,7 @@ class InboxAgent:
                 ).execute()
 
                 # Extract email content
-                email_content = ""
-                if 'payload' in msg and 'parts' in msg['payload']:
-                    for part in msg['payload']['parts']:
-                        if part.get('mimeType') == 'text/plain':
-                            if 'data' in part['body']:
-                                email_content += base64.urlsafe_b64decode(
-                                    part['body']['data']
-                                ).decode('utf-8')
-                elif 'payload' in msg and 'body' in msg['payload']:
-                    if 'data' in msg['payload']['body']:
-                        email_content += base64.urlsafe_b64decode(
-                            msg['payload']['body']['data']
-                        ).decode('utf-8')
+                email_content = extract_email_body(msg['payload'])
 
                 # Get headers
                 headers = msg['payload']['headers']
@@ -964,7 +1094,7 @@ class InboxAgent:
                 )
 
                 # Extract body
-                body = self.extract_email_body(msg['payload'])
+                body = extract_email_body(msg['payload'])
 
                 emails.append({
                     'id': message['id'],
@@ -990,65 +1120,125 @@ class InboxAgent:
                 content={"error": f"Failed to get emails: {str(e)}"}
             )
 
-def extract_email_body(payload):
-    """Extract plain text body from email payload"""
-    body = ""
-    
-    if 'parts' in payload:
-        for part in payload['parts']:
-            if part['mimeType'] == 'text/plain':
-                if 'data' in part['body']:
-                    body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                    break
-            elif part['mimeType'] == 'multipart/alternative' and 'parts' in part:
-                for subpart in part['parts']:
-                    if subpart['mimeType'] == 'text/plain' and 'data' in subpart['body']:
-                        body = base64.urlsafe_b64decode(subpart['body']['data']).decode('utf-8')
-                        break
-    elif payload['mimeType'] == 'text/plain' and 'data' in payload['body']:
-        body = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
+def extract_email_body(payload, max_bytes: Optional[int] = EMAIL_BODY_MAX_BYTES):
+    """Extract text body from email payload (text/plain, else text/html stripped to text)"""
+    return extract_body(payload, max_bytes=max_bytes)
+
+def parse_message(message: Dict) -> Dict:
+    """Reduce a full Gmail message to the fields the endpoints use (this is what gets cached)"""
+    headers = {h['name']: h['value'] for h in message['payload'].get('headers', [])}
+    return {
+        'id': message['id'],
+        'thread_id': message.get('threadId'),
+        'subject': headers.get('Subject'),
+        'from': headers.get('From'),
+        'date': headers.get('Date'),
+        'snippet': message.get('snippet', ''),
+        'body': extract_email_body(message['payload']),
+        'hasAttachments': len(message['payload'].get('parts', [])) > 1,
+        'labels': message.get('labelIds', [])
+    }
+
+SUMMARY_HEADERS = ['Subject', 'From', 'Date']
+
+def parse_summary(message: Dict) -> Dict:
+    """Header fields from a format='metadata' message (no body is fetched or decoded)"""
+    headers = {h['name']: h['value'] for h in message['payload'].get('headers', [])}
+    return {
+        'id': message['id'],
+        'thread_id': message.get('threadId'),
+        'subject': headers.get('Subject'),
+        'from': headers.get('From'),
+        'date': headers.get('Date'),
+        'snippet': message.get('snippet', ''),
+        # metadata responses omit parts; a multipart/mixed top level is how attachments show up
+        'hasAttachments': message['payload'].get('mimeType') == 'multipart/mixed',
+        'labels': message.get('labelIds', [])
+    }
+
+def load_summaries(service, user_id: str, message_ids: List[str]) -> List[Optional[Dict]]:
+    """List-view fields: full cached messages when present, otherwise format='metadata' fetches"""
+    summaries: Dict[str, Dict] = {}
+    try:
+        summaries = message_cache.get_many(user_id, message_ids)
+    except Exception as e:
+        print(f"⚠️ Message cache read failed: {str(e)}")
     
-    return body
+    missing = [message_id for message_id in message_ids if message_id not in summaries]
+    fetched = fetch_messages(service, missing, format='metadata', metadata_headers=SUMMARY_HEADERS)
+    for message_id, message in zip(missing, fetched):
+        if message is not None:
+            summaries[message_id] = parse_summary(message)
+    return [summaries.get(message_id) for message_id in message_ids]
+
+def load_messages(service, user_id: str, message_ids: List[str]) -> List[Optional[Dict]]:
+    """Parsed messages from the local cache, fetching only the misses from Gmail"""
+    return fetch_parsed_messages(service, user_id, message_ids, message_cache, parse_message)
+
+INSIGHTS_FORMAT = """
+        Format your response as JSON with these keys:
+        - summary: string
+        - actionItems: array of strings
+        - keyTopics: array of strings
+        - priority: string (high/medium/low)
+        - sentiment: string (positive/neutral/negative)
+        """
+
+def render_email_for_prompt(email: Dict) -> str:
+    """One email as prompt text, with the body trimmed to the per-email token budget"""
+    body = truncate_to_tokens(email['body'], LLM_ITEM_MAX_TOKENS)
+    return f"Subject: {email['subject']}\nFrom: {email['from']}\nContent: {body}"
 
-def generate_ai_insights(emails: List[Dict], analysis_type: str) -> Dict:
-    """Generate AI insights from email data"""
+async def generate_ai_insights(emails: List[Dict], analysis_type: str, user_id: Optional[str] = None) -> Dict:
+    """Generate AI insights from email data, map-reducing over batches when they don't fit one prompt"""
     try:
-        # Prepare email data for analysis
-        email_text = "\n\n".join([
-            f"Subject: {email['subject']}\nFrom: {email['from']}\nContent: {email['body'][:500]}"
-            for email in emails
-        ])
-        
-        prompt = f"""
+        def direct_prompt(email_text: str) -> str:
+            return f"""
         Analyze the following emails and provide comprehensive insights:
-        
+
         {email_text}
-        
+
         Please provide:
         1. A brief summary of the main themes and topics
         2. Key action items that need attention
         3. Important topics/keywords mentioned
         4. Overall priority level (high/medium/low)
         5. General sentiment (positive/neutral/negative)
-        
-        Format your response as JSON with these keys:
-        - summary: string
-        - actionItems: array of strings
-        - keyTopics: array of strings  
-        - priority: string (high/medium/low)
-        - sentiment: string (positive/neutral/negative)
-        """
-        
-        response = openai.chat.completions.create(
+        {INSIGHTS_FORMAT}"""
+
+        def map_prompt(email_text: str) -> str:
+            return f"""
+        The following emails are one batch from a larger mailbox. Analyze this batch:
+        summarize its themes, list every action item, and note topics, priority and sentiment.
+
+        {email_text}
+        {INSIGHTS_FORMAT}"""
+
+        def reduce_prompt(partials_text: str) -> str:
+            return f"""
+        Each JSON object below analyzes one batch of emails from the same mailbox.
+        Merge them into a single analysis of all batches: combine the summaries,
+        keep every distinct action item (merging duplicates), pick the most important
+        topics, and give the overall priority and sentiment.
+
+        {partials_text}
+        {INSIGHTS_FORMAT}"""
+
+        response = await map_reduce(
+            llm,
+            [render_email_for_prompt(email) for email in emails],
+            map_prompt=map_prompt,
+            reduce_prompt=reduce_prompt,
+            direct_prompt=direct_prompt,
             model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
+            user_id=user_id,
             temperature=0.3
         )
-        
+
         # Parse JSON response
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response)
         return result
-        
+
     except Exception as e:
         # Fallback insights if AI fails
         return {
@@ -1059,43 +1249,140 @@ def generate_ai_insights(emails: List[Dict], analysis_type: str) -> Dict:
             "sentiment": "neutral"
         }
 
-def generate_ai_content(emails: List[Dict], content_type: str, custom_prompt: str = "") -> str:
-    """Generate AI content from email data"""
+def content_generation_plan(emails: List[Dict], content_type: str, custom_prompt: str = "") -> Dict:
+    """Items and prompt builders for map_reduce / map_reduce_stream"""
+    # Different prompts based on content type
+    if content_type == 'summary':
+        base_prompt = "Create a comprehensive summary of the following emails, highlighting key points, decisions made, and important information:"
+    elif content_type == 'proposal':
+        base_prompt = "Based on the following emails, create a professional proposal or response that addresses the main points and suggests next steps:"
+    elif content_type == 'analysis':
+        base_prompt = "Provide a detailed analysis of the following emails, including trends, patterns, relationships, and strategic insights:"
+    else:
+        base_prompt = "Process the following emails and provide a helpful response:"
+
+    # Add custom prompt if provided
+    if custom_prompt:
+        base_prompt += f"\n\nAdditional instructions: {custom_prompt}"
+
+    # Large selections are first condensed into notes per batch
+    notes_prompt = (
+        "Take detailed notes on the following emails: key points, decisions, requests, "
+        "deadlines, people involved and open questions. Keep names, dates and figures exact."
+    )
+
+    return {
+        "items": [render_email_for_prompt(email) for email in emails],
+        "map_prompt": lambda email_text: f"{notes_prompt}\n\n{email_text}",
+        "combine_prompt": lambda notes: f"Merge these notes on batches of the same mailbox into one set, keeping every distinct point:\n\n{notes}",
+        "reduce_prompt": lambda notes: f"{base_prompt}\n\n(The emails are given as notes taken per batch.)\n\n{notes}",
+        "direct_prompt": lambda email_text: f"{base_prompt}\n\n{email_text}",
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.7,
+        "max_tokens": 1000
+    }
+
+async def generate_ai_content(emails: List[Dict], content_type: str, custom_prompt: str = "", user_id: Optional[str] = None) -> str:
+    """Generate AI content from email data, map-reducing over batches when they don't fit one prompt"""
     try:
-        # Prepare email data
-        email_text = "\n\n".join([
-            f"Subject: {email['subject']}\nFrom: {email['from']}\nContent: {email['body']}"
-            for email in emails
-        ])
-        
-        # Different prompts based on content type
-        if content_type == 'summary':
-            base_prompt = "Create a comprehensive summary of the following emails, highlighting key points, decisions made, and important information:"
-        elif content_type == 'proposal':
-            base_prompt = "Based on the following emails, create a professional proposal or response that addresses the main points and suggests next steps:"
-        elif content_type == 'analysis':
-            base_prompt = "Provide a detailed analysis of the following emails, including trends, patterns, relationships, and strategic insights:"
-        else:
-            base_prompt = "Process the following emails and provide a helpful response:"
-        
-        # Add custom prompt if provided
-        if custom_prompt:
-            base_prompt += f"\n\nAdditional instructions: {custom_prompt}"
-        
-        prompt = f"{base_prompt}\n\n{email_text}"
-        
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        
-        return response.choices[0].message.content
-        
+        return await map_reduce(llm, user_id=user_id, **content_generation_plan(emails, content_type, custom_prompt))
+
     except Exception as e:
         return f"Unable to generate {content_type} at this time. Please try again later."
 
+async def stream_ai_content(emails: List[Dict], content_type: str, custom_prompt: str = "", user_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Stream AI content as the final call produces it (the map step, if any, runs first)"""
+    async for delta in map_reduce_stream(llm, user_id=user_id, **content_generation_plan(emails, content_type, custom_prompt)):
+        yield delta
+
+# ==================== Streaming Generation ====================
+
+def encode_sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def generation_stream_response(request: Request, data: Dict) -> StreamingResponse:
+    """
+    Validate a /generate-style request ({token, user_id, message_type, payload})
+    and stream the result as server-sent events: `delta` records with each
+    piece of text, then `done` with the full content (or `error`). Generation
+    stops as soon as the client disconnects.
+    """
+    token = data.get('token')
+    user_id = data.get('user_id')
+    message_type = data.get('message_type')
+    payload = data.get('payload') or {}
+    
+    # Validate token format
+    if not token or ':' not in token:
+        raise HTTPException(status_code=403, detail="Invalid token format")
+    
+    # Validate consent token
+    is_valid, error_msg, parsed_token = validate_token(token, ConsentScope.GMAIL_READ)
+    if not is_valid:
+        raise HTTPException(status_code=403, detail=f"Consent validation failed: {error_msg}")
+    
+    # Validate user ID matches token
+    if parsed_token.user_id != user_id:
+        raise HTTPException(status_code=403, detail="User ID mismatch")
+    
+    # Fetch the emails before streaming starts so failures still surface as HTTP errors
+    if message_type == 'smart_reply':
+        email_id = payload.get('email_id')
+        if not email_id:
+            raise HTTPException(status_code=400, detail="Missing email_id in payload")
+        email_ids = [email_id]
+    elif message_type == 'content_generation':
+        email_ids = payload.get('email_ids', [])
+        if not email_ids:
+            raise HTTPException(status_code=400, detail="Missing email_ids in payload")
+        if len(email_ids) > ANALYZE_MAX_EMAILS:
+            raise HTTPException(status_code=400, detail=f"Too many emails: at most {ANALYZE_MAX_EMAILS} per request")
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported message type: {message_type}")
+    
+    try:
+        service = get_gmail_service(user_id)
+        messages = load_messages(service, user_id, email_ids)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch email content: {str(e)}")
+    
+    emails = [
+        {
+            'id': email_id,
+            'subject': message['subject'] or 'No Subject',
+            'from': message['from'] or 'Unknown',
+            'body': message['body']
+        }
+        for email_id, message in zip(email_ids, messages) if message is not None
+    ]
+    if message_type == 'smart_reply':
+        if not emails:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch email content: Email {email_ids[0]} could not be fetched")
+        deltas = ai_features.stream_smart_reply(emails[0], payload.get('style', 'professional'), user_id=user_id)
+    else:
+        deltas = stream_ai_content(emails, payload.get('type', 'summary'), payload.get('custom_prompt', ''), user_id=user_id)
+    
+    async def events():
+        parts = []
+        try:
+            async for delta in deltas:
+                if await request.is_disconnected():
+                    print(f"🔌 Client disconnected, stopping {message_type} stream for {user_id[:8]}")
+                    return
+                parts.append(delta)
+                yield encode_sse("delta", {"text": delta})
+            yield encode_sse("done", {"content": "".join(parts)})
+        except Exception as e:
+            print(f"❌ Generation stream error: {str(e)}")
+            yield encode_sse("error", {"detail": f"Failed to generate content: {str(e)}"})
+        finally:
+            # Releases the LLM slot and closes the upstream completion stream
+            await deltas.aclose()
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 # Health check endpoint
 @app.get("/health")
 def health_check():
@@ -1104,6 +1391,7 @@ def health_check():
         "status": "healthy",
         "agent_id": AGENT_ID,
         "scopes": SCOPES,
+        "llm": llm.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -0,0 +1,189 @@
+# hushh_mcp/agents/inbox_agent/message_cache.py
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from ...vault.encrypt import encrypt_bytes, decrypt_bytes
+
+# SQLite's default limit on bound parameters is 999; stay well below it.
+_SQL_CHUNK = 500
+
+# ==================== Parsed Message Cache ====================
+
+class MessageCache:
+    """
+    Local cache of parsed Gmail messages keyed by (user_id, message_id).
+
+    Entries are JSON dicts (headers, snippet, body, labels) encrypted with
+    the vault's AES-GCM before they touch disk. The cache is bounded by the
+    total encrypted size and evicts least-recently-read entries first.
+    Gmail messages are immutable, so entries only need invalidating when
+    their labels change. `on_store(user_id, messages)` is called after each
+    write, e.g. to keep a search index fed with newly cached mail.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        key_hex: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        on_store: Optional[Callable[[str, Dict[str, Dict]], None]] = None
+    ):
+        self.path = path
+        self.key_hex = key_hex
+        self.max_bytes = max_bytes
+        self.on_store = on_store
+        self.hits = 0
+        self.misses = 0
+        self._last_tick = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cached_messages ("
+            " user_id TEXT NOT NULL,"
+            " message_id TEXT NOT NULL,"
+            " data BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed_at INTEGER NOT NULL,"
+            " PRIMARY KEY (user_id, message_id))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cached_messages_accessed ON cached_messages (accessed_at)"
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cached_messages"
+        ).fetchone()[0]
+
+    def get(self, user_id: str, message_id: str) -> Optional[Dict]:
+        return self.get_many(user_id, [message_id]).get(message_id)
+
+    def get_many(self, user_id: str, message_ids: Sequence[str]) -> Dict[str, Dict]:
+        """Return the cached subset of `message_ids` as {message_id: parsed message}."""
+        ids = list(dict.fromkeys(message_ids))
+        found: Dict[str, Dict] = {}
+        with self._lock:
+            now = self._tick()
+            for start in range(0, len(ids), _SQL_CHUNK):
+                chunk = ids[start:start + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT message_id, data FROM cached_messages WHERE user_id = ? AND message_id IN ({marks})",
+                    (user_id, *chunk)
+                ).fetchall()
+                for message_id, data in rows:
+                    found[message_id] = json.loads(decrypt_bytes(data, self.key_hex))
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE cached_messages SET accessed_at = ? WHERE user_id = ? AND message_id IN ({marks})",
+                        (now, user_id, *chunk)
+                    )
+            self.hits += len(found)
+            self.misses += len(ids) - len(found)
+        return found
+
+    def put(self, user_id: str, message_id: str, message: Dict) -> None:
+        self.put_many(user_id, {message_id: message})
+
+    def put_many(self, user_id: str, messages: Dict[str, Dict]) -> None:
+        if not messages:
+            return
+        blobs = [
+            (message_id, encrypt_bytes(json.dumps(message).encode("utf-8"), self.key_hex))
+            for message_id, message in messages.items()
+        ]
+
+        with self._lock:
+            now = self._tick()
+            rows = [(user_id, message_id, blob, len(blob), now) for message_id, blob in blobs]
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row in rows:
+                    previous = self._conn.execute(
+                        "SELECT size FROM cached_messages WHERE user_id = ? AND message_id = ?", row[:2]
+                    ).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO cached_messages (user_id, message_id, data, size, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?)", row
+                    )
+                    self._total_bytes += row[3] - (previous[0] if previous else 0)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+        if self.on_store is not None:
+            try:
+                self.on_store(user_id, messages)
+            except Exception as e:
+                print(f"⚠️ Message cache on_store hook failed: {str(e)}")
+
+    def invalidate(self, user_id: str, message_ids: Optional[Iterable[str]] = None) -> int:
+        """Drop entries (e.g. after a label change). With no ids, drops the whole user."""
+        with self._lock:
+            if message_ids is None:
+                cursor = self._conn.execute("DELETE FROM cached_messages WHERE user_id = ?", (user_id,))
+                removed = cursor.rowcount
+            else:
+                ids = list(message_ids)
+                removed = 0
+                for start in range(0, len(ids), _SQL_CHUNK):
+                    chunk = ids[start:start + _SQL_CHUNK]
+                    cursor = self._conn.execute(
+                        f"DELETE FROM cached_messages WHERE user_id = ? AND message_id IN ({','.join('?' * len(chunk))})",
+                        (user_id, *chunk)
+                    )
+                    removed += cursor.rowcount
+            self._resync_total()
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cached_messages").fetchone()[0]
+            return {
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- internals (caller holds self._lock) ----
+
+    def _tick(self) -> int:
+        # LRU clock in epoch microseconds, strictly increasing within this process
+        self._last_tick = max(time.time_ns() // 1000, self._last_tick + 1)
+        return self._last_tick
+
+    def _resync_total(self) -> None:
+        # Other workers write to the same file, so the local running total can drift
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cached_messages"
+        ).fetchone()[0]
+
+    def _evict(self) -> None:
+        self._resync_total()
+        while self._total_bytes > self.max_bytes:
+            victims: List[tuple] = self._conn.execute(
+                "SELECT user_id, message_id, size FROM cached_messages ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not victims:
+                break
+            doomed = []
+            for user_id, message_id, size in victims:
+                doomed.append((user_id, message_id))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+            self._conn.executemany(
+                "DELETE FROM cached_messages WHERE user_id = ? AND message_id = ?", doomed
+            )
@@ -0,0 +1,108 @@
+# hushh_mcp/agents/inbox_agent/mime.py
+
+import base64
+import codecs
+import html
+import re
+from typing import Dict, List, Optional, Tuple
+
+# ==================== MIME Body Extraction ====================
+# Walks a Gmail API message payload ({mimeType, headers, body: {data}, parts}).
+# Gmail has already undone the Content-Transfer-Encoding, so body.data is the
+# part's raw bytes (base64url) in whatever charset its Content-Type declares.
+
+_CHARSET_RE = re.compile(r'charset\s*=\s*"?([^";\s]+)', re.IGNORECASE)
+
+def extract_body(payload: Dict, max_bytes: Optional[int] = None) -> str:
+    """
+    Text body of a message: the first text/plain part in document order, else
+    the first text/html part converted to text. Attachments are skipped and
+    nesting depth is unlimited. With `max_bytes`, at most that many raw bytes
+    of the chosen part are decoded.
+    """
+    plain, html_part = _find_text_parts(payload)
+    if plain is not None:
+        return _decode_part(plain, max_bytes)
+    if html_part is not None:
+        return html_to_text(_decode_part(html_part, max_bytes), truncated=max_bytes is not None)
+    return ""
+
+def _find_text_parts(payload: Dict) -> Tuple[Optional[Dict], Optional[Dict]]:
+    first_html = None
+    stack: List[Dict] = [payload]
+    while stack:
+        part = stack.pop()
+        children = part.get('parts')
+        if children:
+            stack.extend(reversed(children))  # keep document order
+            continue
+
+        mime_type = (part.get('mimeType') or '').lower()
+        if not mime_type.startswith('text/') or _is_attachment(part):
+            continue
+        if not (part.get('body') or {}).get('data'):
+            continue
+        if mime_type == 'text/plain':
+            return part, None
+        if mime_type == 'text/html' and first_html is None:
+            first_html = part
+    return None, first_html
+
+def _is_attachment(part: Dict) -> bool:
+    if part.get('filename'):
+        return True
+    for header in part.get('headers', ()):
+        if header['name'].lower() == 'content-disposition':
+            return header['value'].lower().startswith('attachment')
+    return False
+
+def _decode_part(part: Dict, max_bytes: Optional[int]) -> str:
+    data = part['body']['data']
+    if max_bytes is not None:
+        # 4 base64 chars -> 3 bytes, so only decode the prefix we need
+        data = data[:(max_bytes + 2) // 3 * 4]
+    raw = base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+    if max_bytes is not None:
+        raw = raw[:max_bytes]
+
+    # Incremental decode drops a multibyte character cut in half by the cap
+    decoder = codecs.getincrementaldecoder(_part_charset(part))(errors='replace')
+    return decoder.decode(raw, final=max_bytes is None or len(raw) < max_bytes)
+
+def _part_charset(part: Dict) -> str:
+    for header in part.get('headers', ()):
+        if header['name'].lower() == 'content-type':
+            match = _CHARSET_RE.search(header['value'])
+            if match:
+                try:
+                    return codecs.lookup(match.group(1)).name
+                except LookupError:
+                    break
+    return 'utf-8'
+
+# ==================== HTML to Text ====================
+
+_INVISIBLE_RE = re.compile(r'<(script|style|head|title)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+# What a byte cap can leave dangling at the end: an opened script/style/head/title
+# or comment whose closing tag was cut off, or a half-written tag
+_UNTERMINATED_RE = re.compile(r'<(?:script|style|head|title)\b.*|<!--.*|<[^>]*\Z', re.IGNORECASE | re.DOTALL)
+_BREAK_RE = re.compile(r'<(?:br|/p|/div|/tr|/li|/h[1-6]|/table|hr)\b[^>]*>', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACES_RE = re.compile(r'[ \t\r\f\v\xa0]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+def html_to_text(markup: str, truncated: bool = False) -> str:
+    """
+    Cheap regex-based HTML to text: drops scripts/styles, keeps line breaks,
+    unescapes entities. Pass `truncated` when the markup may have been cut
+    off, so an unclosed trailing script/style block isn't read as text.
+    """
+    text = _INVISIBLE_RE.sub('', markup)
+    if truncated:
+        text = _UNTERMINATED_RE.sub('', text, count=1)
+    text = _BREAK_RE.sub('\n', text)
+    text = _TAG_RE.sub('', text)
+    text = html.unescape(text)
+    text = _SPACES_RE.sub(' ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    return _BLANK_LINES_RE.sub('\n\n', text).strip()
@@ -0,0 +1,230 @@
+# hushh_mcp/agents/inbox_agent/search.py
+
+import hashlib
+import hmac
+import heapq
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from ...vault.encrypt import encrypt_bytes, decrypt_bytes
+
+_SQL_CHUNK = 500
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its me my no not of on or our "
+    "she so that the their them they this to was we were will with you your re fw fwd".split()
+)
+
+# Field weights folded into the term frequency (a simplified BM25F)
+FIELD_WEIGHTS = {"subject": 3, "from": 2, "body": 1}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+# ==================== Local Search Index ====================
+
+class SearchIndex:
+    """
+    Per-user keyword search over messages that have passed through the
+    local message cache, ranked with BM25 (TF-IDF with length normalization).
+
+    The index never holds readable text: terms are stored as keyed hashes
+    (HMAC of user id and term), and the subject/sender/date/snippet shown in
+    results is encrypted with the vault's AES-GCM. Searching needs only the
+    query's terms, so it works offline and doesn't touch Gmail. Prefix and
+    substring queries are not supported for the same reason.
+    """
+
+    def __init__(self, path: str, key_hex: str):
+        self.path = path
+        self.key_hex = key_hex
+        self._hash_key = key_hex.encode("utf-8")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_docs ("
+            " doc_id INTEGER PRIMARY KEY,"
+            " user_id TEXT NOT NULL,"
+            " message_id TEXT NOT NULL,"
+            " length INTEGER NOT NULL,"
+            " meta BLOB NOT NULL,"
+            " indexed_at INTEGER NOT NULL,"
+            " UNIQUE (user_id, message_id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_postings ("
+            " user_id TEXT NOT NULL,"
+            " term BLOB NOT NULL,"
+            " doc_id INTEGER NOT NULL,"
+            " tf INTEGER NOT NULL,"
+            " PRIMARY KEY (user_id, term, doc_id)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_postings_doc ON search_postings (doc_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_stats ("
+            " user_id TEXT PRIMARY KEY,"
+            " docs INTEGER NOT NULL,"
+            " total_length INTEGER NOT NULL)"
+        )
+
+    # ---- updates ----
+
+    def add(self, user_id: str, message_id: str, message: Dict) -> None:
+        self.add_many(user_id, {message_id: message})
+
+    def add_many(self, user_id: str, messages: Dict[str, Dict]) -> None:
+        """Index (or re-index) parsed messages: {message_id: {subject, from, body, date, snippet}}."""
+        if not messages:
+            return
+        prepared = []
+        terms: Dict[str, bytes] = {}  # a batch repeats most of its vocabulary; hash each word once
+        for message_id, message in messages.items():
+            counts: Counter = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(message.get(field) or ''):
+                    counts[token] += weight
+            meta = {key: message.get(key) for key in ('subject', 'from', 'date', 'snippet')}
+            postings = []
+            for token, tf in counts.items():
+                term = terms.get(token)
+                if term is None:
+                    term = terms[token] = self._term(user_id, token)
+                postings.append((term, tf))
+            prepared.append((message_id, sum(counts.values()), encrypt_bytes(json.dumps(meta).encode("utf-8"), self.key_hex), postings))
+
+        with self._lock:
+            now = int(time.time() * 1000)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._remove_locked(user_id, [p[0] for p in prepared])
+                rows = []
+                for message_id, length, meta, postings in prepared:
+                    doc_id = self._conn.execute(
+                        "INSERT INTO search_docs (user_id, message_id, length, meta, indexed_at) "
+                        "VALUES (?, ?, ?, ?, ?) RETURNING doc_id",
+                        (user_id, message_id, length, meta, now)
+                    ).fetchone()[0]
+                    rows.extend((user_id, term, doc_id, tf) for term, tf in postings)
+                # Inserting in key order keeps the WITHOUT ROWID b-tree appends local
+                rows.sort(key=lambda row: row[1])
+                self._conn.executemany(
+                    "INSERT INTO search_postings (user_id, term, doc_id, tf) VALUES (?, ?, ?, ?)", rows
+                )
+                self._bump_stats(user_id, len(prepared), sum(p[1] for p in prepared))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def remove(self, user_id: str, message_ids: Iterable[str]) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed = self._remove_locked(user_id, list(message_ids))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    # ---- queries ----
+
+    def search(self, user_id: str, query: str, max_results: int = 20) -> List[Dict]:
+        """Best-matching messages for `query`, highest BM25 score first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            stats = self._conn.execute(
+                "SELECT docs, total_length FROM search_stats WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if not stats or not stats[0]:
+                return []
+            docs, total_length = stats
+            avg_length = total_length / docs
+
+            postings = []
+            for term in terms:
+                rows = self._conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM search_postings p JOIN search_docs d ON d.doc_id = p.doc_id "
+                    "WHERE p.user_id = ? AND p.term = ?",
+                    (user_id, self._term(user_id, term))
+                ).fetchall()
+                postings.append(rows)
+
+            scores: Dict[int, float] = {}
+            for rows in postings:
+                if not rows:
+                    continue
+                idf = math.log(1 + (docs - len(rows) + 0.5) / (len(rows) + 0.5))
+                for doc_id, tf, length in rows:
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+            top = heapq.nlargest(max_results, scores.items(), key=lambda item: item[1])
+            metas = {}
+            for start in range(0, len(top), _SQL_CHUNK):
+                chunk = [doc_id for doc_id, _ in top[start:start + _SQL_CHUNK]]
+                rows = self._conn.execute(
+                    f"SELECT doc_id, message_id, meta FROM search_docs WHERE doc_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                metas.update({doc_id: (message_id, meta) for doc_id, message_id, meta in rows})
+
+        results = []
+        for doc_id, score in top:
+            message_id, meta = metas[doc_id]
+            results.append({
+                "id": message_id,
+                "score": round(score, 4),
+                **json.loads(decrypt_bytes(meta, self.key_hex))
+            })
+        return results
+
+    def count(self, user_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT docs FROM search_stats WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- internals (caller holds self._lock) ----
+
+    def _term(self, user_id: str, token: str) -> bytes:
+        # Per-user keyed hash, so the same word is unlinkable across users
+        return hmac.new(self._hash_key, f"{user_id}\x00{token}".encode("utf-8"), hashlib.sha256).digest()[:12]
+
+    def _remove_locked(self, user_id: str, message_ids: List[str]) -> int:
+        removed = 0
+        for start in range(0, len(message_ids), _SQL_CHUNK):
+            chunk = message_ids[start:start + _SQL_CHUNK]
+            rows = self._conn.execute(
+                f"DELETE FROM search_docs WHERE user_id = ? AND message_id IN ({','.join('?' * len(chunk))}) "
+                "RETURNING doc_id, length",
+                (user_id, *chunk)
+            ).fetchall()
+            if rows:
+                self._conn.executemany("DELETE FROM search_postings WHERE doc_id = ?", [(r[0],) for r in rows])
+                self._bump_stats(user_id, -len(rows), -sum(r[1] for r in rows))
+                removed += len(rows)
+        return removed
+
+    def _bump_stats(self, user_id: str, docs: int, length: int) -> None:
+        self._conn.execute(
+            "INSERT INTO search_stats (user_id, docs, total_length) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET docs = docs + excluded.docs, total_length = total_length + excluded.total_length",
+            (user_id, docs, length)
+        )
@@ -0,0 +1,173 @@
+# hushh_mcp/agents/inbox_agent/service_pool.py
+
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from google.auth.transport.requests import Request as GoogleRequest
+from google.oauth2.credentials import Credentials
+
+from ...cache import TTLCache
+from ...vault.encrypt import seal_record, open_record
+from ...vault.store import CredentialStore
+
+# ==================== Gmail Service Pool ====================
+
+class _PooledService:
+    __slots__ = ("user_id", "version", "creds", "service")
+
+    def __init__(self, user_id: str, version: int, creds: Credentials, service: Any):
+        self.user_id = user_id
+        self.version = version
+        self.creds = creds
+        self.service = service
+
+
+class GmailServicePool:
+    """
+    Bounded per-user pool of built Gmail service objects.
+
+    Entries are keyed by (user_id, credential version) so a credential update
+    from any worker invalidates the pooled service on the next lookup. Entries
+    idle for longer than `idle_ttl_ms` are evicted. A background thread
+    refreshes credentials that are close to expiry, so request handlers
+    normally never pay for a token refresh.
+
+    Builds and refreshes are serialized per user, never pool-wide: a slow
+    discovery-document parse or token refresh for one user doesn't hold up
+    anyone else's pool miss.
+    """
+
+    def __init__(
+        self,
+        store: CredentialStore,
+        master_key: str,
+        scopes: List[str],
+        build_service: Callable[[Credentials], Any],
+        maxsize: int = 256,
+        idle_ttl_ms: int = 15 * 60 * 1000,
+        refresh_margin_ms: int = 5 * 60 * 1000,
+        refresh_interval_s: float = 60.0
+    ):
+        self.store = store
+        self.master_key = master_key
+        self.scopes = scopes
+        self.build_service = build_service
+        self.refresh_margin_ms = refresh_margin_ms
+        self.refresh_interval_s = refresh_interval_s
+        self._entries = TTLCache(maxsize=maxsize, ttl_ms=idle_ttl_ms)
+        self._lock = threading.Lock()  # guards _user_locks and the refresher thread only
+        self._user_locks: Dict[str, threading.Lock] = {}
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def get(self, user_id: str) -> Any:
+        """Return a ready Gmail service for the user, building one only on a pool miss."""
+        self._ensure_refresher()
+
+        version = self.store.version(user_id)
+        if version is None:
+            raise LookupError(f"No Gmail tokens for user {user_id}")
+
+        entry = self._entries.get((user_id, version))
+        if entry is not None and not entry.creds.expired:
+            self._entries.set((user_id, version), entry)  # slide the idle timeout
+            return entry.service
+
+        with self._user_lock(user_id):
+            return self._load(user_id).service
+
+    def invalidate(self, user_id: str) -> None:
+        for key, _ in self._entries.items():
+            if key[0] == user_id:
+                self._entries.pop(key)
+
+    def stats(self):
+        return self._entries.stats()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=1)
+        self._entries.clear()
+
+    # ---- internals ----
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    def _load(self, user_id: str) -> _PooledService:
+        versioned = self.store.get_versioned(user_id)
+        if versioned is None:
+            raise LookupError(f"No Gmail tokens for user {user_id}")
+        record, version = versioned
+
+        cached = self._entries.get((user_id, version))
+        if cached is not None and not cached.creds.expired:
+            return cached  # another request built it while we waited on the lock
+
+        creds = Credentials.from_authorized_user_info(json.loads(open_record(record, self.master_key)), self.scopes)
+        if creds.expired:
+            if not creds.refresh_token:
+                raise PermissionError("Token expired and no refresh token available. Please re-authorize.")
+            print("🔄 Refreshing expired token...")
+            version = self._refresh_and_save(user_id, creds)
+            print("✅ Token refreshed successfully!")
+
+        self.invalidate(user_id)
+        entry = _PooledService(user_id, version, creds, self.build_service(creds))
+        self._entries.set((user_id, version), entry)
+        return entry
+
+    def _refresh_and_save(self, user_id: str, creds: Credentials) -> int:
+        creds.refresh(GoogleRequest())
+        return self.store.put(user_id, seal_record(creds.to_json(), self.master_key))
+
+    def _needs_refresh(self, creds: Credentials) -> bool:
+        if not creds.refresh_token or creds.expiry is None:
+            return False
+        # google-auth keeps expiry as naive UTC
+        return creds.expiry - datetime.utcnow() <= timedelta(milliseconds=self.refresh_margin_ms)
+
+    def refresh_due(self) -> int:
+        """Refresh every pooled credential that expires within the margin. Returns the count."""
+        refreshed = 0
+        for key, entry in self._entries.items():
+            if not self._needs_refresh(entry.creds):
+                continue
+            with self._user_lock(entry.user_id):
+                if self.store.version(entry.user_id) != entry.version:
+                    self._entries.pop(key)  # updated elsewhere; next get() reloads
+                    continue
+                try:
+                    new_version = self._refresh_and_save(entry.user_id, entry.creds)
+                except Exception as e:
+                    print(f"⚠️ Background token refresh failed for {entry.user_id[:8]}: {str(e)}")
+                    continue
+                self._entries.pop(key)
+                if new_version != entry.version + 1:
+                    # Another worker saved credentials while we refreshed; reload them on the next get()
+                    continue
+                # The service object holds this same Credentials instance, so it stays usable.
+                entry.version = new_version
+                self._entries.set((entry.user_id, new_version), entry)
+                refreshed += 1
+        return refreshed
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None or self.refresh_interval_s <= 0:
+            return
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="gmail-token-refresh", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval_s):
+            self._entries.purge_expired()
+            try:
+                self.refresh_due()
+            except Exception as e:
+                print(f"⚠️ Token refresher error: {str(e)}")
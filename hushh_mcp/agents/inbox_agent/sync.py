@@ -0,0 +1,341 @@
+# hushh_mcp/agents/inbox_agent/sync.py
+
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from googleapiclient.errors import HttpError
+
+INBOX_LABEL = 'INBOX'
+CURSOR_PREFIX = 'idx:'
+
+# ==================== Incremental Inbox Sync ====================
+
+class InboxSync:
+    """
+    Keeps a local per-user index of inbox message ids current using Gmail's
+    history API, so listing the inbox costs one history().list call for the
+    deltas instead of a full messages().list.
+
+    The last synced historyId is persisted per user. When Gmail reports the
+    history as expired (404), the user is fully resynced.
+
+    A full resync only seeds the index from the first messages().list page,
+    so it costs two calls on the request path however large the mailbox
+    is. The remaining pages are backfilled one at a time (`backfill`, or
+    `start_backfill` in a background thread); until `is_complete` the
+    caller should keep listing from Gmail. Syncs and backfill steps for the
+    same user are serialized, so concurrent first requests seed once.
+
+    Ordering: a full resync records the messages().list order (newest first),
+    and later additions are keyed by their history record id, which is
+    monotonic and always sorts above the resynced block.
+
+    Deleted messages are also dropped from `search_index`, when given.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        message_cache: Optional[Any] = None,
+        list_page_size: int = 500,
+        search_index: Optional[Any] = None
+    ):
+        self.path = path
+        self.message_cache = message_cache
+        self.search_index = search_index
+        self.list_page_size = list_page_size
+        self._lock = threading.Lock()
+        self._user_locks: Dict[str, threading.Lock] = {}
+        self._backfilling: Set[str] = set()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            " user_id TEXT PRIMARY KEY,"
+            " history_id TEXT NOT NULL,"
+            " synced_at INTEGER NOT NULL,"
+            " backfill_token TEXT,"
+            " backfill_position INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sync_state)")}
+        if 'backfill_token' not in columns:
+            # Indexes written before backfill existed were listed in full
+            self._conn.execute("ALTER TABLE sync_state ADD COLUMN backfill_token TEXT")
+            self._conn.execute("ALTER TABLE sync_state ADD COLUMN backfill_position INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS inbox_index ("
+            " user_id TEXT NOT NULL,"
+            " message_id TEXT NOT NULL,"
+            " sort_key INTEGER NOT NULL,"
+            " PRIMARY KEY (user_id, message_id))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_inbox_order ON inbox_index (user_id, sort_key DESC, message_id DESC)"
+        )
+
+    # ---- sync ----
+
+    def history_id(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT history_id FROM sync_state WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else None
+
+    def is_complete(self, user_id: str) -> bool:
+        """Whether the index holds the whole inbox (synced and fully backfilled)."""
+        state = self._backfill_state(user_id)
+        return state is not None and state[0] is None
+
+    def sync(self, service: Any, user_id: str) -> Dict[str, Any]:
+        """Bring the user's index up to date. Returns counts of what changed."""
+        with self._user_lock(user_id):
+            return self._sync(service, user_id)
+
+    def full_resync(self, service: Any, user_id: str) -> Dict[str, Any]:
+        with self._user_lock(user_id):
+            return self._full_resync(service, user_id)
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    def _sync(self, service: Any, user_id: str) -> Dict[str, Any]:
+        start_history_id = self.history_id(user_id)
+        if start_history_id is None:
+            return self._full_resync(service, user_id)
+
+        try:
+            records, latest_history_id = self._list_history(service, start_history_id)
+        except HttpError as e:
+            if e.resp.status in (404, 410):
+                print(f"🔁 History {start_history_id} expired for {user_id[:8]}, running full resync")
+                return self._full_resync(service, user_id)
+            raise
+
+        added, removed, changed, deleted = self._apply_history(user_id, records, latest_history_id)
+        if self.message_cache is not None and changed:
+            # Cached entries carry labels, so any relabeled or deleted message is dropped
+            self.message_cache.invalidate(user_id, changed)
+        if self.search_index is not None and deleted:
+            self.search_index.remove(user_id, deleted)
+        return {"full_resync": False, "added": added, "removed": removed, "changed": len(changed)}
+
+    def _full_resync(self, service: Any, user_id: str) -> Dict[str, Any]:
+        # Read the history id first so changes made while listing are replayed on the next sync
+        history_id = str(service.users().getProfile(userId='me').execute()['historyId'])
+        message_ids, next_page_token = self._list_page(service, None)
+
+        # Newest first from Gmail -> sort keys 0, -1, -2, ... (below any history id)
+        rows = [(user_id, message_id, -position) for position, message_id in enumerate(message_ids)]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM inbox_index WHERE user_id = ?", (user_id,))
+                self._conn.executemany(
+                    "INSERT INTO inbox_index (user_id, message_id, sort_key) VALUES (?, ?, ?)", rows
+                )
+                self._save_history_id(user_id, history_id)
+                self._save_backfill(user_id, next_page_token, len(rows))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if self.message_cache is not None:
+            # We can't tell which labels changed while history was unavailable
+            self.message_cache.invalidate(user_id)
+        backfill = "older pages pending" if next_page_token else "complete"
+        print(f"📥 Full inbox resync for {user_id[:8]}: {len(rows)} messages, {backfill}")
+        return {"full_resync": True, "added": len(rows), "removed": 0, "changed": 0}
+
+    # ---- backfill ----
+
+    def backfill_page(self, service: Any, user_id: str) -> bool:
+        """Index the next older messages().list page. Returns True while more pages remain."""
+        with self._user_lock(user_id):
+            state = self._backfill_state(user_id)
+            if state is None or state[0] is None:
+                return False
+            page_token, position = state
+
+            message_ids, next_page_token = self._list_page(service, page_token)
+            rows = [(user_id, message_id, -(position + offset)) for offset, message_id in enumerate(message_ids)]
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Ids already indexed (pages shift as mail arrives) keep their place
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO inbox_index (user_id, message_id, sort_key) VALUES (?, ?, ?)", rows
+                    )
+                    self._save_backfill(user_id, next_page_token, position + len(rows))
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            return next_page_token is not None
+
+    def backfill(self, service: Any, user_id: str, max_pages: Optional[int] = None) -> int:
+        """Backfill up to `max_pages` pages (all by default). Returns the number of pages listed."""
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            state = self._backfill_state(user_id)
+            if state is None or state[0] is None:
+                break
+            pages += 1
+            if not self.backfill_page(service, user_id):
+                break
+        return pages
+
+    def start_backfill(self, service: Any, user_id: str) -> bool:
+        """Backfill in a background thread unless one is already running for the user."""
+        with self._lock:
+            if user_id in self._backfilling:
+                return False
+            self._backfilling.add(user_id)
+
+        def run():
+            try:
+                pages = self.backfill(service, user_id)
+                print(f"📥 Inbox backfill for {user_id[:8]} finished: {pages} pages, {self.count(user_id)} messages")
+            except Exception as e:
+                print(f"⚠️ Inbox backfill failed for {user_id[:8]}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._backfilling.discard(user_id)
+
+        threading.Thread(target=run, name=f"inbox-backfill-{user_id[:8]}", daemon=True).start()
+        return True
+
+    def _backfill_state(self, user_id: str) -> Optional[Tuple[Optional[str], int]]:
+        """(next page token or None when done, next position), or None before the first sync."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT backfill_token, backfill_position FROM sync_state WHERE user_id = ?", (user_id,)
+            ).fetchone()
+
+    def _list_page(self, service: Any, page_token: Optional[str]) -> Tuple[List[str], Optional[str]]:
+        params = {'userId': 'me', 'labelIds': [INBOX_LABEL], 'maxResults': self.list_page_size}
+        if page_token:
+            params['pageToken'] = page_token
+        results = service.users().messages().list(**params).execute()
+        return list(dict.fromkeys(m['id'] for m in results.get('messages', []))), results.get('nextPageToken')
+
+    def _list_history(self, service: Any, start_history_id: str) -> Tuple[List[Dict], str]:
+        records: List[Dict] = []
+        latest = start_history_id
+        page_token = None
+        while True:
+            params = {
+                'userId': 'me',
+                'startHistoryId': start_history_id,
+                'historyTypes': ['messageAdded', 'messageDeleted', 'labelAdded', 'labelRemoved']
+            }
+            if page_token:
+                params['pageToken'] = page_token
+            response = service.users().history().list(**params).execute()
+            records.extend(response.get('history', []))
+            latest = str(response.get('historyId', latest))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return records, latest
+
+    def _apply_history(self, user_id: str, records: List[Dict], latest_history_id: str) -> Tuple[int, int, List[str], List[str]]:
+        added = removed = 0
+        changed: Dict[str, None] = {}
+        deleted: Dict[str, None] = {}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for record in records:
+                    sort_key = int(record['id'])
+                    for item in record.get('messagesAdded', []):
+                        message = item['message']
+                        if INBOX_LABEL in message.get('labelIds', []):
+                            added += self._index_add(user_id, message['id'], sort_key)
+                    for item in record.get('labelsAdded', []):
+                        changed[item['message']['id']] = None
+                        if INBOX_LABEL in item.get('labelIds', []):
+                            added += self._index_add(user_id, item['message']['id'], sort_key)
+                    for item in record.get('labelsRemoved', []):
+                        changed[item['message']['id']] = None
+                        if INBOX_LABEL in item.get('labelIds', []):
+                            removed += self._index_remove(user_id, item['message']['id'])
+                    for item in record.get('messagesDeleted', []):
+                        changed[item['message']['id']] = None
+                        deleted[item['message']['id']] = None
+                        removed += self._index_remove(user_id, item['message']['id'])
+                self._save_history_id(user_id, latest_history_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added, removed, list(changed), list(deleted)
+
+    def _index_add(self, user_id: str, message_id: str, sort_key: int) -> int:
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO inbox_index (user_id, message_id, sort_key) VALUES (?, ?, ?)",
+            (user_id, message_id, sort_key)
+        )
+        return cursor.rowcount
+
+    def _index_remove(self, user_id: str, message_id: str) -> int:
+        cursor = self._conn.execute(
+            "DELETE FROM inbox_index WHERE user_id = ? AND message_id = ?", (user_id, message_id)
+        )
+        return cursor.rowcount
+
+    def _save_history_id(self, user_id: str, history_id: str) -> None:
+        self._conn.execute(
+            "INSERT INTO sync_state (user_id, history_id, synced_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET history_id = excluded.history_id, synced_at = excluded.synced_at",
+            (user_id, history_id, int(time.time() * 1000))
+        )
+
+    def _save_backfill(self, user_id: str, page_token: Optional[str], position: int) -> None:
+        self._conn.execute(
+            "UPDATE sync_state SET backfill_token = ?, backfill_position = ? WHERE user_id = ?",
+            (page_token, position, user_id)
+        )
+
+    # ---- reads ----
+
+    def page(self, user_id: str, max_results: int, cursor: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        One page of inbox message ids, newest first. `cursor` is the opaque
+        `idx:` token returned by the previous page; it stays stable when new
+        mail arrives between page loads.
+        """
+        params: Tuple = (user_id,)
+        where = "user_id = ?"
+        if cursor:
+            sort_key, message_id = _decode_cursor(cursor)
+            where += " AND (sort_key < ? OR (sort_key = ? AND message_id < ?))"
+            params += (sort_key, sort_key, message_id)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT message_id, sort_key FROM inbox_index WHERE {where} "
+                "ORDER BY sort_key DESC, message_id DESC LIMIT ?",
+                params + (max_results + 1,)
+            ).fetchall()
+
+        has_more = len(rows) > max_results
+        rows = rows[:max_results]
+        next_cursor = f"{CURSOR_PREFIX}{rows[-1][1]}:{rows[-1][0]}" if has_more else None
+        return [r[0] for r in rows], next_cursor
+
+    def count(self, user_id: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM inbox_index WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def is_index_cursor(page_token: Optional[str]) -> bool:
+    return bool(page_token) and page_token.startswith(CURSOR_PREFIX)
+
+def _decode_cursor(cursor: str) -> Tuple[int, str]:
+    sort_key, message_id = cursor[len(CURSOR_PREFIX):].split(':', 1)
+    return int(sort_key), message_id
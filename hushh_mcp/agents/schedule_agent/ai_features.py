@@ -4,10 +4,11 @@ Part of the Hushh Modular Consent Protocol (MCP)
 """
 
 import logging
-import openai
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+from hushh_mcp.llm.client import get_llm_client
+
 logger = logging.getLogger(__name__)
 
 class ScheduleAIFeatures:
@@ -16,11 +17,10 @@ class ScheduleAIFeatures:
         self.api_key = api_key
         self.logger = logging.getLogger(__name__)
         
-        # Configure OpenAI if API key is provided
-        if api_key:
-            openai.api_key = api_key
+        # All completions go through the shared async client (concurrency limits, timeouts, retries)
+        self.llm = get_llm_client(api_key)
 
-    def optimize_schedule(self, events: List[Dict], user_preferences: Dict) -> Dict:
+    async def optimize_schedule(self, events: List[Dict], user_preferences: Dict, user_id: Optional[str] = None) -> Dict:
         """Optimize schedule using AI analysis."""
         try:
             # Prepare event data for analysis
@@ -55,15 +55,15 @@ class ScheduleAIFeatures:
             - adjustments: array of objects with 'type' and 'description'
             """
             
-            if self.api_key:
-                response = openai.chat.completions.create(
-                    model="gpt-3.5-turbo",
+            if self.llm.available:
+                result = await self.llm.complete(
                     messages=[{"role": "user", "content": prompt}],
+                    model="gpt-3.5-turbo",
+                    user_id=user_id,
                     temperature=0.3
                 )
                 
                 # Parse JSON response
-                result = response.choices[0].message.content
                 import json
                 return json.loads(result)
             else:
@@ -73,7 +73,7 @@ class ScheduleAIFeatures:
             self.logger.error(f"Error optimizing schedule: {str(e)}")
             return self._generate_fallback_optimization(events, user_preferences)
 
-    def suggest_meeting_times(self, busy_times: List[Dict], duration: int, preferences: Dict) -> List[Dict]:
+    async def suggest_meeting_times(self, busy_times: List[Dict], duration: int, preferences: Dict, user_id: Optional[str] = None) -> List[Dict]:
         """Suggest optimal meeting times using AI."""
         try:
             # Prepare busy times data
@@ -106,15 +106,15 @@ class ScheduleAIFeatures:
             - reason: string explaining why this time is optimal
             """
             
-            if self.api_key:
-                response = openai.chat.completions.create(
-                    model="gpt-3.5-turbo",
+            if self.llm.available:
+                result = await self.llm.complete(
                     messages=[{"role": "user", "content": prompt}],
+                    model="gpt-3.5-turbo",
+                    user_id=user_id,
                     temperature=0.3
                 )
                 
                 # Parse JSON response
-                result = response.choices[0].message.content
                 import json
                 return json.loads(result)
             else:
@@ -124,7 +124,7 @@ class ScheduleAIFeatures:
             self.logger.error(f"Error suggesting meeting times: {str(e)}")
             return self._generate_fallback_suggestions(busy_times, duration, preferences)
 
-    def analyze_patterns(self, events: List[Dict]) -> Dict:
+    async def analyze_patterns(self, events: List[Dict], user_id: Optional[str] = None) -> Dict:
         """Analyze scheduling patterns using AI."""
         try:
             # Prepare event data for pattern analysis
@@ -164,15 +164,15 @@ class ScheduleAIFeatures:
             - recommendations: array of strings with optimization suggestions
             """
             
-            if self.api_key:
-                response = openai.chat.completions.create(
-                    model="gpt-3.5-turbo",
+            if self.llm.available:
+                result = await self.llm.complete(
                     messages=[{"role": "user", "content": prompt}],
+                    model="gpt-3.5-turbo",
+                    user_id=user_id,
                     temperature=0.3
                 )
                 
                 # Parse JSON response
-                result = response.choices[0].message.content
                 import json
                 return json.loads(result)
             else:
@@ -182,7 +182,7 @@ class ScheduleAIFeatures:
             self.logger.error(f"Error analyzing patterns: {str(e)}")
             return self._generate_fallback_pattern_analysis(events)
 
-    def detect_conflicts(self, new_event: Dict, existing_events: List[Dict]) -> List[Dict]:
+    async def detect_conflicts(self, new_event: Dict, existing_events: List[Dict], user_id: Optional[str] = None) -> List[Dict]:
         """Detect scheduling conflicts using AI."""
         try:
             # Prepare event data
@@ -218,15 +218,15 @@ class ScheduleAIFeatures:
             - recommendations: array of strings with resolution suggestions
             """
             
-            if self.api_key:
-                response = openai.chat.completions.create(
-                    model="gpt-3.5-turbo",
+            if self.llm.available:
+                result = await self.llm.complete(
                     messages=[{"role": "user", "content": prompt}],
+                    model="gpt-3.5-turbo",
+                    user_id=user_id,
                     temperature=0.3
                 )
                 
                 # Parse JSON response
-                result = response.choices[0].message.content
                 import json
                 return json.loads(result)
             else:
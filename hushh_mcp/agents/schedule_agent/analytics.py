@@ -0,0 +1,75 @@
+# hushh_mcp/agents/schedule_agent/analytics.py
+
+from datetime import timedelta
+from typing import Dict, Iterable
+
+# Gaps listed in an optimization report; the total is always counted
+MAX_REPORTED_GAPS = 50
+
+# ==================== Streaming Calendar Analytics ====================
+# Both functions take normalized events (see event_store.normalize_event)
+# in start order and make a single pass, keeping only running totals, so a
+# year of events costs no more memory than a week.
+
+def schedule_analysis(
+    events: Iterable[Dict],
+    min_gap: timedelta = timedelta(minutes=30),
+    max_gaps: int = MAX_REPORTED_GAPS
+) -> Dict:
+    """Meeting count, total duration and the gaps longer than `min_gap` between consecutive events."""
+    meeting_count = 0
+    total_duration = timedelta()
+    gaps = []
+    gap_count = 0
+    previous = None
+
+    for event in events:
+        meeting_count += 1
+        total_duration += event['end'] - event['start']
+
+        if previous is not None:
+            gap = event['start'] - previous['end']
+            if gap > min_gap:
+                gap_count += 1
+                if len(gaps) < max_gaps:
+                    gaps.append({
+                        'start': previous['end'].isoformat(),
+                        'end': event['start'].isoformat(),
+                        'duration': gap.total_seconds() / 60
+                    })
+        previous = event
+
+    return {
+        'meeting_count': meeting_count,
+        'total_duration': total_duration,
+        'gap_count': gap_count,
+        'gaps': gaps
+    }
+
+def scheduling_patterns(events: Iterable[Dict]) -> Dict:
+    """Hour and weekday distributions of timed events, in each event's own offset."""
+    hour_counts = {}
+    day_counts = {}
+    duration_sum = 0
+    duration_count = 0
+    total_events = 0
+
+    for event in events:
+        total_events += 1
+        if event['all_day']:
+            continue
+        hour = event['start'].hour
+        day = event['start'].strftime('%A')
+        hour_counts[hour] = hour_counts.get(hour, 0) + 1
+        day_counts[day] = day_counts.get(day, 0) + 1
+        duration_sum += (event['end'] - event['start']).total_seconds() / 60  # minutes
+        duration_count += 1
+
+    return {
+        "most_common_hour": max(hour_counts, key=hour_counts.get) if hour_counts else 9,
+        "most_common_day": max(day_counts, key=day_counts.get) if day_counts else 'Monday',
+        "avg_duration_minutes": int(duration_sum / duration_count) if duration_count > 0 else 60,
+        "total_events": total_events,
+        "hour_distribution": hour_counts,
+        "day_distribution": day_counts
+    }
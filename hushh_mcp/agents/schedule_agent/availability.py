@@ -0,0 +1,120 @@
+# hushh_mcp/agents/schedule_agent/availability.py
+
+from bisect import bisect_right
+from datetime import datetime, timezone, tzinfo
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Half-open [start, end) intervals in epoch milliseconds
+Interval = Tuple[int, int]
+
+MINUTE_MS = 60_000
+
+# ==================== Parsing ====================
+
+def parse_instant(value: str, default_tz: tzinfo = timezone.utc) -> int:
+    """
+    ISO 8601 timestamp (or bare date) -> epoch ms. Values without an offset
+    are taken to be in `default_tz`, matching how the agent has always sent
+    `datetime.now().isoformat() + 'Z'` to the Calendar API.
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=default_tz)
+    return int(parsed.timestamp() * 1000)
+
+def parse_intervals(items: Iterable[Dict], default_tz: tzinfo = timezone.utc) -> List[Interval]:
+    """Parse [{start, end}, ...] once; empty or inverted ranges are dropped."""
+    intervals = []
+    for item in items:
+        start = parse_instant(item['start'], default_tz)
+        end = parse_instant(item['end'], default_tz)
+        if end > start:
+            intervals.append((start, end))
+    return intervals
+
+def format_instant(ms: int, tz: tzinfo = timezone.utc) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz).isoformat()
+
+# ==================== Interval Algebra ====================
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and sweep overlapping or touching intervals into disjoint ones."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def complement(busy: Sequence[Interval], window_start: int, window_end: int) -> List[Interval]:
+    """Gaps of merged, sorted `busy` inside [window_start, window_end)."""
+    free = []
+    cursor = window_start
+    for start, end in busy:
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < window_end:
+        free.append((cursor, window_end))
+    return free
+
+def intersect(a: Sequence[Interval], b: Sequence[Interval]) -> List[Interval]:
+    """Two-pointer intersection of two merged, sorted interval lists."""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+def overlaps_any(merged: Sequence[Interval], start: int, end: int) -> bool:
+    """Whether [start, end) overlaps merged, sorted intervals; O(log n)."""
+    i = bisect_right(merged, (start, float('inf'))) - 1
+    if i >= 0 and merged[i][1] > start:
+        return True
+    return i + 1 < len(merged) and merged[i + 1][0] < end
+
+# ==================== Free Slots ====================
+
+def free_slots(
+    busy: Iterable[Interval],
+    window_start: int,
+    window_end: int,
+    duration_ms: int,
+    step_ms: int = 30 * MINUTE_MS,
+    preferred: Optional[Iterable[Interval]] = None
+) -> List[Interval]:
+    """
+    Meeting slots of `duration_ms` that start on the `step_ms` grid anchored
+    at `window_start`, overlap nothing in `busy` and, when `preferred` is
+    given, lie entirely inside the (merged) preferred windows.
+
+    Busy and preferred intervals are merged once and intersected with a
+    sweep, so the cost is O(n log n) in the number of intervals plus the
+    number of slots returned, instead of testing every grid step against
+    every busy block.
+    """
+    free = complement(merge_intervals(busy), window_start, window_end)
+    if preferred is not None:
+        free = intersect(free, merge_intervals(preferred))
+
+    slots = []
+    for start, end in free:
+        # First grid point at or after the start of this free interval
+        slot = window_start + -(-(start - window_start) // step_ms) * step_ms
+        while slot + duration_ms <= end:
+            slots.append((slot, slot + duration_ms))
+            slot += step_ms
+    return slots
@@ -0,0 +1,277 @@
+# hushh_mcp/agents/schedule_agent/bitmap.py
+
+from datetime import datetime, timedelta, tzinfo
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pytz
+
+from .availability import MINUTE_MS, Interval, format_instant, merge_intervals
+
+try:
+    import numpy as np  # optional: vectorized masks when installed
+except ImportError:
+    np = None
+
+HOUR_MS = 60 * MINUTE_MS
+DAY_MS = 24 * HOUR_MS
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Score = hour preference + day preference + a small bonus for sooner slots
+SCORE_WEIGHTS = {"hour": 0.6, "day": 0.3, "soon": 0.1}
+
+TimezoneLike = Union[str, int, tzinfo, None]
+
+def resolve_timezone(value: TimezoneLike):
+    """IANA name, fixed offset in minutes, tzinfo, or None (UTC)."""
+    if value is None:
+        return pytz.utc
+    if isinstance(value, int):
+        return pytz.FixedOffset(value)
+    if isinstance(value, str):
+        return pytz.timezone(value)
+    return value
+
+# ==================== Slot Grid ====================
+
+class SlotGrid:
+    """
+    A horizon cut into fixed-size slots: slot i covers
+    [start_ms + i * slot_ms, start_ms + (i + 1) * slot_ms).
+    """
+
+    def __init__(self, start_ms: int, days: int, slot_minutes: int = 15):
+        if (24 * 60) % slot_minutes:
+            raise ValueError("slot_minutes must divide a day")
+        self.start_ms = start_ms
+        self.slot_ms = slot_minutes * MINUTE_MS
+        self.size = days * 24 * 60 // slot_minutes
+
+    def busy_ranges(self, intervals: Sequence[Interval]) -> List[Tuple[int, int]]:
+        """Slots touched by any interval (a partly busy slot is busy)."""
+        ranges = []
+        for start, end in intervals:
+            first = max(0, (start - self.start_ms) // self.slot_ms)
+            last = min(self.size, -(-(end - self.start_ms) // self.slot_ms))
+            if last > first:
+                ranges.append((first, last))
+        return ranges
+
+    def inside_ranges(self, intervals: Sequence[Interval]) -> List[Tuple[int, int]]:
+        """Slots lying entirely inside an interval."""
+        ranges = []
+        for start, end in intervals:
+            first = max(0, -(-(start - self.start_ms) // self.slot_ms))
+            last = min(self.size, (end - self.start_ms) // self.slot_ms)
+            if last > first:
+                ranges.append((first, last))
+        return ranges
+
+    def working_intervals(
+        self,
+        tz,
+        hours: Tuple[int, int] = (9, 17),
+        weekdays: Sequence[int] = (0, 1, 2, 3, 4)
+    ) -> List[Interval]:
+        """Working hours on each local day of the horizon, in epoch ms (DST-aware)."""
+        first_day = datetime.fromtimestamp(self.start_ms / 1000, tz).date() - timedelta(days=1)
+        last_day = datetime.fromtimestamp((self.start_ms + self.size * self.slot_ms) / 1000, tz).date()
+        intervals = []
+        day = first_day
+        while day <= last_day:
+            if day.weekday() in weekdays:
+                start = _local_ms(tz, datetime(day.year, day.month, day.day, hours[0]))
+                end = _local_ms(tz, datetime(day.year, day.month, day.day) + timedelta(hours=hours[1]))
+                intervals.append((start, end))
+            day += timedelta(days=1)
+        return intervals
+
+    def local_offsets(self, tz) -> List[int]:
+        """UTC offset (ms) at every hour of the horizon, for hour/day-of-week lookups."""
+        def offset(hour: int) -> int:
+            moment = datetime.fromtimestamp((self.start_ms + hour * HOUR_MS) / 1000, tz)
+            return int(moment.utcoffset().total_seconds() * 1000)
+
+        hours = -(-self.size * self.slot_ms // HOUR_MS)
+        offsets: List[int] = []
+        for first in range(0, hours, 24):
+            last = min(first + 24, hours)
+            # Offsets change at most once a day; only look up every hour where they do
+            if offset(first) == offset(last - 1):
+                offsets.extend([offset(first)] * (last - first))
+            else:
+                offsets.extend(offset(h) for h in range(first, last))
+        return offsets
+
+def _local_ms(tz, naive: datetime) -> int:
+    localize = getattr(tz, "localize", None)
+    aware = localize(naive) if localize else naive.replace(tzinfo=tz)
+    return int(aware.timestamp() * 1000)
+
+# ==================== Preference Scoring ====================
+
+def preference_weights(preferences: Optional[Dict]) -> Tuple[List[float], List[float]]:
+    """
+    Normalized weights per hour (0-23) and weekday (Monday=0) from the
+    distributions returned by get_preferences.
+    """
+    preferences = preferences or {}
+    hours = [0.0] * 24
+    for hour, count in (preferences.get("hour_distribution") or {}).items():
+        hours[int(hour) % 24] = float(count)
+    days = [0.0] * 7
+    for day, count in (preferences.get("day_distribution") or {}).items():
+        if day in WEEKDAYS:
+            days[WEEKDAYS.index(day)] = float(count)
+    hour_peak, day_peak = max(hours) or 1.0, max(days) or 1.0
+    return [h / hour_peak for h in hours], [d / day_peak for d in days]
+
+# ==================== Group Availability ====================
+
+def find_group_slots(
+    participants: Sequence[Dict],
+    start_ms: int,
+    days: int,
+    duration_minutes: int,
+    slot_minutes: int = 15,
+    step_minutes: int = 30,
+    preferences: Optional[Dict] = None,
+    timezone_name: TimezoneLike = None,
+    max_results: int = 10,
+    use_numpy: Optional[bool] = None
+) -> List[Dict]:
+    """
+    Ranked meeting slots when every participant is free and inside their
+    own working hours.
+
+    Each participant is {"busy": [(start_ms, end_ms), ...], "timezone":
+    "Asia/Kolkata", "working_hours": (9, 17), "weekdays": (0, ..., 4)};
+    "working_hours": None means any time. Availability is a bitmap at
+    `slot_minutes` granularity: everyone's busy blocks are OR-ed into one
+    mask, and each distinct working-hours pattern (timezone, hours,
+    weekdays) is built once and AND-ed in, so 50 calendars over a month
+    cost a few mask operations. Candidate starts sit on a `step_minutes`
+    grid and are scored against the user's preferred hours and days (in
+    `timezone_name`), earliest first on ties.
+
+    With NumPy installed the masks are boolean arrays; otherwise the same
+    algorithm runs on Python integers used as bitsets.
+
+    Raises ValueError for an empty team or a duration, slot or step under
+    one minute.
+    """
+    if not participants:
+        raise ValueError("at least one participant is required")
+    if min(duration_minutes, slot_minutes, step_minutes) < 1:
+        raise ValueError("duration_minutes, slot_minutes and step_minutes must be at least 1")
+    grid = SlotGrid(start_ms, days, slot_minutes)
+    length = -(-duration_minutes // slot_minutes)
+    step = max(1, step_minutes // slot_minutes)
+    if length > grid.size:
+        return []
+
+    busy: List[Interval] = []
+    working: Dict[Tuple, List[Tuple[int, int]]] = {}
+    for participant in participants:
+        busy.extend(participant.get("busy", []))
+        hours = participant.get("working_hours", (9, 17))
+        weekdays = tuple(participant.get("weekdays", (0, 1, 2, 3, 4)))
+        key = (participant.get("timezone"), tuple(hours) if hours is not None else None, weekdays)
+        if key in working:
+            continue
+        if hours is None:
+            working[key] = [(0, grid.size)]
+        else:
+            intervals = grid.working_intervals(resolve_timezone(key[0]), key[1], weekdays)
+            working[key] = grid.inside_ranges(intervals)
+
+    numpy_engine = np is not None if use_numpy is None else use_numpy
+    starts = (_numpy_starts if numpy_engine else _bitset_starts)(grid, busy, list(working.values()), length, step)
+
+    tz = resolve_timezone(timezone_name)
+    hour_weights, day_weights = preference_weights(preferences)
+    offsets = grid.local_offsets(tz)
+    ranked = (_numpy_rank if numpy_engine else _bitset_rank)(
+        grid, starts, offsets, hour_weights, day_weights, max_results
+    )
+    return [
+        {
+            "start": format_instant(grid.start_ms + slot * grid.slot_ms, tz),
+            "end": format_instant(grid.start_ms + slot * grid.slot_ms + duration_minutes * MINUTE_MS, tz),
+            "score": round(score, 3)
+        }
+        for slot, score in ranked
+    ]
+
+def _slot_score(grid: SlotGrid, slot: int, offsets: List[int], hour_weights, day_weights) -> float:
+    utc_ms = grid.start_ms + slot * grid.slot_ms
+    local_ms = utc_ms + offsets[slot * grid.slot_ms // HOUR_MS]
+    hour = local_ms // HOUR_MS % 24
+    weekday = (local_ms // DAY_MS + 3) % 7  # 1970-01-01 was a Thursday
+    return (SCORE_WEIGHTS["hour"] * hour_weights[hour] + SCORE_WEIGHTS["day"] * day_weights[weekday]
+            + SCORE_WEIGHTS["soon"] * (1 - slot / grid.size))
+
+# ---- integer bitsets ----
+
+def _bitset(ranges: List[Tuple[int, int]]) -> int:
+    mask = 0
+    for first, last in ranges:
+        mask |= ((1 << (last - first)) - 1) << first
+    return mask
+
+def _bitset_starts(grid, busy, working, length, step) -> List[int]:
+    free = ((1 << grid.size) - 1) & ~_bitset(grid.busy_ranges(merge_intervals(busy)))
+    for ranges in working:
+        free &= _bitset(ranges)
+    # Bit s survives when slots s .. s+length-1 are all free (doubling shifts)
+    span = 1
+    while span < length:
+        shift = min(span, length - span)
+        free &= free >> shift
+        span += shift
+    free &= (1 << (grid.size - length + 1)) - 1
+    free &= int(("0" * (step - 1) + "1") * -(-grid.size // step), 2)  # every step-th bit from bit 0
+
+    starts = []
+    while free:
+        low = free & -free
+        starts.append(low.bit_length() - 1)
+        free ^= low
+    return starts
+
+def _bitset_rank(grid, starts, offsets, hour_weights, day_weights, max_results):
+    scored = [(slot, _slot_score(grid, slot, offsets, hour_weights, day_weights)) for slot in starts]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:max_results]
+
+# ---- NumPy boolean arrays ----
+
+def _numpy_mask(size: int, firsts, lasts):
+    # +1 at each range start, -1 at each end; a running sum > 0 is "inside"
+    diff = np.bincount(firsts, minlength=size + 1) - np.bincount(lasts, minlength=size + 1)
+    return np.cumsum(diff[:size]) > 0
+
+def _numpy_starts(grid, busy, working, length, step):
+    intervals = np.asarray(busy, dtype=np.int64).reshape(-1, 2) - grid.start_ms
+    firsts = np.clip(intervals[:, 0] // grid.slot_ms, 0, grid.size)
+    lasts = np.clip(-(-intervals[:, 1] // grid.slot_ms), 0, grid.size)
+    keep = lasts > firsts
+    free = ~_numpy_mask(grid.size, firsts[keep], lasts[keep])
+    for ranges in working:
+        bounds = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+        free &= _numpy_mask(grid.size, bounds[:, 0], bounds[:, 1])
+
+    runs = np.concatenate(([0], np.cumsum(free, dtype=np.int64)))
+    fits = runs[length:] - runs[:-length] == length
+    return np.flatnonzero(fits[::step]) * step
+
+def _numpy_rank(grid, starts, offsets, hour_weights, day_weights, max_results):
+    starts = np.asarray(starts, dtype=np.int64)
+    utc_ms = grid.start_ms + starts * grid.slot_ms
+    local_ms = utc_ms + np.asarray(offsets, dtype=np.int64)[starts * grid.slot_ms // HOUR_MS]
+    hours = local_ms // HOUR_MS % 24
+    weekdays = (local_ms // DAY_MS + 3) % 7
+    scores = (SCORE_WEIGHTS["hour"] * np.asarray(hour_weights)[hours]
+              + SCORE_WEIGHTS["day"] * np.asarray(day_weights)[weekdays]
+              + SCORE_WEIGHTS["soon"] * (1 - starts / grid.size))
+    order = np.lexsort((starts, -scores))[:max_results]
+    return [(int(starts[i]), float(scores[i])) for i in order]
@@ -0,0 +1,347 @@
+# hushh_mcp/agents/schedule_agent/event_store.py
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+from ...vault.encrypt import encrypt_bytes, decrypt_bytes
+from .availability import format_instant, parse_instant
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Events per Calendar API page (the API default; it allows up to 2500)
+EVENTS_PAGE_SIZE = 250
+
+def event_bounds(event: Dict) -> Tuple[int, int]:
+    """(start_ms, end_ms) of a Calendar event; all-day events run from midnight UTC."""
+    start = event['start'].get('dateTime') or event['start']['date']
+    end = event.get('end', {}).get('dateTime') or event.get('end', {}).get('date') or start
+    return parse_instant(start), parse_instant(end)
+
+def _event_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+def normalize_event(event: Dict) -> Dict:
+    """
+    Calendar event -> {id, summary, all_day, start, end, start_ms, end_ms}.
+    start/end are aware datetimes in the event's own offset; all-day
+    events run from midnight UTC.
+    """
+    start = event['start'].get('dateTime') or event['start']['date']
+    end = event.get('end', {}).get('dateTime') or event.get('end', {}).get('date') or start
+    start_time, end_time = _event_time(start), _event_time(end)
+    return {
+        'id': event.get('id'),
+        'summary': event.get('summary', 'No Title'),
+        'all_day': 'dateTime' not in event['start'],
+        'start': start_time,
+        'end': end_time,
+        'start_ms': int(start_time.timestamp() * 1000),
+        'end_ms': int(end_time.timestamp() * 1000)
+    }
+
+def iter_api_events(
+    service: Any,
+    time_min_ms: int,
+    time_max_ms: int,
+    calendar_id: str = 'primary',
+    page_size: int = EVENTS_PAGE_SIZE
+) -> Iterator[Dict]:
+    """
+    Events overlapping the window straight from the Calendar API, in start
+    order. Pages are fetched lazily: the next one is requested only once
+    the consumer has worked through the current one.
+    """
+    page_token = None
+    while True:
+        request = {
+            'calendarId': calendar_id,
+            'timeMin': format_instant(time_min_ms),
+            'timeMax': format_instant(time_max_ms),
+            'singleEvents': True,
+            'orderBy': 'startTime',
+            'maxResults': page_size
+        }
+        if page_token:
+            request['pageToken'] = page_token
+        response = service.events().list(**request).execute()
+        yield from response.get('items', [])
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return
+
+# ==================== Incremental Calendar Sync ====================
+
+class CalendarEventStore:
+    """
+    Local per-user copy of calendar events, kept current with the Calendar
+    API's incremental sync: after one full listing, each sync asks only for
+    what changed since the stored syncToken. Changed events are upserted
+    and cancelled (deleted) ones removed. When Google reports the token as
+    expired (410 Gone) the calendar is fully resynced.
+
+    The first sync covers events from `lookback_days` ago onwards; that
+    lower bound is recorded, and `covers` tells callers whether a window
+    can be answered locally or needs the API. Event bodies are encrypted
+    with the vault's AES-GCM; only the ids and the start/end times used for
+    window queries are stored in clear. `refresh` skips the API entirely if
+    the calendar was synced within `min_sync_interval_ms`, and syncs of the
+    same calendar are serialized so concurrent first requests run one full
+    resync, not several.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        key_hex: str,
+        page_size: int = EVENTS_PAGE_SIZE,
+        lookback_days: int = 90,
+        min_sync_interval_ms: int = 30 * 1000
+    ):
+        self.path = path
+        self.key_hex = key_hex
+        self.page_size = page_size
+        self.lookback_days = lookback_days
+        self.min_sync_interval_ms = min_sync_interval_ms
+        self._lock = threading.Lock()
+        self._sync_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS calendar_sync_state ("
+            " user_id TEXT NOT NULL,"
+            " calendar_id TEXT NOT NULL,"
+            " sync_token TEXT,"
+            " synced_at INTEGER NOT NULL,"
+            " synced_from INTEGER,"
+            " PRIMARY KEY (user_id, calendar_id))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(calendar_sync_state)")}
+        if 'synced_from' not in columns:
+            # Stores created before the bound was recorded; NULL means "resync before trusting"
+            self._conn.execute("ALTER TABLE calendar_sync_state ADD COLUMN synced_from INTEGER")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS calendar_events ("
+            " user_id TEXT NOT NULL,"
+            " calendar_id TEXT NOT NULL,"
+            " event_id TEXT NOT NULL,"
+            " start_ms INTEGER NOT NULL,"
+            " end_ms INTEGER NOT NULL,"
+            " data BLOB NOT NULL,"
+            " PRIMARY KEY (user_id, calendar_id, event_id))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_calendar_events_start ON calendar_events (user_id, calendar_id, start_ms)"
+        )
+
+    # ---- sync ----
+
+    def _state(self, user_id: str, calendar_id: str) -> Optional[Tuple[Optional[str], int, Optional[int]]]:
+        """(sync_token, synced_at, synced_from) of a calendar, or None before its first sync."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT sync_token, synced_at, synced_from FROM calendar_sync_state "
+                "WHERE user_id = ? AND calendar_id = ?",
+                (user_id, calendar_id)
+            ).fetchone()
+
+    def sync_token(self, user_id: str, calendar_id: str = 'primary') -> Optional[str]:
+        state = self._state(user_id, calendar_id)
+        return state[0] if state else None
+
+    def covers(self, user_id: str, time_min_ms: int, calendar_id: str = 'primary') -> bool:
+        """Whether the stored copy reaches back to time_min_ms (everything later is always synced)."""
+        state = self._state(user_id, calendar_id)
+        return bool(state) and state[2] is not None and time_min_ms >= state[2]
+
+    def refresh(self, service: Any, user_id: str, calendar_id: str = 'primary') -> Optional[Dict[str, Any]]:
+        """Sync unless the calendar was synced recently. Returns the sync counts, or None if skipped."""
+        if self._recently_synced(user_id, calendar_id):
+            return None
+        with self._sync_lock(user_id, calendar_id):
+            # Another request may have synced while this one waited for the lock
+            if self._recently_synced(user_id, calendar_id):
+                return None
+            return self._sync(service, user_id, calendar_id)
+
+    def sync(self, service: Any, user_id: str, calendar_id: str = 'primary') -> Dict[str, Any]:
+        """Bring the stored calendar up to date. Returns counts of what changed."""
+        with self._sync_lock(user_id, calendar_id):
+            return self._sync(service, user_id, calendar_id)
+
+    def full_resync(self, service: Any, user_id: str, calendar_id: str = 'primary') -> Dict[str, Any]:
+        with self._sync_lock(user_id, calendar_id):
+            return self._full_resync(service, user_id, calendar_id)
+
+    def _sync_lock(self, user_id: str, calendar_id: str) -> threading.Lock:
+        with self._lock:
+            return self._sync_locks.setdefault((user_id, calendar_id), threading.Lock())
+
+    def _recently_synced(self, user_id: str, calendar_id: str) -> bool:
+        state = self._state(user_id, calendar_id)
+        return bool(state) and state[2] is not None and int(time.time() * 1000) - state[1] < self.min_sync_interval_ms
+
+    def _sync(self, service: Any, user_id: str, calendar_id: str) -> Dict[str, Any]:
+        state = self._state(user_id, calendar_id)
+        if state is None or state[0] is None or state[2] is None:
+            return self._full_resync(service, user_id, calendar_id)
+        token = state[0]
+
+        try:
+            items, next_token = self._list_changes(service, calendar_id, syncToken=token)
+        except HttpError as e:
+            if e.resp.status == 410:
+                print(f"🔁 Calendar sync token expired for {user_id[:8]}, running full resync")
+                return self._full_resync(service, user_id, calendar_id)
+            raise
+
+        updated, deleted = self._apply(user_id, calendar_id, items, next_token, synced_from=None)
+        return {"full_resync": False, "updated": updated, "deleted": deleted}
+
+    def _full_resync(self, service: Any, user_id: str, calendar_id: str) -> Dict[str, Any]:
+        time_min_ms = int(time.time() * 1000) - self.lookback_days * DAY_MS
+        items, next_token = self._list_changes(service, calendar_id, timeMin=format_instant(time_min_ms))
+        updated, _ = self._apply(user_id, calendar_id, items, next_token, synced_from=time_min_ms)
+        print(f"📅 Full calendar resync for {user_id[:8]}: {updated} events")
+        return {"full_resync": True, "updated": updated, "deleted": 0}
+
+    def mark_stale(self, user_id: Optional[str] = None) -> None:
+        """Make the next refresh() sync regardless of the interval (e.g. after the agent writes an event)."""
+        with self._lock:
+            if user_id is None:
+                self._conn.execute("UPDATE calendar_sync_state SET synced_at = 0")
+            else:
+                self._conn.execute("UPDATE calendar_sync_state SET synced_at = 0 WHERE user_id = ?", (user_id,))
+
+    def _list_changes(self, service: Any, calendar_id: str, **params) -> Tuple[List[Dict], Optional[str]]:
+        items: List[Dict] = []
+        page_token = None
+        while True:
+            request = {'calendarId': calendar_id, 'singleEvents': True, 'maxResults': self.page_size, **params}
+            if page_token:
+                request['pageToken'] = page_token
+            response = service.events().list(**request).execute()
+            items.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return items, response.get('nextSyncToken')
+
+    def _apply(
+        self,
+        user_id: str,
+        calendar_id: str,
+        items: List[Dict],
+        sync_token: Optional[str],
+        synced_from: Optional[int]
+    ) -> Tuple[int, int]:
+        """Store a listing. A full resync passes its synced_from and replaces the calendar; deltas pass None."""
+        upserts, removals = [], []
+        for event in items:
+            if event.get('status') == 'cancelled' or 'start' not in event:
+                removals.append((user_id, calendar_id, event['id']))
+                continue
+            start_ms, end_ms = event_bounds(event)
+            data = encrypt_bytes(json.dumps(event).encode("utf-8"), self.key_hex)
+            upserts.append((user_id, calendar_id, event['id'], start_ms, end_ms, data))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if synced_from is not None:
+                    self._conn.execute(
+                        "DELETE FROM calendar_events WHERE user_id = ? AND calendar_id = ?", (user_id, calendar_id)
+                    )
+                deleted = 0
+                for row in removals:
+                    deleted += self._conn.execute(
+                        "DELETE FROM calendar_events WHERE user_id = ? AND calendar_id = ? AND event_id = ?", row
+                    ).rowcount
+                self._conn.executemany(
+                    "INSERT INTO calendar_events (user_id, calendar_id, event_id, start_ms, end_ms, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(user_id, calendar_id, event_id) DO UPDATE SET "
+                    "start_ms = excluded.start_ms, end_ms = excluded.end_ms, data = excluded.data",
+                    upserts
+                )
+                self._conn.execute(
+                    "INSERT INTO calendar_sync_state (user_id, calendar_id, sync_token, synced_at, synced_from) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT(user_id, calendar_id) DO UPDATE SET "
+                    "sync_token = excluded.sync_token, synced_at = excluded.synced_at, "
+                    "synced_from = COALESCE(excluded.synced_from, synced_from)",
+                    (user_id, calendar_id, sync_token, int(time.time() * 1000), synced_from)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(upserts), deleted
+
+    # ---- reads ----
+
+    def events(
+        self,
+        user_id: str,
+        time_min_ms: int,
+        time_max_ms: int,
+        calendar_id: str = 'primary',
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Events overlapping [time_min_ms, time_max_ms), ordered by start time."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM calendar_events WHERE user_id = ? AND calendar_id = ? "
+                "AND start_ms < ? AND end_ms > ? ORDER BY start_ms, event_id LIMIT ?",
+                (user_id, calendar_id, time_max_ms, time_min_ms, -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(decrypt_bytes(row[0], self.key_hex)) for row in rows]
+
+    def iter_events(
+        self,
+        user_id: str,
+        time_min_ms: int,
+        time_max_ms: int,
+        calendar_id: str = 'primary',
+        batch_size: int = 500
+    ) -> Iterator[Dict]:
+        """
+        Like events(), but decrypted lazily and read `batch_size` rows at a
+        time (keyset pagination on start_ms, event_id), so long horizons
+        never sit in memory at once and the lock isn't held between batches.
+        """
+        after: Tuple = (-1 << 63, '')
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT start_ms, event_id, data FROM calendar_events WHERE user_id = ? AND calendar_id = ? "
+                    "AND start_ms < ? AND end_ms > ? AND (start_ms, event_id) > (?, ?) "
+                    "ORDER BY start_ms, event_id LIMIT ?",
+                    (user_id, calendar_id, time_max_ms, time_min_ms, *after, batch_size)
+                ).fetchall()
+            for row in rows:
+                yield json.loads(decrypt_bytes(row[2], self.key_hex))
+            if len(rows) < batch_size:
+                return
+            after = rows[-1][:2]
+
+    def get(self, user_id: str, event_id: str, calendar_id: str = 'primary') -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM calendar_events WHERE user_id = ? AND calendar_id = ? AND event_id = ?",
+                (user_id, calendar_id, event_id)
+            ).fetchone()
+        return json.loads(decrypt_bytes(row[0], self.key_hex)) if row else None
+
+    def count(self, user_id: str, calendar_id: str = 'primary') -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM calendar_events WHERE user_id = ? AND calendar_id = ?", (user_id, calendar_id)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,84 @@
+# hushh_mcp/agents/schedule_agent/freebusy.py
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ...cache import TTLCache
+
+# Most calendars the Calendar API accepts in one freebusy query
+FREEBUSY_MAX_ITEMS = 50
+
+def default_window(days: int = 7, now: Optional[datetime] = None) -> Tuple[str, str]:
+    """
+    (timeMin, timeMax) from the top of the current hour, so repeated
+    requests within the hour ask for the same window and can share a
+    cache entry.
+    """
+    start = (now or datetime.now(timezone.utc)).replace(minute=0, second=0, microsecond=0)
+    return start.isoformat(), (start + timedelta(days=days)).isoformat()
+
+# ==================== Cached Free/Busy Queries ====================
+
+class FreeBusyCache:
+    """
+    Free/busy lookups for many calendars at once, with a short-lived cache
+    per (user, calendar, window).
+
+    Calendars missing from the cache are fetched together, up to
+    FREEBUSY_MAX_ITEMS per query, instead of one query per calendar.
+    Calendars the API reports errors for (not found, no access) are
+    returned but never cached. The agent invalidates the cache whenever it
+    creates an event, so its own writes are visible immediately; other
+    changes show up once the TTL runs out.
+    """
+
+    def __init__(self, ttl_ms: int = 60 * 1000, maxsize: int = 1024):
+        self._entries = TTLCache(maxsize=maxsize, ttl_ms=ttl_ms)
+        self.queries = 0
+
+    def query(
+        self,
+        service: Any,
+        user_id: str,
+        calendar_ids: Iterable[str],
+        time_min: str,
+        time_max: str
+    ) -> Dict[str, Dict]:
+        """{calendar_id: {"busy": [...]}} in the Calendar API's response format."""
+        results: Dict[str, Dict] = {}
+        missing = []
+        for calendar_id in dict.fromkeys(calendar_ids):
+            cached = self._entries.get((user_id, calendar_id, time_min, time_max))
+            if cached is None:
+                missing.append(calendar_id)
+            else:
+                results[calendar_id] = cached
+
+        for start in range(0, len(missing), FREEBUSY_MAX_ITEMS):
+            chunk = missing[start:start + FREEBUSY_MAX_ITEMS]
+            response = service.freebusy().query(body={
+                "timeMin": time_min,
+                "timeMax": time_max,
+                "items": [{"id": calendar_id} for calendar_id in chunk]
+            }).execute()
+            self.queries += 1
+
+            calendars = response.get('calendars', {})
+            for calendar_id in chunk:
+                calendar = calendars.get(calendar_id) or {"busy": [], "errors": [{"reason": "notFound"}]}
+                if not calendar.get('errors'):
+                    self._entries.set((user_id, calendar_id, time_min, time_max), calendar)
+                results[calendar_id] = calendar
+        return results
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop cached windows for one user, or for everyone."""
+        if user_id is None:
+            self._entries.clear()
+            return
+        for key, _ in self._entries.items():
+            if key[0] == user_id:
+                self._entries.pop(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._entries.stats(), "queries": self.queries}
@@ -6,8 +6,10 @@ Part of the Hushh Modular Consent Protocol (MCP)
 import os
 import json
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
@@ -23,12 +25,88 @@ from config import (
     GOOGLE_CALENDAR_TOKEN,
     GOOGLE_CALENDAR_REFRESH_TOKEN,
     BACKEND_URL,
-    AGENT_MASTER_KEY
+    AGENT_MASTER_KEY,
+    FREEBUSY_CACHE_TTL_S,
+    SCHEDULE_ENGINE,
+    SCHEDULE_MAX_DAYS,
+    CALENDAR_SYNC,
+    CALENDAR_SYNC_PATH,
+    CALENDAR_SYNC_INTERVAL_S,
+    CALENDAR_SYNC_LOOKBACK_DAYS
 )
+from .availability import (
+    MINUTE_MS,
+    format_instant,
+    free_slots,
+    parse_instant,
+    parse_intervals
+)
+from .analytics import schedule_analysis, scheduling_patterns
+from .bitmap import find_group_slots
+from .event_store import (
+    EVENTS_PAGE_SIZE,
+    CalendarEventStore,
+    event_bounds,
+    iter_api_events,
+    normalize_event
+)
+from .freebusy import FreeBusyCache, default_window
+
+# Horizon (days) of each optimize_schedule timeframe; anything else means 30
+OPTIMIZE_TIMEFRAMES = {'1w': 7, '2w': 14, '1m': 30, '3m': 90, '1y': 365}
 
 class ScheduleAgent:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.freebusy = FreeBusyCache(ttl_ms=FREEBUSY_CACHE_TTL_S * 1000)
+        # Local event store kept current with syncToken (None when CALENDAR_SYNC is disabled)
+        self.event_store = CalendarEventStore(
+            CALENDAR_SYNC_PATH,
+            AGENT_MASTER_KEY,
+            lookback_days=CALENDAR_SYNC_LOOKBACK_DAYS,
+            min_sync_interval_ms=CALENDAR_SYNC_INTERVAL_S * 1000
+        ) if CALENDAR_SYNC else None
+
+    def on_event_created(self, user_id: str) -> None:
+        """Called after the agent writes to a calendar so cached free/busy isn't stale."""
+        # Calendar credentials are shared by every user_id (see get_calendar_credentials),
+        # so any cached window may include the calendar that just changed
+        self.freebusy.invalidate()
+        if self.event_store is not None:
+            self.event_store.mark_stale()
+
+    def _store_covers(self, service, user_id: str, time_min_ms: int) -> bool:
+        """Refresh the local store and say whether it can answer a window starting at time_min_ms."""
+        if self.event_store is None:
+            return False
+        self.event_store.refresh(service, user_id)
+        # The store only reaches CALENDAR_SYNC_LOOKBACK_DAYS back; older windows go to the API
+        return self.event_store.covers(user_id, time_min_ms)
+
+    def list_events(
+        self,
+        service,
+        user_id: str,
+        time_min_ms: int,
+        time_max_ms: int,
+        max_results: Optional[int] = None
+    ) -> List[Dict]:
+        """Primary-calendar events overlapping the window, ordered by start time."""
+        if self._store_covers(service, user_id, time_min_ms):
+            return self.event_store.events(user_id, time_min_ms, time_max_ms, limit=max_results)
+
+        page_size = min(max_results, EVENTS_PAGE_SIZE) if max_results else EVENTS_PAGE_SIZE
+        return list(islice(iter_api_events(service, time_min_ms, time_max_ms, page_size=page_size), max_results))
+
+    def iter_events(self, service, user_id: str, time_min_ms: int, time_max_ms: int) -> Iterator[Dict]:
+        """Normalized primary-calendar events overlapping the window, streamed in start order."""
+        if self._store_covers(service, user_id, time_min_ms):
+            events = self.event_store.iter_events(user_id, time_min_ms, time_max_ms)
+        else:
+            events = iter_api_events(service, time_min_ms, time_max_ms)
+        for event in events:
+            if 'start' in event:
+                yield normalize_event(event)
 
     def get_calendar_credentials(self, user_id: str) -> Credentials:
         """Get Calendar credentials for a user."""
@@ -76,15 +154,31 @@ class ScheduleAgent:
             duration = data.get('duration', 60)  # minutes
             participants = data.get('participants', [])
             preferred_times = data.get('preferred_times', [])
+            engine = data.get('engine', SCHEDULE_ENGINE)
+            days = min(int(data.get('days', 7)), SCHEDULE_MAX_DAYS)
 
             self.logger.info(f'🔍 Meeting time suggestion request: {data}')
 
+            if engine not in ('sweep', 'bitmap'):
+                return JSONResponse(
+                    status_code=400,
+                    content={"error": f"Unknown engine '{engine}' (expected 'sweep' or 'bitmap')"}
+                )
+            try:
+                duration = int(duration)
+            except (TypeError, ValueError):
+                duration = 0
+            if duration < 1:
+                return JSONResponse(
+                    status_code=400,
+                    content={"error": "duration must be a number of minutes, at least 1"}
+                )
+
             # Get credentials
             creds = self.get_calendar_credentials(user_id)
             if not creds:
                 # Provide demo data when credentials are not available
                 self.logger.info("📅 Providing demo meeting suggestions (complete OAuth to see real suggestions)")
-                from datetime import datetime, timedelta
                 import pytz
                 
                 # Get IST timezone
@@ -138,56 +232,32 @@ class ScheduleAgent:
             # Get calendar service
             service = build('calendar', 'v3', credentials=creds)
 
-            # Get busy times for all participants
-            busy_times = []
-            for participant in participants:
-                freebusy_query = {
-                    'timeMin': (datetime.now()).isoformat() + 'Z',
-                    'timeMax': (datetime.now() + timedelta(days=7)).isoformat() + 'Z',
-                    'items': [{'id': participant}]
-                }
-
-                result = service.freebusy().query(body=freebusy_query).execute()
-                for calendar in result['calendars'].values():
-                    busy_times.extend(calendar.get('busy', []))
-
-            # Find available times
-            available_times = []
-            current_time = datetime.now().replace(minute=0, second=0, microsecond=0)
-            end_time = current_time + timedelta(days=7)
-
-            while current_time < end_time:
-                slot_end = current_time + timedelta(minutes=duration)
-                is_available = True
-
-                # Check if slot conflicts with busy times
-                for busy in busy_times:
-                    busy_start = datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
-                    busy_end = datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
-
-                    if (current_time < busy_end and slot_end > busy_start):
-                        is_available = False
-                        break
-
-                # Check if slot is within preferred times
-                if preferred_times:
-                    is_preferred = False
-                    for pref in preferred_times:
-                        pref_start = datetime.fromisoformat(pref['start'])
-                        pref_end = datetime.fromisoformat(pref['end'])
-                        if current_time >= pref_start and slot_end <= pref_end:
-                            is_preferred = True
-                            break
-                    is_available = is_available and is_preferred
-
-                if is_available:
-                    available_times.append({
-                        'start': current_time.isoformat(),
-                        'end': slot_end.isoformat()
-                    })
-
-                current_time += timedelta(minutes=30)
+            # Get busy times for all participants (batched, cached per window)
+            time_min, time_max = default_window(days=days)
+            calendars = self.freebusy.query(service, user_id, participants, time_min, time_max)
+            window_start_ms = int(datetime.fromisoformat(time_min).timestamp() * 1000)
+
+            if engine == 'bitmap':
+                try:
+                    return await self._suggest_group_times(data, user_id, participants, calendars, window_start_ms, days)
+                except ValueError as e:
+                    return JSONResponse(status_code=400, content={"error": str(e)})
+
+            busy_times = [busy for calendar in calendars.values() for busy in calendar.get('busy', [])]
+
+            # Find available times: 30-minute grid from the top of the hour
+            slots = free_slots(
+                parse_intervals(busy_times),
+                window_start_ms,
+                window_start_ms + days * 24 * 60 * MINUTE_MS,
+                int(duration) * MINUTE_MS,
+                preferred=parse_intervals(preferred_times) if preferred_times else None
+            )
 
+            available_times = [
+                {'start': format_instant(start), 'end': format_instant(end)}
+                for start, end in slots
+            ]
             return {"available_times": available_times}
 
         except Exception as e:
@@ -197,6 +267,46 @@ class ScheduleAgent:
                 content={"error": f"Failed to suggest meeting times: {str(e)}"}
             )
 
+    async def _suggest_group_times(
+        self,
+        data: Dict,
+        user_id: str,
+        participants: List[str],
+        calendars: Dict[str, Dict],
+        window_start_ms: int,
+        days: int
+    ) -> Dict:
+        """Ranked slots from the bitmap engine: everyone free, inside their working hours."""
+        preferences = data.get('preferences')
+        if preferences is None:
+            try:
+                preferences = await self.scheduling_preferences(user_id)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Ranking without scheduling preferences: {str(e)}")
+
+        timezones = data.get('timezones', {})
+        working_hours = data.get('working_hours', [9, 17])
+        # The requester's own working hours always apply, even with no other participants
+        team = [{"busy": [], "timezone": data.get('timezone'), "working_hours": working_hours}]
+        team.extend(
+            {
+                "busy": parse_intervals(calendars[participant].get('busy', [])),
+                "timezone": timezones.get(participant, data.get('timezone')),
+                "working_hours": working_hours
+            }
+            for participant in participants
+        )
+        ranked = find_group_slots(
+            team,
+            window_start_ms,
+            days,
+            int(data.get('duration', 60)),
+            preferences=preferences,
+            timezone_name=data.get('timezone'),
+            max_results=int(data.get('max_results', 10))
+        )
+        return {"available_times": ranked, "engine": "bitmap"}
+
     async def check_schedule_conflicts(self, request: Request):
         """Check for schedule conflicts."""
         try:
@@ -221,28 +331,25 @@ class ScheduleAgent:
             # Get calendar service
             service = build('calendar', 'v3', credentials=creds)
 
-            # Get event details
-            event = service.events().get(
-                calendarId='primary',
-                eventId=event_id
-            ).execute()
+            # Get event details (local store first, API for events outside it)
+            event = None
+            if self.event_store is not None:
+                self.event_store.refresh(service, user_id)
+                event = self.event_store.get(user_id, event_id)
+            if event is None:
+                event = service.events().get(
+                    calendarId='primary',
+                    eventId=event_id
+                ).execute()
 
             # Get events around this time
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=event['start']['dateTime'],
-                timeMax=event['end']['dateTime'],
-                maxResults=10,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-
+            start_ms, end_ms = event_bounds(event)
             conflicts = []
-            for other_event in events_result.get('items', []):
+            for other_event in self.list_events(service, user_id, start_ms, end_ms):
                 if other_event['id'] != event_id:
                     conflicts.append({
                         'id': other_event['id'],
-                        'summary': other_event['summary'],
+                        'summary': other_event.get('summary', 'No Title'),
                         'start': other_event['start'].get('dateTime', other_event['start'].get('date')),
                         'end': other_event['end'].get('dateTime', other_event['end'].get('date'))
                     })
@@ -301,78 +408,36 @@ class ScheduleAgent:
             # Get calendar service
             service = build('calendar', 'v3', credentials=creds)
 
-            # Get events for the timeframe
-            time_min = datetime.now()
-            if timeframe == '1w':
-                time_max = time_min + timedelta(days=7)
-            elif timeframe == '2w':
-                time_max = time_min + timedelta(days=14)
-            else:
-                time_max = time_min + timedelta(days=30)
-
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=time_min.isoformat() + 'Z',
-                timeMax=time_max.isoformat() + 'Z',
-                maxResults=100,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-
-            events = events_result.get('items', [])
-
-            # Analyze schedule patterns
-            suggestions = []
-            total_duration = timedelta()
-            meeting_count = 0
-            gaps = []
-
-            for i in range(len(events) - 1):
-                current = events[i]
-                next_event = events[i + 1]
-
-                current_end = datetime.fromisoformat(
-                    current['end'].get('dateTime', current['end'].get('date'))
-                )
-                next_start = datetime.fromisoformat(
-                    next_event['start'].get('dateTime', next_event['start'].get('date'))
-                )
-
-                gap = next_start - current_end
-                if gap > timedelta(minutes=30):
-                    gaps.append({
-                        'start': current_end.isoformat(),
-                        'end': next_start.isoformat(),
-                        'duration': gap.total_seconds() / 60
-                    })
-
-                event_duration = current_end - datetime.fromisoformat(
-                    current['start'].get('dateTime', current['start'].get('date'))
-                )
-                total_duration += event_duration
-                meeting_count += 1
+            # Stream every event in the timeframe (all pages, not just the first 100)
+            days = OPTIMIZE_TIMEFRAMES.get(timeframe, 30)
+            time_min_ms = int(time.time() * 1000)
+            analysis = schedule_analysis(
+                self.iter_events(service, user_id, time_min_ms, time_min_ms + days * 24 * 60 * MINUTE_MS)
+            )
+            meeting_count = analysis['meeting_count']
 
             # Generate optimization suggestions
+            suggestions = []
             if meeting_count > 0:
-                avg_duration = total_duration / meeting_count
+                avg_duration = analysis['total_duration'] / meeting_count
                 if avg_duration > timedelta(minutes=60):
                     suggestions.append({
                         'type': 'duration',
                         'message': 'Consider shortening meeting durations'
                     })
 
-            if len(gaps) > 0:
+            if analysis['gap_count'] > 0:
                 suggestions.append({
                     'type': 'gaps',
                     'message': 'Found scheduling gaps that could be utilized',
-                    'gaps': gaps
+                    'gaps': analysis['gaps']
                 })
 
             return {
                 "analysis": {
                     "total_meetings": meeting_count,
                     "average_duration": str(avg_duration) if meeting_count > 0 else "0",
-                    "total_gaps": len(gaps)
+                    "total_gaps": analysis['gap_count']
                 },
                 "suggestions": suggestions
             }
@@ -481,7 +546,6 @@ class ScheduleAgent:
             if not creds:
                 # Provide demo data when credentials are not available
                 self.logger.info("📅 Providing demo free/busy data (complete OAuth to see real data)")
-                from datetime import datetime, timedelta
                 
                 now = datetime.now()
                 demo_busy_times = [
@@ -508,15 +572,18 @@ class ScheduleAgent:
             # Get calendar service
             service = build('calendar', 'v3', credentials=creds)
 
-            # Query free/busy
-            body = {
-                "timeMin": time_min or datetime.now().isoformat() + 'Z',
-                "timeMax": time_max or (datetime.now() + timedelta(days=7)).isoformat() + 'Z',
-                "items": [{"id": 'primary'}]
-            }
+            # Query free/busy (comma-separated calendar ids, cached per window)
+            default_min, default_max = default_window(days=7)
+            time_min = time_min or default_min
+            time_max = time_max or default_max
+            calendar_ids = [c for c in request.query_params.get('calendars', 'primary').split(',') if c]
 
-            events_result = service.freebusy().query(body=body).execute()
-            return events_result
+            return {
+                "kind": "calendar#freeBusy",
+                "timeMin": time_min,
+                "timeMax": time_max,
+                "calendars": self.freebusy.query(service, user_id, calendar_ids, time_min, time_max)
+            }
 
         except Exception as e:
             self.logger.error(f'❌ Error getting free/busy info: {str(e)}')
@@ -547,7 +614,6 @@ class ScheduleAgent:
             if not creds:
                 # Provide demo data when credentials are not available
                 self.logger.info("📅 Providing demo calendar events (complete OAuth to see real events)")
-                from datetime import datetime, timedelta
                 
                 now = datetime.now()
                 demo_events = [
@@ -584,16 +650,14 @@ class ScheduleAgent:
             service = build('calendar', 'v3', credentials=creds)
 
             # Get events
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=time_min or datetime.now().isoformat() + 'Z',
-                timeMax=time_max or (datetime.now() + timedelta(days=7)).isoformat() + 'Z',
-                maxResults=20,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+            time_min_ms = parse_instant(time_min) if time_min else int(time.time() * 1000)
+            time_max_ms = parse_instant(time_max) if time_max else time_min_ms + 7 * 24 * 60 * MINUTE_MS
+            max_results = int(request.query_params.get('max_results', 20))
 
-            return events_result
+            return {
+                "kind": "calendar#events",
+                "items": self.list_events(service, user_id, time_min_ms, time_max_ms, max_results=max_results)
+            }
 
         except Exception as e:
             self.logger.error(f'❌ Error getting events: {str(e)}')
@@ -605,83 +669,43 @@ class ScheduleAgent:
     async def get_preferences(self, request: Request):
         """Get user's scheduling preferences based on calendar patterns."""
         try:
-            token = request.query_params.get('token')
             user_id = request.query_params.get('user_id')
 
             self.logger.info(f'🔍 Preferences request: {request.query_params}')
 
-            # Get credentials
-            creds = self.get_calendar_credentials(user_id)
-            if not creds:
-                # Provide demo data when credentials are not available
-                self.logger.info("📅 Providing demo preferences data (complete OAuth to see real data)")
-                
-                return {
-                    "most_common_hour": 10,
-                    "most_common_day": "Tuesday",
-                    "avg_duration_minutes": 60,
-                    "total_events": 15,
-                    "hour_distribution": {9: 3, 10: 5, 11: 2, 14: 3, 15: 2},
-                    "day_distribution": {"Monday": 2, "Tuesday": 5, "Wednesday": 3, "Thursday": 3, "Friday": 2},
-                    "demo_mode": True,
-                    "message": "Complete Google Calendar OAuth to see your real scheduling preferences"
-                }
-
-            # Get calendar service
-            service = build('calendar', 'v3', credentials=creds)
-
-            # Get events from last 30 days
-            now = datetime.now()
-            past = now - timedelta(days=30)
-
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=past.isoformat() + 'Z',
-                timeMax=now.isoformat() + 'Z',
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-
-            events = events_result.get('items', [])
-
-            # Analyze patterns
-            hour_counts = {}
-            day_counts = {}
-            duration_sum = 0
-            duration_count = 0
-
-            for event in events:
-                if 'start' in event and 'dateTime' in event['start']:
-                    start_time = datetime.fromisoformat(event['start']['dateTime'].replace('Z', '+00:00'))
-                    hour = start_time.hour
-                    day = start_time.strftime('%A')
-
-                    hour_counts[hour] = hour_counts.get(hour, 0) + 1
-                    day_counts[day] = day_counts.get(day, 0) + 1
-
-                    if 'end' in event and 'dateTime' in event['end']:
-                        end_time = datetime.fromisoformat(event['end']['dateTime'].replace('Z', '+00:00'))
-                        duration = (end_time - start_time).total_seconds() / 60  # minutes
-                        duration_sum += duration
-                        duration_count += 1
-
-            # Find most common patterns
-            most_common_hour = max(hour_counts, key=hour_counts.get) if hour_counts else 9
-            most_common_day = max(day_counts, key=day_counts.get) if day_counts else 'Monday'
-            avg_duration_minutes = int(duration_sum / duration_count) if duration_count > 0 else 60
-
-            return {
-                "most_common_hour": most_common_hour,
-                "most_common_day": most_common_day,
-                "avg_duration_minutes": avg_duration_minutes,
-                "total_events": len(events),
-                "hour_distribution": hour_counts,
-                "day_distribution": day_counts
-            }
+            return await self.scheduling_preferences(user_id)
 
         except Exception as e:
             self.logger.error(f'❌ Error getting preferences: {str(e)}')
             return JSONResponse(
                 status_code=500,
                 content={"error": f"Failed to get preferences: {str(e)}"}
-            ) 
\ No newline at end of file
+            ) 
+
+    async def scheduling_preferences(self, user_id: str) -> Dict:
+        """Hour/day distributions of the user's events over the last 30 days."""
+        # Get credentials
+        creds = self.get_calendar_credentials(user_id)
+        if not creds:
+            # Provide demo data when credentials are not available
+            self.logger.info("📅 Providing demo preferences data (complete OAuth to see real data)")
+            
+            return {
+                "most_common_hour": 10,
+                "most_common_day": "Tuesday",
+                "avg_duration_minutes": 60,
+                "total_events": 15,
+                "hour_distribution": {9: 3, 10: 5, 11: 2, 14: 3, 15: 2},
+                "day_distribution": {"Monday": 2, "Tuesday": 5, "Wednesday": 3, "Thursday": 3, "Friday": 2},
+                "demo_mode": True,
+                "message": "Complete Google Calendar OAuth to see your real scheduling preferences"
+            }
+
+        # Get calendar service
+        service = build('calendar', 'v3', credentials=creds)
+
+        # Stream the last 30 days of events through the pattern counters
+        now_ms = int(time.time() * 1000)
+        return scheduling_patterns(
+            self.iter_events(service, user_id, now_ms - 30 * 24 * 60 * MINUTE_MS, now_ms)
+        )
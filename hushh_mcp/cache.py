@@ -0,0 +1,105 @@
+# hushh_mcp/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# ==================== Helpers ====================
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+_MISSING = object()
+
+# ==================== TTL-aware LRU Cache ====================
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache where every entry carries its own expiry
+    (epoch ms). Expired entries are dropped lazily on access.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_ms: Optional[int] = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl_ms = ttl_ms
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and _now_ms() >= expires_at:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[int] = None) -> None:
+        """Store a value. `expires_at` overrides the cache-wide TTL if given."""
+        if expires_at is None and self.ttl_ms is not None:
+            expires_at = _now_ms() + self.ttl_ms
+        elif expires_at is not None and self.ttl_ms is not None:
+            expires_at = min(expires_at, _now_ms() + self.ttl_ms)
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry. Returns the number removed."""
+        now = _now_ms()
+        with self._lock:
+            stale = [k for k, (_, exp) in self._data.items() if exp is not None and now >= exp]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of live (key, value) pairs, oldest first. Does not touch LRU order."""
+        now = _now_ms()
+        with self._lock:
+            return [(k, v) for k, (v, exp) in self._data.items() if exp is None or now < exp]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return False
+        expires_at = entry[1]
+        return expires_at is None or _now_ms() < expires_at
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -18,6 +18,9 @@ VAULT_ENCRYPTION_KEY = os.getenv("VAULT_ENCRYPTION_KEY")
 if not VAULT_ENCRYPTION_KEY or len(VAULT_ENCRYPTION_KEY) != 64:
     raise ValueError("❌ VAULT_ENCRYPTION_KEY must be a 64-character hex string (256-bit AES key)")
 
+# Persist vault records as raw iv||ciphertext||tag bytes instead of base64 JSON
+VAULT_COMPACT_PAYLOADS = os.getenv("VAULT_COMPACT_PAYLOADS", "disabled").lower() == "enabled"
+
 # ==================== Expiration Settings ====================
 
 # Default expiry durations (in milliseconds)
@@ -25,6 +28,43 @@ if not VAULT_ENCRYPTION_KEY or len(VAULT_ENCRYPTION_KEY) != 64:
 DEFAULT_CONSENT_TOKEN_EXPIRY_MS = int(os.getenv("DEFAULT_CONSENT_TOKEN_EXPIRY_MS", 1000 * 60 * 60 * 24 * 7))  # 30 days
 DEFAULT_TRUST_LINK_EXPIRY_MS = int(os.getenv("DEFAULT_TRUST_LINK_EXPIRY_MS", 1000 * 60 * 60 * 24 * 30))      
 
+# ==================== Consent Token Format ====================
+
+# Version issued by issue_token: 2 = compact binary (default), 1 = legacy text. Both validate.
+CONSENT_TOKEN_VERSION = int(os.getenv("CONSENT_TOKEN_VERSION", 2))
+
+# ==================== Consent Token Cache ====================
+
+# Max number of already-verified tokens kept in memory (0 disables the cache)
+CONSENT_TOKEN_CACHE_SIZE = int(os.getenv("CONSENT_TOKEN_CACHE_SIZE", 4096))
+
+# ==================== Revocation Store ====================
+
+# Backend for revoked consent tokens: "memory", "log" (append-only file) or "sqlite"
+REVOCATION_STORE = os.getenv("REVOCATION_STORE", "memory")
+REVOCATION_STORE_PATH = os.getenv("REVOCATION_STORE_PATH")  # defaults per backend when unset
+REVOCATION_BLOOM_FILTER = os.getenv("REVOCATION_BLOOM_FILTER", "disabled").lower() == "enabled"
+
+# ==================== LLM Client ====================
+
+# Backend for all AI features: "openai" or "fake" (canned local responses, no network)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))          # in-flight completions per process
+LLM_PER_USER_CONCURRENCY = int(os.getenv("LLM_PER_USER_CONCURRENCY", 2))  # in-flight completions per user
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", 60))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+# Map-reduce summarization: input tokens per batch prompt, and per item (e.g. one email) within it.
+# Keep LLM_BATCH_TOKENS plus prompt and output well under the model's context window.
+LLM_BATCH_TOKENS = int(os.getenv("LLM_BATCH_TOKENS", 6000))
+LLM_ITEM_MAX_TOKENS = int(os.getenv("LLM_ITEM_MAX_TOKENS", 1500))
+
+# Encrypted on-disk cache of completions keyed by (model, prompt, parameters)
+LLM_CACHE = os.getenv("LLM_CACHE", "enabled").lower() == "enabled"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+LLM_CACHE_TTL_S = int(os.getenv("LLM_CACHE_TTL_S", 24 * 60 * 60))
+
 # ==================== Environment Info ====================
 
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -36,8 +76,26 @@ HUSHH_HACKATHON = os.getenv("HUSHH_HACKATHON", "disabled").lower() == "enabled"
 __all__ = [
     "SECRET_KEY",
     "VAULT_ENCRYPTION_KEY",
+    "VAULT_COMPACT_PAYLOADS",
     "DEFAULT_CONSENT_TOKEN_EXPIRY_MS",
     "DEFAULT_TRUST_LINK_EXPIRY_MS",
+    "CONSENT_TOKEN_VERSION",
+    "CONSENT_TOKEN_CACHE_SIZE",
+    "REVOCATION_STORE",
+    "REVOCATION_STORE_PATH",
+    "REVOCATION_BLOOM_FILTER",
+    "LLM_BACKEND",
+    "OPENAI_API_KEY",
+    "LLM_MAX_CONCURRENCY",
+    "LLM_PER_USER_CONCURRENCY",
+    "LLM_TIMEOUT_S",
+    "LLM_MAX_RETRIES",
+    "LLM_BATCH_TOKENS",
+    "LLM_ITEM_MAX_TOKENS",
+    "LLM_CACHE",
+    "LLM_CACHE_PATH",
+    "LLM_CACHE_MAX_BYTES",
+    "LLM_CACHE_TTL_S",
     "ENVIRONMENT",
     "AGENT_ID",
     "HUSHH_HACKATHON"
@@ -0,0 +1,425 @@
+# hushh_mcp/consent/revocation.py
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# ==================== Helpers ====================
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+def token_key(token_str: str) -> str:
+    """Stores only ever see a digest of the token, never the bearer string itself."""
+    return hashlib.sha256(token_str.encode()).hexdigest()
+
+# ==================== Base Store ====================
+
+class RevocationStore:
+    """
+    Interface for revoked-token backends. Every entry carries the revoked
+    token's `expires_at` (epoch ms) and is garbage-collected once it passes,
+    since an expired token is rejected regardless of revocation.
+    """
+
+    gc_interval_ms = 60 * 1000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._last_gc = _now_ms()
+
+    # ---- public API (token strings) ----
+
+    def revoke(self, token_str: str, expires_at: int) -> None:
+        self.add_key(token_key(token_str), expires_at)
+
+    def is_revoked(self, token_str: str) -> bool:
+        return self.contains_key(token_key(token_str))
+
+    def __contains__(self, token_str: str) -> bool:
+        return self.is_revoked(token_str)
+
+    # ---- key-level API ----
+
+    def add_key(self, key: str, expires_at: int) -> None:
+        with self._lock:
+            self._put(key, expires_at)
+        self._maybe_gc()
+
+    def contains_key(self, key: str) -> bool:
+        expires_at = self._lookup(key)
+        return expires_at is not None and expires_at > _now_ms()
+
+    def purge_expired(self) -> int:
+        """Drop entries whose token has expired. Returns the number removed."""
+        with self._lock:
+            self._last_gc = _now_ms()
+            return self._delete_expired(self._last_gc)
+
+    def live_keys(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def poll(self) -> List[str]:
+        """Keys revoked by other processes since the previous poll."""
+        return []
+
+    def close(self) -> None:
+        pass
+
+    def _maybe_gc(self) -> None:
+        if _now_ms() - self._last_gc >= self.gc_interval_ms:
+            self.purge_expired()
+
+    # ---- backend hooks ----
+
+    def _put(self, key: str, expires_at: int) -> None:
+        raise NotImplementedError
+
+    def _lookup(self, key: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def _delete_expired(self, now: int) -> int:
+        raise NotImplementedError
+
+# ==================== In-Memory Store ====================
+
+class MemoryRevocationStore(RevocationStore):
+    """Process-local store. Lost on restart and not shared between workers."""
+
+    def __init__(self):
+        super().__init__()
+        self._entries: Dict[str, int] = {}
+
+    def live_keys(self) -> Iterator[str]:
+        now = _now_ms()
+        return iter([k for k, exp in list(self._entries.items()) if exp > now])
+
+    def _put(self, key: str, expires_at: int) -> None:
+        self._entries[key] = max(expires_at, self._entries.get(key, expires_at))
+
+    def _lookup(self, key: str) -> Optional[int]:
+        return self._entries.get(key)
+
+    def _delete_expired(self, now: int) -> int:
+        stale = [k for k, exp in self._entries.items() if exp <= now]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+# ==================== Append-Only Log Store ====================
+
+class LogRevocationStore(RevocationStore):
+    """
+    Append-only text log (`<key> <expires_at>` per line) with an in-memory
+    index rebuilt on open. Appends from other workers are picked up by
+    tailing the file; expired entries are compacted away by rewriting the
+    log once they make up more than `compact_ratio` of it.
+    """
+
+    def __init__(self, path: str, compact_ratio: float = 0.5):
+        super().__init__()
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self._lock_path = f"{path}.lock"
+        self._index: Dict[str, int] = {}
+        self._records = 0
+        self._offset = 0
+        self._inode = None
+        self._pending: List[str] = []
+        self._track_pending = False
+        with self._file_lock():
+            open(self.path, "ab").close()
+            self._reload()
+
+    def contains_key(self, key: str) -> bool:
+        with self._lock:
+            self._tail()
+        return super().contains_key(key)
+
+    def live_keys(self) -> Iterator[str]:
+        with self._lock:
+            self._tail()
+            now = _now_ms()
+            return iter([k for k, exp in self._index.items() if exp > now])
+
+    def poll(self) -> List[str]:
+        with self._lock:
+            self._tail()
+            pending, self._pending = self._pending, []
+            self._track_pending = True
+        return pending
+
+    def _put(self, key: str, expires_at: int) -> None:
+        with self._file_lock():
+            with open(self.path, "ab") as f:
+                f.write(f"{key} {expires_at}\n".encode())
+                f.flush()
+                os.fsync(f.fileno())
+            self._tail()
+
+    def _lookup(self, key: str) -> Optional[int]:
+        return self._index.get(key)
+
+    def _delete_expired(self, now: int) -> int:
+        with self._file_lock():
+            self._tail()
+            stale = [k for k, exp in self._index.items() if exp <= now]
+            for key in stale:
+                del self._index[key]
+            if self._records and (self._records - len(self._index)) / self._records > self.compact_ratio:
+                self._compact()
+        return len(stale)
+
+    def _compact(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            for key, exp in self._index.items():
+                f.write(f"{key} {exp}\n".encode())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._reload()
+
+    def _reload(self) -> None:
+        self._index.clear()
+        self._records = 0
+        self._offset = 0
+        self._inode = None
+        self._tail()
+
+    def _tail(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._index.clear()
+            self._records = self._offset = 0
+            self._inode = None
+            return
+
+        if self._inode is not None and (st.st_ino != self._inode or st.st_size < self._offset):
+            # Log was compacted by another worker
+            self._reload()
+            return
+        self._inode = st.st_ino
+        if st.st_size == self._offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(st.st_size - self._offset)
+        complete = chunk.rfind(b"\n") + 1  # ignore a partially written trailing line
+        for line in chunk[:complete].splitlines():
+            try:
+                key, exp = line.decode().split(" ")
+                exp = int(exp)
+            except ValueError:
+                continue
+            self._records += 1
+            if exp > self._index.get(key, exp - 1):
+                self._index[key] = exp
+                if self._track_pending:
+                    self._pending.append(key)
+        self._offset += complete
+
+    def _file_lock(self):
+        return _FileLock(self._lock_path, self._lock)
+
+class _FileLock:
+    """Cross-process exclusive lock on a sidecar file (thread lock where fcntl is unavailable)."""
+
+    def __init__(self, path: str, thread_lock: threading.RLock):
+        self.path = path
+        self.thread_lock = thread_lock
+        self._fd = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self.thread_lock.release()
+
+# ==================== SQLite Store ====================
+
+class SQLiteRevocationStore(RevocationStore):
+    """SQLite-backed store (WAL mode) shared by every worker pointing at the same file."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS revoked_tokens ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " token_key TEXT NOT NULL UNIQUE,"
+            " expires_at INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at ON revoked_tokens (expires_at)"
+        )
+        row = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM revoked_tokens").fetchone()
+        self._seq = row[0]
+
+    def live_keys(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT token_key FROM revoked_tokens WHERE expires_at > ?", (_now_ms(),)
+            ).fetchall()
+        return iter([r[0] for r in rows])
+
+    def poll(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, token_key FROM revoked_tokens WHERE seq > ? ORDER BY seq", (self._seq,)
+            ).fetchall()
+            if rows:
+                self._seq = rows[-1][0]
+        return [r[1] for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _put(self, key: str, expires_at: int) -> None:
+        self._conn.execute(
+            "INSERT INTO revoked_tokens (token_key, expires_at) VALUES (?, ?) "
+            "ON CONFLICT(token_key) DO UPDATE SET expires_at = MAX(expires_at, excluded.expires_at)",
+            (key, expires_at)
+        )
+
+    def _lookup(self, key: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM revoked_tokens WHERE token_key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _delete_expired(self, now: int) -> int:
+        return self._conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (now,)).rowcount
+
+# ==================== Bloom Filter Front ====================
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = bytes.fromhex(key) if len(key) == 64 else hashlib.sha256(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class BloomRevocationStore(RevocationStore):
+    """
+    Bloom filter in front of another store: "not revoked" is answered from
+    memory, and only probable hits reach the backend. Revocations from other
+    workers are merged in at most every `refresh_interval_ms`.
+    """
+
+    def __init__(
+        self,
+        backend: RevocationStore,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        refresh_interval_ms: int = 1000
+    ):
+        super().__init__()
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval_ms = refresh_interval_ms
+        self._rebuild()
+
+    def add_key(self, key: str, expires_at: int) -> None:
+        self.backend.add_key(key, expires_at)
+        with self._lock:
+            self._bloom.add(key)
+        self._maybe_gc()
+
+    def contains_key(self, key: str) -> bool:
+        self._maybe_refresh()
+        if key not in self._bloom:
+            return False
+        return self.backend.contains_key(key)
+
+    def purge_expired(self) -> int:
+        self._last_gc = _now_ms()
+        removed = self.backend.purge_expired()
+        self._rebuild()  # Bloom filters cannot delete, so start from the live set again
+        return removed
+
+    def live_keys(self) -> Iterator[str]:
+        return self.backend.live_keys()
+
+    def poll(self) -> List[str]:
+        return self.backend.poll()
+
+    def close(self) -> None:
+        self.backend.close()
+
+    def _rebuild(self) -> None:
+        # Held from snapshot to swap: a revoke landing in between would go to the old
+        # filter, and a backend whose poll() reports nothing would never re-add it
+        with self._lock:
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            self.backend.poll()
+            for key in self.backend.live_keys():
+                bloom.add(key)
+            self._bloom = bloom
+            self._last_refresh = _now_ms()
+
+    def _maybe_refresh(self) -> None:
+        now = _now_ms()
+        if now - self._last_refresh < self.refresh_interval_ms:
+            return
+        with self._lock:
+            self._last_refresh = now
+            for key in self.backend.poll():
+                self._bloom.add(key)
+
+# ==================== Factory ====================
+
+def create_revocation_store(
+    kind: str = "memory",
+    path: Optional[str] = None,
+    bloom: bool = False
+) -> RevocationStore:
+    """Build a store from config: `memory`, `log` or `sqlite`, optionally Bloom-fronted."""
+    kind = kind.lower()
+    if kind == "memory":
+        store = MemoryRevocationStore()
+    elif kind == "log":
+        store = LogRevocationStore(path or "revoked_tokens.log")
+    elif kind == "sqlite":
+        store = SQLiteRevocationStore(path or "revoked_tokens.sqlite3")
+    else:
+        raise ValueError(f"Unknown revocation store: '{kind}'")
+
+    return BloomRevocationStore(store) if bloom else store
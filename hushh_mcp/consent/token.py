@@ -4,14 +4,53 @@ import hmac
 import hashlib
 import base64
 import time
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from hushh_mcp.config import SECRET_KEY, DEFAULT_CONSENT_TOKEN_EXPIRY_MS
+from hushh_mcp.cache import TTLCache
+from hushh_mcp.config import (
+    SECRET_KEY,
+    DEFAULT_CONSENT_TOKEN_EXPIRY_MS,
+    CONSENT_TOKEN_CACHE_SIZE,
+    REVOCATION_STORE,
+    REVOCATION_STORE_PATH,
+    REVOCATION_BLOOM_FILTER,
+    CONSENT_TOKEN_VERSION
+)
+from hushh_mcp.consent.revocation import RevocationStore, create_revocation_store
 from hushh_mcp.constants import CONSENT_TOKEN_PREFIX
 from hushh_mcp.types import HushhConsentToken, ConsentScope, UserID, AgentID
 
+ValidationResult = Tuple[bool, Optional[str], Optional[HushhConsentToken]]
+
+# ========== v2 Binary Layout ==========
+# HCT:<base64url, unpadded>( 0x02 | scope index | varint issued_at | zigzag varint lifetime_ms
+#                            | varint len + user_id | varint len + agent_id | HMAC-SHA256[:16] )
+# v1 tokens always carry a "." before the hex signature; v2 tokens never do.
+TOKEN_VERSION_V2 = 2
+_V2_SIGNATURE_BYTES = 16
+
+# Scopes are encoded by declaration order, so ConsentScope must only ever be appended to.
+_SCOPES: List[ConsentScope] = list(ConsentScope)
+_SCOPE_INDEX: Dict[str, int] = {scope.value: i for i, scope in enumerate(_SCOPES)}
+
 # ========== Internal Revocation Registry ==========
-_revoked_tokens = set()
+_revoked_tokens: RevocationStore = create_revocation_store(
+    REVOCATION_STORE, REVOCATION_STORE_PATH, bloom=REVOCATION_BLOOM_FILTER
+)
+
+def set_revocation_store(store: RevocationStore) -> None:
+    """Swap the revocation backend (e.g. in tests or app startup)."""
+    global _revoked_tokens
+    _revoked_tokens = store
+    if _verified_tokens is not None:
+        _verified_tokens.clear()
+
+# ========== Verified Token Cache ==========
+# Maps token string -> parsed HushhConsentToken whose signature already checked out.
+# Entries expire together with the token itself and are dropped on revocation.
+_verified_tokens: Optional[TTLCache] = (
+    TTLCache(maxsize=CONSENT_TOKEN_CACHE_SIZE) if CONSENT_TOKEN_CACHE_SIZE > 0 else None
+)
 
 # ========== Token Generator ==========
 
@@ -19,14 +58,23 @@ def issue_token(
     user_id: UserID,
     agent_id: AgentID,
     scope: ConsentScope,
-    expires_in_ms: int = DEFAULT_CONSENT_TOKEN_EXPIRY_MS
+    expires_in_ms: int = DEFAULT_CONSENT_TOKEN_EXPIRY_MS,
+    version: int = CONSENT_TOKEN_VERSION
 ) -> HushhConsentToken:
     issued_at = int(time.time() * 1000)
     expires_at = issued_at + expires_in_ms
-    raw = f"{user_id}|{agent_id}|{scope.value}|{issued_at}|{expires_at}"
-    signature = _sign(raw)
 
-    token_string = f"{CONSENT_TOKEN_PREFIX}:{base64.urlsafe_b64encode(raw.encode()).decode()}.{signature}"
+    if version == TOKEN_VERSION_V2:
+        body = _encode_v2_body(user_id, agent_id, scope, issued_at, expires_in_ms)
+        raw_signature = _mac(body)[:_V2_SIGNATURE_BYTES]
+        signature = raw_signature.hex()
+        token_string = f"{CONSENT_TOKEN_PREFIX}:{_b64encode(body + raw_signature)}"
+    elif version == 1:
+        raw = f"{user_id}|{agent_id}|{scope.value}|{issued_at}|{expires_at}"
+        signature = _sign(raw)
+        token_string = f"{CONSENT_TOKEN_PREFIX}:{base64.urlsafe_b64encode(raw.encode()).decode()}.{signature}"
+    else:
+        raise ValueError(f"Unsupported consent token version: {version}")
 
     return HushhConsentToken(
         token=token_string,
@@ -43,59 +91,191 @@ def issue_token(
 def validate_token(
     token_str: str,
     expected_scope: Optional[ConsentScope] = None
-) -> Tuple[bool, Optional[str], Optional[HushhConsentToken]]:
+) -> ValidationResult:
     if token_str in _revoked_tokens:
         return False, "Token has been revoked", None
 
-    try:
-        prefix, signed_part = token_str.split(":")
-        encoded, signature = signed_part.split(".")
+    token = _verified_tokens.get(token_str) if _verified_tokens is not None else None
+
+    if token is None:
+        try:
+            token = _parse_and_verify(token_str)
+        except _TokenRejected as e:
+            return False, str(e), None
+        except Exception as e:
+            return False, f"Malformed token: {str(e)}", None
+
+    if expected_scope and token.scope != expected_scope.value:
+        return False, "Scope mismatch", None
+
+    if int(time.time() * 1000) > token.expires_at:
+        if _verified_tokens is not None:
+            _verified_tokens.pop(token_str)
+        return False, "Token expired", None
+
+    if _verified_tokens is not None:
+        _verified_tokens.set(token_str, token, expires_at=token.expires_at)
+    return True, None, token
+
+def validate_tokens_batch(
+    tokens: Iterable[str],
+    expected_scope: Optional[ConsentScope] = None
+) -> List[ValidationResult]:
+    """Validate many tokens at once; duplicates are only verified once."""
+    seen: Dict[str, ValidationResult] = {}
+    results = []
+    for token_str in tokens:
+        if token_str not in seen:
+            seen[token_str] = validate_token(token_str, expected_scope)
+        results.append(seen[token_str])
+    return results
+
+# ========== Internal Parser ==========
+
+class _TokenRejected(Exception):
+    pass
+
+def _parse_and_verify(token_str: str) -> HushhConsentToken:
+    prefix, signed_part = token_str.split(":")
+
+    if prefix != CONSENT_TOKEN_PREFIX:
+        raise _TokenRejected("Invalid token prefix")
+
+    if "." not in signed_part:
+        return _parse_and_verify_v2(token_str, signed_part)
+
+    encoded, signature = signed_part.split(".")
+    decoded = base64.urlsafe_b64decode(encoded.encode()).decode()
+    user_id, agent_id, scope_str, issued_at_str, expires_at_str = decoded.split("|")
+
+    raw = f"{user_id}|{agent_id}|{scope_str}|{issued_at_str}|{expires_at_str}"
+    expected_sig = _sign(raw)
+
+    if not hmac.compare_digest(signature, expected_sig):
+        raise _TokenRejected("Invalid signature")
+
+    return HushhConsentToken(
+        token=token_str,
+        user_id=user_id,
+        agent_id=agent_id,
+        scope=scope_str,  # can optionally convert to ConsentScope(scope_str)
+        issued_at=int(issued_at_str),
+        expires_at=int(expires_at_str),
+        signature=signature
+    )
 
-        if prefix != CONSENT_TOKEN_PREFIX:
-            return False, "Invalid token prefix", None
+def _parse_and_verify_v2(token_str: str, signed_part: str) -> HushhConsentToken:
+    blob = _b64decode(signed_part)
+    body, signature = blob[:-_V2_SIGNATURE_BYTES], blob[-_V2_SIGNATURE_BYTES:]
 
-        decoded = base64.urlsafe_b64decode(encoded.encode()).decode()
-        user_id, agent_id, scope_str, issued_at_str, expires_at_str = decoded.split("|")
+    if not hmac.compare_digest(signature, _mac(body)[:_V2_SIGNATURE_BYTES]):
+        raise _TokenRejected("Invalid signature")
 
-        raw = f"{user_id}|{agent_id}|{scope_str}|{issued_at_str}|{expires_at_str}"
-        expected_sig = _sign(raw)
+    user_id, agent_id, scope, issued_at, expires_at = _decode_v2_body(body)
+    return HushhConsentToken(
+        token=token_str,
+        user_id=user_id,
+        agent_id=agent_id,
+        scope=scope,
+        issued_at=issued_at,
+        expires_at=expires_at,
+        signature=signature.hex()
+    )
+
+# ========== v2 Codec ==========
+
+def _encode_v2_body(
+    user_id: str,
+    agent_id: str,
+    scope: ConsentScope,
+    issued_at: int,
+    lifetime_ms: int
+) -> bytes:
+    out = bytearray((TOKEN_VERSION_V2, _SCOPE_INDEX[ConsentScope(scope).value]))
+    _write_varint(out, issued_at)
+    _write_varint(out, lifetime_ms * 2 if lifetime_ms >= 0 else -lifetime_ms * 2 - 1)
+    for text in (user_id, agent_id):
+        encoded = text.encode()
+        _write_varint(out, len(encoded))
+        out += encoded
+    return bytes(out)
+
+def _decode_v2_body(body: bytes) -> Tuple[str, str, ConsentScope, int, int]:
+    if len(body) < 2 or body[0] != TOKEN_VERSION_V2:
+        raise _TokenRejected("Unsupported token version")
+    scope = _SCOPES[body[1]]
+    issued_at, pos = _read_varint(body, 2)
+    zigzag, pos = _read_varint(body, pos)
+    lifetime_ms = zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
 
-        if not hmac.compare_digest(signature, expected_sig):
-            return False, "Invalid signature", None
+    user_len, pos = _read_varint(body, pos)
+    user_end = pos + user_len
+    agent_len, agent_start = _read_varint(body, user_end)
+    if agent_start + agent_len != len(body):
+        raise ValueError("token body length mismatch")
 
-        if expected_scope and scope_str != expected_scope.value:
-            return False, "Scope mismatch", None
+    user_id = body[pos:user_end].decode()
+    agent_id = body[agent_start:].decode()
+    return user_id, agent_id, scope, issued_at, issued_at + lifetime_ms
 
-        if int(time.time() * 1000) > int(expires_at_str):
-            return False, "Token expired", None
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
 
-        token = HushhConsentToken(
-            token=token_str,
-            user_id=user_id,
-            agent_id=agent_id,
-            scope=scope_str,  # can optionally convert to ConsentScope(scope_str)
-            issued_at=int(issued_at_str),
-            expires_at=int(expires_at_str),
-            signature=signature
-        )
-        return True, None, token
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    result = byte & 0x7F
+    shift = 7
+    pos += 1
+    while shift < 64:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+    raise ValueError("varint too long")
 
-    except Exception as e:
-        return False, f"Malformed token: {str(e)}", None
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
 
 # ========== Token Revoker ==========
 
 def revoke_token(token_str: str) -> None:
-    _revoked_tokens.add(token_str)
+    _revoked_tokens.revoke(token_str, _peek_expires_at(token_str))
+    if _verified_tokens is not None:
+        _verified_tokens.pop(token_str)
 
 def is_token_revoked(token_str: str) -> bool:
     return token_str in _revoked_tokens
 
+def _peek_expires_at(token_str: str) -> int:
+    """Read expires_at without verifying, so the revocation entry can be GC'd with the token."""
+    try:
+        signed_part = token_str.split(":", 1)[1]
+        if "." not in signed_part:
+            return _decode_v2_body(_b64decode(signed_part)[:-_V2_SIGNATURE_BYTES])[4]
+        encoded = signed_part.split(".")[0]
+        return int(base64.urlsafe_b64decode(encoded.encode()).decode().split("|")[4])
+    except Exception:
+        return int(time.time() * 1000) + DEFAULT_CONSENT_TOKEN_EXPIRY_MS
+
 # ========== Internal Signer ==========
 
+# Keyed once at import; each signature copies this state instead of re-deriving the key pads.
+_HMAC_BASE = hmac.new(SECRET_KEY.encode(), digestmod=hashlib.sha256)
+
+def _mac(data: bytes) -> bytes:
+    mac = _HMAC_BASE.copy()
+    mac.update(data)
+    return mac.digest()
+
 def _sign(input_string: str) -> str:
-    return hmac.new(
-        SECRET_KEY.encode(),
-        input_string.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    return _mac(input_string.encode()).hex()
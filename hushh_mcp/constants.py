@@ -4,6 +4,7 @@ from enum import Enum
 
 # ==================== Consent Scopes ====================
 
+# v2 consent tokens encode scopes by position: only append new members.
 class ConsentScope(str, Enum):
     # Vault data access
     VAULT_READ_EMAIL = "vault.read.email"
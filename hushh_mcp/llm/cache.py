@@ -0,0 +1,184 @@
+# hushh_mcp/llm/cache.py
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..vault.encrypt import encrypt_bytes, decrypt_bytes
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+# ==================== Cache Keys ====================
+
+def cache_key(model: str, messages: Any, params: Dict[str, Any]) -> str:
+    """
+    Content address of a completion request: SHA-256 over the model, the
+    messages with whitespace collapsed (prompts are indented f-strings) and
+    the sampling parameters in sorted order.
+    """
+    normalized = [
+        {"role": m.get("role", ""), "content": _WHITESPACE_RE.sub(' ', m.get("content") or '').strip()}
+        for m in messages
+    ]
+    canonical = json.dumps(
+        {"model": model, "messages": normalized, "params": params},
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+# ==================== Response Cache ====================
+
+class LLMResponseCache:
+    """
+    On-disk cache of completion texts keyed by `cache_key`. Responses are
+    encrypted with the vault's AES-GCM, expire after `ttl_ms` and the table
+    is bounded by total encrypted size, evicting least-recently-read first.
+
+    Each entry remembers how long the original call took, so `stats()` can
+    report the API latency that hits have saved.
+    """
+
+    def __init__(self, path: str, key_hex: str, max_bytes: int = 32 * 1024 * 1024, ttl_ms: Optional[int] = None):
+        self.path = path
+        self.key_hex = key_hex
+        self.max_bytes = max_bytes
+        self.ttl_ms = ttl_ms
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0
+        self._last_tick = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            " key TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " latency_ms INTEGER NOT NULL,"
+            " expires_at INTEGER,"
+            " accessed_at INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at)"
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM llm_responses"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, latency_ms, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[2] is not None and _now_ms() >= row[2]:
+                self._delete(key)
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (self._tick(), key)
+            )
+            self.hits += 1
+            self.saved_ms += row[1]
+        return decrypt_bytes(row[0], self.key_hex).decode("utf-8")
+
+    def put(self, key: str, response: str, latency_ms: int = 0) -> None:
+        blob = encrypt_bytes(response.encode("utf-8"), self.key_hex)
+        expires_at = _now_ms() + self.ttl_ms if self.ttl_ms is not None else None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = self._conn.execute(
+                    "SELECT size FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, data, size, latency_ms, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), int(latency_ms), expires_at, self._tick())
+                )
+                self._total_bytes += len(blob) - (previous[0] if previous else 0)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (_now_ms(),)
+            )
+            self._resync_total()
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            return {
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "saved_ms": self.saved_ms
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- internals (caller holds self._lock) ----
+
+    def _tick(self) -> int:
+        # LRU clock in epoch microseconds, strictly increasing within this process
+        self._last_tick = max(time.time_ns() // 1000, self._last_tick + 1)
+        return self._last_tick
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            self._total_bytes -= row[0]
+
+    def _resync_total(self) -> None:
+        # Other workers write to the same file, so the local running total can drift
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM llm_responses"
+        ).fetchone()[0]
+
+    def _evict(self) -> None:
+        self._resync_total()
+        # Expired entries go first, then least-recently-read
+        self._conn.execute(
+            "DELETE FROM llm_responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (_now_ms(),)
+        )
+        self._resync_total()
+        while self._total_bytes > self.max_bytes:
+            victims = self._conn.execute(
+                "SELECT key, size FROM llm_responses ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not victims:
+                break
+            doomed = []
+            for key, size in victims:
+                doomed.append((key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+            self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", doomed)
@@ -0,0 +1,371 @@
+# hushh_mcp/llm/client.py
+
+import asyncio
+import inspect
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from hushh_mcp.config import (
+    LLM_BACKEND,
+    OPENAI_API_KEY,
+    LLM_MAX_CONCURRENCY,
+    LLM_PER_USER_CONCURRENCY,
+    LLM_TIMEOUT_S,
+    LLM_MAX_RETRIES,
+    LLM_CACHE,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_TTL_S,
+    VAULT_ENCRYPTION_KEY
+)
+from hushh_mcp.llm.cache import LLMResponseCache, cache_key
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+ChatMessages = List[Dict[str, str]]
+
+class LLMUnavailable(RuntimeError):
+    """Raised when no LLM backend is configured (e.g. no API key)."""
+
+# ==================== Requests & Backends ====================
+
+class LLMRequest:
+    __slots__ = ("model", "messages", "params", "user_id")
+
+    def __init__(self, model: str, messages: ChatMessages, params: Dict[str, Any], user_id: Optional[str] = None):
+        self.model = model
+        self.messages = messages
+        self.params = params
+        self.user_id = user_id
+
+
+class LLMBackend:
+    """
+    A chat-completion provider. Implementations only need `complete`;
+    `stream` yields the text in deltas and defaults to one chunk.
+    """
+
+    name = "base"
+
+    async def complete(self, request: LLMRequest) -> str:
+        raise NotImplementedError
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        yield await self.complete(request)
+
+
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+
+    def __init__(self, api_key: str):
+        from openai import AsyncOpenAI  # only needed when this backend is selected
+        # Retries and timeouts are handled by LLMClient so they apply to every backend
+        self._client = AsyncOpenAI(api_key=api_key, max_retries=0)
+
+    async def complete(self, request: LLMRequest) -> str:
+        response = await self._client.chat.completions.create(
+            model=request.model,
+            messages=request.messages,
+            **request.params
+        )
+        return response.choices[0].message.content or ""
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        response = await self._client.chat.completions.create(
+            model=request.model,
+            messages=request.messages,
+            stream=True,
+            **request.params
+        )
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closes the HTTP stream, so abandoning the iterator stops generation upstream
+            await response.close()
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Local backend for tests and offline development. Returns `responder(request)`
+    (sync or async) when given, otherwise a short echo of the last user message.
+    Every request is recorded in `calls`.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[LLMRequest], Any]] = None,
+        delay_s: float = 0.0,
+        chunk_delay_s: float = 0.0
+    ):
+        self.responder = responder
+        self.delay_s = delay_s
+        self.chunk_delay_s = chunk_delay_s
+        self.calls: List[LLMRequest] = []
+
+    async def complete(self, request: LLMRequest) -> str:
+        self.calls.append(request)
+        if self.delay_s:
+            await asyncio.sleep(self.delay_s)
+        if self.responder is not None:
+            result = self.responder(request)
+            return await result if inspect.isawaitable(result) else result
+        prompt = next((m["content"] for m in reversed(request.messages) if m["role"] == "user"), "")
+        return f"[fake {request.model}] {' '.join(prompt.split())[:200]}"
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        # Word-sized deltas, like a real model
+        text = await self.complete(request)
+        for delta in re.findall(r'\S+\s*|\s+', text):
+            if self.chunk_delay_s:
+                await asyncio.sleep(self.chunk_delay_s)
+            yield delta
+
+
+def create_llm_backend(kind: str, api_key: Optional[str] = None) -> Optional[LLMBackend]:
+    """Build the configured backend, or None when it can't be used (e.g. OpenAI without a key)."""
+    kind = (kind or "openai").lower()
+    if kind == "fake":
+        return FakeLLMBackend()
+    if kind == "openai":
+        return OpenAIBackend(api_key) if api_key else None
+    raise ValueError(f"Unknown LLM backend: {kind}")
+
+# ==================== Client ====================
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, "status_code", None) in _RETRYABLE_STATUS:
+        return True
+    return type(error).__name__ in _RETRYABLE_NAMES
+
+
+class LLMClient:
+    """
+    Async entry point for every AI feature. Bounds concurrency globally and per
+    user, applies a timeout to each attempt and retries transient failures
+    with exponential backoff and jitter. With a response cache, identical
+    requests are answered locally without touching the backend.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[LLMBackend],
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        per_user_concurrency: int = LLM_PER_USER_CONCURRENCY,
+        timeout_s: float = LLM_TIMEOUT_S,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_s: float = 0.5,
+        cache: Optional[LLMResponseCache] = None
+    ):
+        self.backend = backend
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.per_user_concurrency = per_user_concurrency
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.counters = {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0, "in_flight": 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._users: Dict[str, List] = {}  # user_id -> [semaphore, holders + waiters]
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    async def complete(
+        self,
+        messages: ChatMessages,
+        model: str = DEFAULT_MODEL,
+        user_id: Optional[str] = None,
+        use_cache: bool = True,
+        **params: Any
+    ) -> str:
+        """
+        Run one chat completion and return the message text. Pass
+        `use_cache=False` when a fresh sample is wanted (e.g. "regenerate").
+        """
+        if self.backend is None:
+            raise LLMUnavailable("No LLM backend configured")
+        key = cache_key(model, messages, params) if self.cache is not None and use_cache else None
+        if key is not None:
+            cached = await self._cache_get(key)
+            if cached is not None:
+                return cached
+
+        request = LLMRequest(model, messages, params, user_id)
+        async with self._slot(user_id):
+            started = time.monotonic()
+            response = await self._call_with_retries(request)
+        if key is not None:
+            await self._cache_put(key, response, (time.monotonic() - started) * 1000)
+        return response
+
+    async def stream(
+        self,
+        messages: ChatMessages,
+        model: str = DEFAULT_MODEL,
+        user_id: Optional[str] = None,
+        use_cache: bool = True,
+        **params: Any
+    ) -> AsyncIterator[str]:
+        """
+        Yield the completion text in deltas as the model produces them.
+        Failures before the first delta are retried like `complete`; after
+        that the error is raised to the consumer. The timeout applies to the
+        wait for each delta. Closing the iterator (e.g. the client went away)
+        releases the concurrency slot and closes the upstream stream.
+        """
+        if self.backend is None:
+            raise LLMUnavailable("No LLM backend configured")
+        key = cache_key(model, messages, params) if self.cache is not None and use_cache else None
+        if key is not None:
+            cached = await self._cache_get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        request = LLMRequest(model, messages, params, user_id)
+        parts: List[str] = []
+        async with self._slot(user_id):
+            started = time.monotonic()
+            attempt = 0
+            while True:
+                self.counters["calls"] += 1
+                deltas = self.backend.stream(request)
+                try:
+                    while True:
+                        try:
+                            delta = await asyncio.wait_for(deltas.__anext__(), self.timeout_s)
+                        except StopAsyncIteration:
+                            break
+                        parts.append(delta)
+                        yield delta
+                    break
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.counters["timeouts"] += 1
+                    if parts or attempt >= self.max_retries or not _is_retryable(e):
+                        self.counters["failures"] += 1
+                        raise
+                    delay = self.backoff_s * (2 ** attempt) + random.uniform(0, self.backoff_s)
+                    print(f"⚠️ LLM stream failed ({type(e).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                    self.counters["retries"] += 1
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                finally:
+                    await deltas.aclose()
+
+        if key is not None:
+            await self._cache_put(key, "".join(parts), (time.monotonic() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.counters)
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    # ---- internals ----
+
+    # The cache does SQLite and AES-GCM work that can wait on another worker's
+    # write lock, so it runs off the event loop; any failure is a miss / skipped store.
+
+    async def _cache_get(self, key: str) -> Optional[str]:
+        try:
+            return await asyncio.to_thread(self.cache.get, key)
+        except Exception as e:
+            print(f"⚠️ LLM cache read failed: {str(e)}")
+            return None
+
+    async def _cache_put(self, key: str, response: str, latency_ms: float) -> None:
+        try:
+            await asyncio.to_thread(self.cache.put, key, response, latency_ms)
+        except Exception as e:
+            print(f"⚠️ LLM cache write failed: {str(e)}")
+
+    async def _call_with_retries(self, request: LLMRequest) -> str:
+        attempt = 0
+        while True:
+            self.counters["calls"] += 1
+            try:
+                return await asyncio.wait_for(self.backend.complete(request), self.timeout_s)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.counters["timeouts"] += 1
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    self.counters["failures"] += 1
+                    raise
+                delay = self.backoff_s * (2 ** attempt) + random.uniform(0, self.backoff_s)
+                print(f"⚠️ LLM call failed ({type(e).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                self.counters["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def _slot(self, user_id: Optional[str]) -> AsyncIterator[None]:
+        self._bind_loop()
+        user_entry = None
+        if user_id is not None and self.per_user_concurrency > 0:
+            user_entry = self._users.setdefault(user_id, [asyncio.Semaphore(self.per_user_concurrency), 0])
+            user_entry[1] += 1
+        try:
+            if user_entry is not None:
+                await user_entry[0].acquire()
+            try:
+                async with self._global:
+                    self.counters["in_flight"] += 1
+                    try:
+                        yield
+                    finally:
+                        self.counters["in_flight"] -= 1
+            finally:
+                if user_entry is not None:
+                    user_entry[0].release()
+        finally:
+            if user_entry is not None:
+                user_entry[1] -= 1
+                if user_entry[1] == 0:
+                    self._users.pop(user_id, None)
+
+    def _bind_loop(self) -> None:
+        # asyncio primitives belong to one event loop; rebuild them if we're on a new one
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._users = {}
+
+# ==================== Shared Instance ====================
+
+_client: Optional[LLMClient] = None
+
+def get_llm_client(api_key: Optional[str] = None) -> LLMClient:
+    """The process-wide client, built from config on first use."""
+    global _client
+    if _client is None:
+        cache = None
+        if LLM_CACHE:
+            cache = LLMResponseCache(
+                LLM_CACHE_PATH, VAULT_ENCRYPTION_KEY,
+                max_bytes=LLM_CACHE_MAX_BYTES, ttl_ms=LLM_CACHE_TTL_S * 1000
+            )
+        _client = LLMClient(create_llm_backend(LLM_BACKEND, api_key or OPENAI_API_KEY), cache=cache)
+    elif _client.backend is None and api_key and LLM_BACKEND == "openai":
+        _client.backend = OpenAIBackend(api_key)
+    return _client
+
+def set_llm_client(client: LLMClient) -> None:
+    """Swap the shared client (e.g. a FakeLLMBackend in tests)."""
+    global _client
+    _client = client
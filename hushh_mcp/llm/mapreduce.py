@@ -0,0 +1,158 @@
+# hushh_mcp/llm/mapreduce.py
+
+import asyncio
+import math
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence
+
+from hushh_mcp.config import LLM_BATCH_TOKENS
+from hushh_mcp.llm.client import DEFAULT_MODEL, LLMClient
+
+try:
+    import tiktoken  # optional: exact counts when installed
+except ImportError:
+    tiktoken = None
+
+PromptBuilder = Callable[[str], str]
+
+BATCH_SEPARATOR = "\n\n---\n\n"
+
+# ==================== Token Budgeting ====================
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding
+
+def estimate_tokens(text: str) -> int:
+    """Token count of `text`; ~4 characters per token when tiktoken isn't installed."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max_tokens * 4]
+
+def pack_batches(items: Sequence[str], budget_tokens: int) -> List[List[str]]:
+    """
+    Greedily pack items, in order, into batches whose combined size stays
+    within `budget_tokens`. An item larger than the budget gets a batch of
+    its own; callers are expected to have truncated items to fit.
+    """
+    separator_tokens = estimate_tokens(BATCH_SEPARATOR)
+    batches: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for item in items:
+        size = estimate_tokens(item) + (separator_tokens if current else 0)
+        if current and used + size > budget_tokens:
+            batches.append(current)
+            current, used = [], 0
+            size = estimate_tokens(item)
+        current.append(item)
+        used += size
+    if current:
+        batches.append(current)
+    return batches
+
+# ==================== Map-Reduce ====================
+
+async def map_reduce(
+    client: LLMClient,
+    items: Sequence[str],
+    map_prompt: PromptBuilder,
+    reduce_prompt: PromptBuilder,
+    direct_prompt: Optional[PromptBuilder] = None,
+    combine_prompt: Optional[PromptBuilder] = None,
+    model: str = DEFAULT_MODEL,
+    user_id: Optional[str] = None,
+    batch_tokens: int = LLM_BATCH_TOKENS,
+    partial_max_tokens: int = 600,
+    **params: Any
+) -> str:
+    """
+    Run an LLM task over more text than fits in one prompt.
+
+    Items are packed into batches of at most `batch_tokens`. When everything
+    fits in one batch, `direct_prompt` (default `reduce_prompt`) is applied
+    to it in a single call. Otherwise each batch is summarized with
+    `map_prompt` concurrently, and the partial results are merged with
+    `reduce_prompt`, in further rounds if they still exceed one batch.
+    Intermediate rounds use `combine_prompt` (default `reduce_prompt`).
+    The prompt builders receive the batch text and return the user prompt.
+    """
+    prompt = await _final_prompt(
+        client, items, map_prompt, reduce_prompt, direct_prompt, combine_prompt,
+        model, user_id, batch_tokens, dict(params, max_tokens=partial_max_tokens)
+    )
+    return await _ask(client, prompt, model, user_id, params)
+
+async def map_reduce_stream(
+    client: LLMClient,
+    items: Sequence[str],
+    map_prompt: PromptBuilder,
+    reduce_prompt: PromptBuilder,
+    direct_prompt: Optional[PromptBuilder] = None,
+    combine_prompt: Optional[PromptBuilder] = None,
+    model: str = DEFAULT_MODEL,
+    user_id: Optional[str] = None,
+    batch_tokens: int = LLM_BATCH_TOKENS,
+    partial_max_tokens: int = 600,
+    **params: Any
+) -> AsyncIterator[str]:
+    """Like `map_reduce`, but the final call is streamed in deltas."""
+    prompt = await _final_prompt(
+        client, items, map_prompt, reduce_prompt, direct_prompt, combine_prompt,
+        model, user_id, batch_tokens, dict(params, max_tokens=partial_max_tokens)
+    )
+    async for delta in client.stream([{"role": "user", "content": prompt}], model=model, user_id=user_id, **params):
+        yield delta
+
+async def _final_prompt(
+    client: LLMClient,
+    items: Sequence[str],
+    map_prompt: PromptBuilder,
+    reduce_prompt: PromptBuilder,
+    direct_prompt: Optional[PromptBuilder],
+    combine_prompt: Optional[PromptBuilder],
+    model: str,
+    user_id: Optional[str],
+    batch_tokens: int,
+    partial_params: dict
+) -> str:
+    # Runs the map and intermediate rounds, returning the prompt for the last call
+    batches = pack_batches(items, batch_tokens)
+    if len(batches) <= 1:
+        text = BATCH_SEPARATOR.join(batches[0]) if batches else ""
+        return (direct_prompt or reduce_prompt)(text)
+
+    partials = await asyncio.gather(*(
+        _ask(client, map_prompt(BATCH_SEPARATOR.join(batch)), model, user_id, partial_params)
+        for batch in batches
+    ))
+    print(f"🧩 Map step: {len(items)} items in {len(batches)} batches")
+
+    # Reduce in rounds until the partial results fit in a single prompt
+    while True:
+        batches = pack_batches(partials, batch_tokens)
+        if len(batches) == 1:
+            return reduce_prompt(BATCH_SEPARATOR.join(batches[0]))
+        if len(batches) == len(partials):
+            # Partials are each as large as a batch; trim them so the tree shrinks
+            partials = [truncate_to_tokens(p, batch_tokens // 3) for p in partials]
+            continue
+        partials = await asyncio.gather(*(
+            _ask(client, (combine_prompt or reduce_prompt)(BATCH_SEPARATOR.join(batch)), model, user_id, partial_params)
+            for batch in batches
+        ))
+
+async def _ask(client: LLMClient, prompt: str, model: str, user_id: Optional[str], params: dict) -> str:
+    return await client.complete([{"role": "user", "content": prompt}], model=model, user_id=user_id, **params)
@@ -1,6 +1,6 @@
 # hushh_mcp/types.py
 
-from typing import Literal, TypedDict, Optional, NewType
+from typing import Literal, TypedDict, Optional, NewType, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
@@ -48,6 +48,9 @@ class EncryptedPayload(BaseModel):
     encoding: Literal["base64", "hex"]
     algorithm: Literal["aes-256-gcm", "chacha20-poly1305"]
 
+# Compact vault layout: iv || ciphertext || tag in one contiguous buffer
+RawPayload = Union[bytes, bytearray, memoryview]
+
 class VaultRecord(BaseModel):
     key: VaultKey
     data: EncryptedPayload
@@ -1,11 +1,15 @@
 # hushh_mcp/vault/encrypt.py
 
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.exceptions import InvalidTag
 import os
 import base64
-from hushh_mcp.types import EncryptedPayload
+import hashlib
+import struct
+from functools import lru_cache
+from typing import BinaryIO, Iterable, List, Optional, Union
+from hushh_mcp.config import VAULT_COMPACT_PAYLOADS
+from hushh_mcp.types import EncryptedPayload, RawPayload
 
 # ==================== Constants ====================
 
@@ -13,61 +17,250 @@ IV_LENGTH = 12  # GCM recommended IV size
 TAG_LENGTH = 16
 ALGORITHM_NAME = "aes-256-gcm"
 
+# Streaming format: header = MAGIC | chunk size (u32) | 7-byte nonce prefix,
+# then segments of  final flag (u8) | ciphertext length (u32) | ciphertext+tag.
+# Segment nonce = prefix | counter (u32) | final flag, with the header as AAD,
+# so chunks cannot be reordered, dropped, truncated or spliced across streams.
+STREAM_MAGIC = b"HVS1"
+STREAM_CHUNK_SIZE = 64 * 1024
+# The header is read before anything is authenticated, so its chunk size is capped
+STREAM_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+_STREAM_NONCE_PREFIX_LENGTH = 7
+_STREAM_HEADER = struct.Struct(">4sI7s")
+_SEGMENT_HEADER = struct.Struct(">BI")
+
+# ==================== Key Registry ====================
+# Keys are parsed/derived once and their AESGCM context reused across calls.
+# The process only ever sees a handful of keys (vault key, agent master key).
+
+KEY_REGISTRY_SIZE = 32
+
+@lru_cache(maxsize=KEY_REGISTRY_SIZE)
+def _derive_key(key_hex: str) -> bytes:
+    # Try to parse as hex first, if that fails, use as regular string and hash it
+    try:
+        return bytes.fromhex(key_hex)
+    except ValueError:
+        # If not hex, convert string to 32-byte key using SHA-256
+        return hashlib.sha256(key_hex.encode('utf-8')).digest()
+
+@lru_cache(maxsize=KEY_REGISTRY_SIZE)
+def _cipher_for(key_hex: str) -> AESGCM:
+    return AESGCM(_derive_key(key_hex))
+
+def clear_key_registry() -> None:
+    """Forget cached keys, e.g. after rotating a key in place."""
+    _derive_key.cache_clear()
+    _cipher_for.cache_clear()
+
 # ==================== Encrypt ====================
 
 def encrypt_data(plaintext: str, key_hex: str) -> EncryptedPayload:
     try:
-        # Try to parse as hex first, if that fails, use as regular string and hash it
-        try:
-            key = bytes.fromhex(key_hex)
-        except ValueError:
-            # If not hex, convert string to 32-byte key using SHA-256
-            import hashlib
-            key = hashlib.sha256(key_hex.encode('utf-8')).digest()
-        
+        return _encrypt_with(_cipher_for(key_hex), plaintext)
+    except Exception as e:
+        raise RuntimeError(f"Encryption failed: {str(e)}")
+
+def encrypt_many(plaintexts: Iterable[str], key_hex: str) -> List[EncryptedPayload]:
+    """Encrypt a batch of records under one key, resolving the key only once."""
+    try:
+        aesgcm = _cipher_for(key_hex)
+        return [_encrypt_with(aesgcm, plaintext) for plaintext in plaintexts]
+    except Exception as e:
+        raise RuntimeError(f"Encryption failed: {str(e)}")
+
+def _encrypt_with(aesgcm: AESGCM, plaintext: str) -> EncryptedPayload:
+    iv = os.urandom(IV_LENGTH)
+    sealed = aesgcm.encrypt(iv, plaintext.encode('utf-8'), None)
+    ciphertext, tag = sealed[:-TAG_LENGTH], sealed[-TAG_LENGTH:]
+
+    return EncryptedPayload(
+        ciphertext=base64.b64encode(ciphertext).decode('utf-8'),
+        iv=base64.b64encode(iv).decode('utf-8'),
+        tag=base64.b64encode(tag).decode('utf-8'),
+        encoding="base64",
+        algorithm=ALGORITHM_NAME
+    )
+
+# ==================== Decrypt ====================
+
+def decrypt_data(payload: EncryptedPayload, key_hex: str) -> str:
+    try:
+        return _decrypt_with(_cipher_for(key_hex), payload)
+    except InvalidTag:
+        raise ValueError("Decryption failed: Invalid authentication tag. Possible tampering.")
+    except Exception as e:
+        raise RuntimeError(f"Decryption failed: {str(e)}")
+
+def decrypt_many(payloads: Iterable[EncryptedPayload], key_hex: str) -> List[str]:
+    """Decrypt a batch of records under one key. Fails on the first bad record."""
+    try:
+        aesgcm = _cipher_for(key_hex)
+        return [_decrypt_with(aesgcm, payload) for payload in payloads]
+    except InvalidTag:
+        raise ValueError("Decryption failed: Invalid authentication tag. Possible tampering.")
+    except Exception as e:
+        raise RuntimeError(f"Decryption failed: {str(e)}")
+
+def _decrypt_with(aesgcm: AESGCM, payload: EncryptedPayload) -> str:
+    iv = base64.b64decode(payload.iv)
+    tag = base64.b64decode(payload.tag)
+    ciphertext = base64.b64decode(payload.ciphertext)
+
+    return aesgcm.decrypt(iv, ciphertext + tag, None).decode('utf-8')
+
+# ==================== Compact Payloads ====================
+
+def encrypt_bytes(data: bytes, key_hex: str) -> bytes:
+    """Encrypt to the compact layout: iv || ciphertext || tag."""
+    try:
         iv = os.urandom(IV_LENGTH)
-        backend = default_backend()
+        return iv + _cipher_for(key_hex).encrypt(iv, data, None)
+    except Exception as e:
+        raise RuntimeError(f"Encryption failed: {str(e)}")
+
+def decrypt_bytes(buffer: RawPayload, key_hex: str) -> bytes:
+    """Decrypt a compact record. Slices a memoryview, so the input is never copied."""
+    try:
+        view = memoryview(buffer)
+        if len(view) < IV_LENGTH + TAG_LENGTH:
+            raise ValueError("compact payload too short")
+        return _cipher_for(key_hex).decrypt(view[:IV_LENGTH], view[IV_LENGTH:], None)
+    except InvalidTag:
+        raise ValueError("Decryption failed: Invalid authentication tag. Possible tampering.")
+    except Exception as e:
+        raise RuntimeError(f"Decryption failed: {str(e)}")
+
+def pack_payload(payload: EncryptedPayload) -> bytes:
+    """Convert the JSON/base64 EncryptedPayload shape to the compact layout."""
+    decode = bytes.fromhex if payload.encoding == "hex" else base64.b64decode
+    return decode(payload.iv) + decode(payload.ciphertext) + decode(payload.tag)
+
+def unpack_payload(buffer: RawPayload) -> EncryptedPayload:
+    """Convert a compact record back to the JSON/base64 EncryptedPayload shape."""
+    view = memoryview(buffer)
+    if len(view) < IV_LENGTH + TAG_LENGTH:
+        raise ValueError("compact payload too short")
+    return EncryptedPayload(
+        ciphertext=base64.b64encode(view[IV_LENGTH:-TAG_LENGTH]).decode('utf-8'),
+        iv=base64.b64encode(view[:IV_LENGTH]).decode('utf-8'),
+        tag=base64.b64encode(view[-TAG_LENGTH:]).decode('utf-8'),
+        encoding="base64",
+        algorithm=ALGORITHM_NAME
+    )
+
+def seal_record(
+    plaintext: str,
+    key_hex: str,
+    compact: Optional[bool] = None
+) -> Union[EncryptedPayload, bytes]:
+    """Encrypt for storage, in the compact form if VAULT_COMPACT_PAYLOADS is enabled."""
+    if compact if compact is not None else VAULT_COMPACT_PAYLOADS:
+        return encrypt_bytes(plaintext.encode('utf-8'), key_hex)
+    return encrypt_data(plaintext, key_hex)
 
-        cipher = Cipher(algorithms.AES(key), modes.GCM(iv), backend=backend)
-        encryptor = cipher.encryptor()
+def open_record(record: Union[EncryptedPayload, RawPayload], key_hex: str) -> str:
+    """Decrypt a stored record written in either form."""
+    if isinstance(record, EncryptedPayload):
+        return decrypt_data(record, key_hex)
+    return decrypt_bytes(record, key_hex).decode('utf-8')
+
+# ==================== Streaming Encrypt ====================
+
+def encrypt_stream(
+    reader: BinaryIO,
+    writer: BinaryIO,
+    key_hex: str,
+    chunk_size: int = STREAM_CHUNK_SIZE
+) -> int:
+    """
+    Encrypt everything readable from `reader` into `writer` in fixed-size
+    segments, holding at most two chunks in memory. Returns plaintext bytes.
+    """
+    try:
+        if not 0 < chunk_size <= STREAM_MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {STREAM_MAX_CHUNK_SIZE}")
+        aesgcm = _cipher_for(key_hex)
+        header = _STREAM_HEADER.pack(STREAM_MAGIC, chunk_size, os.urandom(_STREAM_NONCE_PREFIX_LENGTH))
+        nonce_prefix = header[-_STREAM_NONCE_PREFIX_LENGTH:]
+        writer.write(header)
 
-        ciphertext = encryptor.update(plaintext.encode('utf-8')) + encryptor.finalize()
-        tag = encryptor.tag
+        total = 0
+        counter = 0
+        chunk = _read_full(reader, chunk_size)
+        while True:
+            # Read one chunk ahead so the last segment can be flagged as final
+            next_chunk = _read_full(reader, chunk_size) if len(chunk) == chunk_size else b""
+            final = 0 if next_chunk else 1
+            sealed = aesgcm.encrypt(_segment_nonce(nonce_prefix, counter, final), chunk, header)
+            writer.write(_SEGMENT_HEADER.pack(final, len(sealed)))
+            writer.write(sealed)
 
-        return EncryptedPayload(
-            ciphertext=base64.b64encode(ciphertext).decode('utf-8'),
-            iv=base64.b64encode(iv).decode('utf-8'),
-            tag=base64.b64encode(tag).decode('utf-8'),
-            encoding="base64",
-            algorithm=ALGORITHM_NAME
-        )
+            total += len(chunk)
+            if final:
+                return total
+            counter += 1
+            chunk = next_chunk
     except Exception as e:
         raise RuntimeError(f"Encryption failed: {str(e)}")
 
-# ==================== Decrypt ====================
+# ==================== Streaming Decrypt ====================
 
-def decrypt_data(payload: EncryptedPayload, key_hex: str) -> str:
+def decrypt_stream(reader: BinaryIO, writer: BinaryIO, key_hex: str) -> int:
+    """Inverse of encrypt_stream. Returns plaintext bytes written."""
     try:
-        # Try to parse as hex first, if that fails, use as regular string and hash it
-        try:
-            key = bytes.fromhex(key_hex)
-        except ValueError:
-            # If not hex, convert string to 32-byte key using SHA-256
-            import hashlib
-            key = hashlib.sha256(key_hex.encode('utf-8')).digest()
-        
-        iv = base64.b64decode(payload.iv)
-        tag = base64.b64decode(payload.tag)
-        ciphertext = base64.b64decode(payload.ciphertext)
-
-        backend = default_backend()
-        cipher = Cipher(algorithms.AES(key), modes.GCM(iv, tag), backend=backend)
-        decryptor = cipher.decryptor()
-
-        decrypted = decryptor.update(ciphertext) + decryptor.finalize()
-        return decrypted.decode('utf-8')
+        aesgcm = _cipher_for(key_hex)
+        header = _read_full(reader, _STREAM_HEADER.size)
+        if len(header) != _STREAM_HEADER.size:
+            raise ValueError("stream header truncated")
+        magic, chunk_size, nonce_prefix = _STREAM_HEADER.unpack(header)
+        if magic != STREAM_MAGIC or not 0 < chunk_size <= STREAM_MAX_CHUNK_SIZE:
+            raise ValueError("not a vault stream")
+
+        total = 0
+        counter = 0
+        while True:
+            segment_header = _read_full(reader, _SEGMENT_HEADER.size)
+            if len(segment_header) != _SEGMENT_HEADER.size:
+                raise ValueError("stream truncated before final segment")
+            final, length = _SEGMENT_HEADER.unpack(segment_header)
+            if final > 1 or length > chunk_size + TAG_LENGTH:
+                raise ValueError("corrupt segment header")
+
+            sealed = _read_full(reader, length)
+            if len(sealed) != length:
+                raise ValueError("segment truncated")
+            chunk = aesgcm.decrypt(_segment_nonce(nonce_prefix, counter, final), sealed, header)
+            writer.write(chunk)
+            total += len(chunk)
+
+            if final:
+                if reader.read(1):
+                    raise ValueError("unexpected data after final segment")
+                return total
+            counter += 1
 
     except InvalidTag:
         raise ValueError("Decryption failed: Invalid authentication tag. Possible tampering.")
     except Exception as e:
         raise RuntimeError(f"Decryption failed: {str(e)}")
+
+def _segment_nonce(prefix: bytes, counter: int, final: int) -> bytes:
+    if counter > 0xFFFFFFFF:
+        raise ValueError("stream too long for nonce space")
+    return prefix + struct.pack(">IB", counter, final)
+
+def _read_full(reader: BinaryIO, size: int) -> bytes:
+    """read() may return short counts on pipes/sockets; keep going until size or EOF."""
+    data = reader.read(size)
+    if not data or len(data) == size:
+        return data or b""
+    parts = [data]
+    remaining = size - len(data)
+    while remaining:
+        more = reader.read(remaining)
+        if not more:
+            break
+        parts.append(more)
+        remaining -= len(more)
+    return b"".join(parts)
@@ -0,0 +1,145 @@
+# hushh_mcp/vault/store.py
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Tuple, Union
+
+from hushh_mcp.types import EncryptedPayload
+
+StoredRecord = Union[EncryptedPayload, bytes]
+
+_FORMAT_JSON = "json"
+_FORMAT_COMPACT = "compact"
+
+# ==================== Credential Store ====================
+
+class CredentialStore:
+    """
+    Per-user encrypted credential store backed by SQLite (WAL mode).
+
+    Writes are single-row upserts, reads are lazy per-user lookups, and
+    SQLite's file locking makes it safe to share between uvicorn workers.
+    Every upsert bumps the row's `version`, so callers can cheaply tell
+    whether credentials changed since they last looked.
+
+    Supports the dict operations the agents already use
+    (`in`, `[]`, `[]=`, `del`, `len`, `keys()`).
+    """
+
+    def __init__(self, path: str, legacy_pickle_path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS credentials ("
+            " user_id TEXT PRIMARY KEY,"
+            " format TEXT NOT NULL,"
+            " data BLOB NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 1,"
+            " updated_at INTEGER NOT NULL)"
+        )
+        if legacy_pickle_path:
+            self._import_legacy_pickle(legacy_pickle_path)
+
+    # ---- record access ----
+
+    def get(self, user_id: str) -> Optional[StoredRecord]:
+        entry = self.get_versioned(user_id)
+        return entry[0] if entry else None
+
+    def get_versioned(self, user_id: str) -> Optional[Tuple[StoredRecord, int]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT format, data, version FROM credentials WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return _decode(row[0], row[1]), row[2]
+
+    def version(self, user_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM credentials WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, user_id: str, record: StoredRecord) -> int:
+        """Upsert one user's record. Returns the new version."""
+        fmt, data = _encode(record)
+        with self._lock:
+            row = self._conn.execute(
+                "INSERT INTO credentials (user_id, format, data, version, updated_at) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET format = excluded.format, data = excluded.data, "
+                "version = credentials.version + 1, updated_at = excluded.updated_at "
+                "RETURNING version",
+                (user_id, fmt, data, int(time.time() * 1000))
+            ).fetchone()
+        return row[0]
+
+    def delete(self, user_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM credentials WHERE user_id = ?", (user_id,))
+        return cursor.rowcount > 0
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT user_id FROM credentials").fetchall()
+        return iter([r[0] for r in rows])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- dict compatibility ----
+
+    def __contains__(self, user_id: str) -> bool:
+        return self.version(user_id) is not None
+
+    def __getitem__(self, user_id: str) -> StoredRecord:
+        record = self.get(user_id)
+        if record is None:
+            raise KeyError(user_id)
+        return record
+
+    def __setitem__(self, user_id: str, record: StoredRecord) -> None:
+        self.put(user_id, record)
+
+    def __delitem__(self, user_id: str) -> None:
+        if not self.delete(user_id):
+            raise KeyError(user_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM credentials").fetchone()[0]
+
+    # ---- migration ----
+
+    def _import_legacy_pickle(self, pickle_path: str) -> None:
+        """One-time import of the old pickled {user_id: record} dict into an empty store."""
+        if not os.path.exists(pickle_path) or len(self):
+            return
+        try:
+            with open(pickle_path, "rb") as f:
+                legacy = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not import legacy token store {pickle_path}: {str(e)}")
+            return
+        for user_id, record in legacy.items():
+            self.put(user_id, record)
+        print(f"📦 Imported {len(legacy)} users from legacy token store {pickle_path}")
+
+# ==================== Serialization ====================
+
+def _encode(record: StoredRecord) -> Tuple[str, bytes]:
+    if isinstance(record, EncryptedPayload):
+        return _FORMAT_JSON, record.model_dump_json().encode("utf-8")
+    return _FORMAT_COMPACT, bytes(record)
+
+def _decode(fmt: str, data: bytes) -> StoredRecord:
+    if fmt == _FORMAT_JSON:
+        return EncryptedPayload.model_validate_json(data)
+    return bytes(data)
@@ -27,8 +27,9 @@ from config import (
 )
 
 # Import the individual agents
-from hushh_mcp.agents.inbox_agent.index import app as inbox_app, InboxAgent
+from hushh_mcp.agents.inbox_agent.index import app as inbox_app, InboxAgent, generation_stream_response
 from hushh_mcp.agents.schedule_agent.index import ScheduleAgent
+from hushh_mcp.agents.schedule_agent.availability import merge_intervals, overlaps_any, parse_instant, parse_intervals
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -268,34 +269,17 @@ async def suggest_calendar_time(request: Request):
                 
                 service = build('calendar', 'v3', credentials=creds)
                 
-                # Get busy times for today
-                busy_result = service.freebusy().query(body={
-                    "timeMin": today.isoformat(),
-                    "timeMax": end_time.isoformat(),
-                    "items": [{"id": 'primary'}]
-                }).execute()
-                
-                busy_times = busy_result['calendars']['primary'].get('busy', [])
+                # Get busy times for today (shared free/busy cache; the window is fixed for the day)
+                calendars = schedule_agent.freebusy.query(
+                    service, user_id, ['primary'], today.isoformat(), end_time.isoformat()
+                )
+                busy = merge_intervals(parse_intervals(calendars['primary'].get('busy', [])))
                 
                 # Filter out busy slots
-                filtered_slots = []
-                for slot in available_slots:
-                    slot_start = datetime.fromisoformat(slot['start'].replace('Z', '+00:00'))
-                    slot_end = datetime.fromisoformat(slot['end'].replace('Z', '+00:00'))
-                    
-                    is_available = True
-                    for busy in busy_times:
-                        busy_start = datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
-                        busy_end = datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
-                        
-                        if (slot_start < busy_end and slot_end > busy_start):
-                            is_available = False
-                            break
-                    
-                    if is_available:
-                        filtered_slots.append(slot)
-                
-                available_slots = filtered_slots
+                available_slots = [
+                    slot for slot in available_slots
+                    if not overlaps_any(busy, parse_instant(slot['start']), parse_instant(slot['end']))
+                ]
                 
             except Exception as e:
                 print(f"❌ Error filtering busy times: {str(e)}")
@@ -404,6 +388,7 @@ async def smart_create_calendar_event(request: Request):
                     calendarId='primary',
                     body=event_data
                 ).execute()
+                schedule_agent.on_event_created(user_id)
                 
                 return {
                     "success": True,
@@ -510,6 +495,7 @@ async def create_calendar_event(request: Request):
                     body=event_data,
                     conferenceDataVersion=1  # Enable Google Meet if requested
                 ).execute()
+                schedule_agent.on_event_created(user_id)
                 
                 return {
                     "success": True,
@@ -631,6 +617,24 @@ async def generate_content_direct(request: Request):
             content={"error": f"Failed to generate content: {str(e)}"}
         )
 
+@app.post("/generate/stream")
+async def stream_content_direct(request: Request):
+    """Streaming variant of /generate - forwards to the inbox agent's SSE generator"""
+    data = await request.json()
+    
+    # Same frontend -> inbox agent transformation as /generate
+    inbox_data = {
+        "token": data.get('token'),
+        "user_id": data.get('user_id'),
+        "message_type": "content_generation",
+        "payload": {
+            "email_ids": data.get('email_ids', []),
+            "type": data.get('type', 'summary'),
+            "custom_prompt": data.get('custom_prompt', '')
+        }
+    }
+    return await generation_stream_response(request, inbox_data)
+
 @app.get("/")
 async def root():
     """Root endpoint for the unified agent server"""
@@ -671,10 +675,15 @@ async def list_agents():
                     "GET /inbox-agent/auth/gmail/callback",
                     "GET /inbox-agent/test-connection",
                     "GET /inbox-agent/emails",
+                    "GET /inbox-agent/emails/stream",
+                    "GET /inbox-agent/emails/{email_id}",
+                    "GET /inbox-agent/search",
                     "POST /inbox-agent/analyze",
                     "POST /inbox-agent/generate",
+                    "POST /inbox-agent/generate/stream",
                     "POST /inbox-agent/categorize",
                     "POST /inbox-agent/smart-reply",
+                    "POST /inbox-agent/smart-reply/stream",
                     "GET /inbox-agent/health"
                 ]
             },
@@ -0,0 +1,247 @@
+# tests/test_calendar_event_store.py
+
+import sqlite3
+import threading
+import time
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from hushh_mcp.agents.schedule_agent.availability import parse_instant
+from hushh_mcp.agents.schedule_agent.event_store import (
+    CalendarEventStore,
+    event_bounds,
+    iter_api_events,
+    normalize_event
+)
+
+KEY = "test-master-key"
+
+
+class _Call:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return self.fn()
+
+
+class _FakeCalendar:
+    """events().list with full listings, syncToken deltas and page tokens."""
+
+    def __init__(self, events, page_size_cap=2):
+        self.events = {e["id"]: e for e in events}
+        self.changes = []
+        self.version = 1
+        self.token_expired = False
+        self.page_size_cap = page_size_cap
+        self.requests = []
+        self.delay = 0
+
+    def change(self, event):
+        if event.get("status") == "cancelled":
+            self.events.pop(event["id"], None)
+        else:
+            self.events[event["id"]] = event
+        self.changes.append(event)
+        self.version += 1
+
+    def list(self, calendarId, singleEvents, maxResults, pageToken=None, syncToken=None, timeMin=None, **params):
+        def run():
+            time.sleep(self.delay)
+            self.requests.append({"syncToken": syncToken, "timeMin": timeMin, "pageToken": pageToken, **params})
+            if syncToken is not None and self.token_expired:
+                raise HttpError(httplib2.Response({"status": 410}), b"Sync token is no longer valid")
+            if syncToken is None:
+                items = list(self.events.values())
+            else:
+                items = self.changes[int(syncToken.split("-")[1]):]
+            start = int(pageToken or 0)
+            page = items[start:start + self.page_size_cap]
+            response = {"items": page}
+            if start + self.page_size_cap < len(items):
+                response["nextPageToken"] = str(start + self.page_size_cap)
+            else:
+                response["nextSyncToken"] = f"v{self.version}-{len(self.changes)}"
+            return response
+        return _Call(run)
+
+    def calendar_service(self):
+        calendar = self
+
+        class _Service:
+            def events(self):
+                return calendar
+        return _Service()
+
+
+def _event(event_id, start, end, summary="Meeting"):
+    return {"id": event_id, "status": "confirmed", "summary": summary,
+            "start": {"dateTime": start}, "end": {"dateTime": end}}
+
+
+def _store(tmp_path, **kwargs):
+    return CalendarEventStore(str(tmp_path / "events.sqlite3"), KEY, **kwargs)
+
+
+def test_event_bounds_handle_all_day_events():
+    assert event_bounds(_event("a", "2024-01-15T10:00:00+01:00", "2024-01-15T11:00:00+01:00")) == (
+        parse_instant("2024-01-15T09:00:00Z"), parse_instant("2024-01-15T10:00:00Z"))
+    assert event_bounds({"start": {"date": "2024-01-15"}, "end": {"date": "2024-01-16"}}) == (
+        parse_instant("2024-01-15"), parse_instant("2024-01-16"))
+
+
+def test_full_sync_pages_then_incremental_changes_and_deletions(tmp_path):
+    calendar = _FakeCalendar([
+        _event("a", "2024-01-15T09:00:00Z", "2024-01-15T10:00:00Z"),
+        _event("b", "2024-01-15T11:00:00Z", "2024-01-15T12:00:00Z"),
+        _event("c", "2024-01-16T09:00:00Z", "2024-01-16T10:00:00Z"),
+    ])
+    store, service = _store(tmp_path), calendar.calendar_service()
+    assert store.sync(service, "u1") == {"full_resync": True, "updated": 3, "deleted": 0}
+    assert len(calendar.requests) == 2 and calendar.requests[0]["timeMin"] is not None
+
+    calendar.change(_event("b", "2024-01-15T13:00:00Z", "2024-01-15T14:00:00Z", summary="Moved"))
+    calendar.change({"id": "c", "status": "cancelled"})
+    calendar.change(_event("d", "2024-01-15T08:00:00Z", "2024-01-15T08:30:00Z"))
+    assert store.sync(service, "u1") == {"full_resync": False, "updated": 2, "deleted": 1}
+    assert calendar.requests[-1]["syncToken"] is not None
+
+    day = store.events("u1", parse_instant("2024-01-15T00:00:00Z"), parse_instant("2024-01-16T00:00:00Z"))
+    assert [(e["id"], e["summary"]) for e in day] == [("d", "Meeting"), ("a", "Meeting"), ("b", "Moved")]
+    assert store.get("u1", "c") is None and store.count("u1") == 3
+
+    # Window queries return overlapping events, and other users see nothing
+    overlapping = store.events("u1", parse_instant("2024-01-15T09:30:00Z"), parse_instant("2024-01-15T13:30:00Z"))
+    assert [e["id"] for e in overlapping] == ["a", "b"]
+    assert store.events("u2", 0, 2 ** 62) == []
+
+
+def test_expired_sync_token_triggers_full_resync(tmp_path):
+    calendar = _FakeCalendar([_event("a", "2024-01-15T09:00:00Z", "2024-01-15T10:00:00Z")])
+    store, service = _store(tmp_path), calendar.calendar_service()
+    store.sync(service, "u1")
+
+    # Deleted while the token was unusable: only a full listing can notice
+    calendar.events.pop("a")
+    calendar.events["z"] = _event("z", "2024-01-17T09:00:00Z", "2024-01-17T10:00:00Z")
+    calendar.token_expired = True
+    assert store.sync(service, "u1")["full_resync"] is True
+    assert store.get("u1", "a") is None and store.get("u1", "z")["id"] == "z"
+
+
+def test_refresh_respects_the_interval_and_mark_stale(tmp_path):
+    calendar = _FakeCalendar([])
+    store, service = _store(tmp_path, min_sync_interval_ms=60 * 1000), calendar.calendar_service()
+    assert store.refresh(service, "u1")["full_resync"] is True
+    assert store.refresh(service, "u1") is None
+    store.mark_stale("u1")
+    assert store.refresh(service, "u1") == {"full_resync": False, "updated": 0, "deleted": 0}
+
+
+def test_event_bodies_are_encrypted_at_rest(tmp_path):
+    calendar = _FakeCalendar([_event("a", "2024-01-15T09:00:00Z", "2024-01-15T10:00:00Z", summary="Board offsite")])
+    store = _store(tmp_path)
+    store.sync(calendar.calendar_service(), "u1")
+    raw = b"".join(path.read_bytes() for path in tmp_path.glob("events.sqlite3*"))
+    assert b"Board offsite" not in raw
+
+
+def test_normalize_event_parses_times_in_their_own_offset():
+    event = normalize_event(_event("a", "2024-01-15T10:00:00+01:00", "2024-01-15T11:30:00+01:00", summary="Sync"))
+    assert (event["id"], event["summary"], event["all_day"]) == ("a", "Sync", False)
+    assert event["start"].hour == 10 and event["start_ms"] == parse_instant("2024-01-15T09:00:00Z")
+    all_day = normalize_event({"id": "b", "start": {"date": "2024-01-15"}, "end": {"date": "2024-01-16"}})
+    assert all_day["all_day"] and all_day["summary"] == "No Title"
+    assert all_day["end_ms"] - all_day["start_ms"] == 24 * 60 * 60 * 1000
+
+
+def test_api_iterator_fetches_pages_lazily(tmp_path):
+    calendar = _FakeCalendar([
+        _event(f"e{i}", f"2024-01-{10 + i}T09:00:00Z", f"2024-01-{10 + i}T10:00:00Z") for i in range(5)
+    ])
+    events = iter_api_events(calendar.calendar_service(), 0, 2 ** 42, page_size=2)
+    assert next(events)["id"] == "e0" and len(calendar.requests) == 1
+    assert [e["id"] for e in events] == ["e1", "e2", "e3", "e4"]
+    assert len(calendar.requests) == 3 and calendar.requests[0]["orderBy"] == "startTime"
+
+
+def test_store_iterator_reads_in_batches(tmp_path):
+    # Several events share a start time so batches must break ties on event_id
+    calendar = _FakeCalendar([
+        _event(f"e{i:02d}", f"2024-01-{10 + i // 3}T09:00:00Z", f"2024-01-{10 + i // 3}T10:00:00Z") for i in range(11)
+    ], page_size_cap=100)
+    store = _store(tmp_path)
+    store.sync(calendar.calendar_service(), "u1")
+    window = (parse_instant("2024-01-10T00:00:00Z"), parse_instant("2024-01-20T00:00:00Z"))
+    streamed = [e["id"] for e in store.iter_events("u1", *window, batch_size=2)]
+    assert streamed == [e["id"] for e in store.events("u1", *window)] == [f"e{i:02d}" for i in range(11)]
+    assert list(store.iter_events("u1", *window, batch_size=11))[-1]["id"] == "e10"
+
+
+def test_windows_older_than_the_lookback_are_not_covered(tmp_path):
+    calendar = _FakeCalendar([])
+    store = _store(tmp_path, lookback_days=90)
+    assert not store.covers("u1", 0)
+    store.sync(calendar.calendar_service(), "u1")
+    now = int(time.time() * 1000)
+    assert store.covers("u1", now - 30 * 24 * 60 * 60 * 1000)
+    assert not store.covers("u1", now - 120 * 24 * 60 * 60 * 1000)
+
+    # Incremental syncs keep the bound; a stale bound is never widened by a delta
+    calendar.change(_event("old", "2020-01-15T09:00:00Z", "2020-01-15T10:00:00Z"))
+    store.sync(calendar.calendar_service(), "u1")
+    assert not store.covers("u1", parse_instant("2020-01-15T00:00:00Z"))
+
+
+def test_concurrent_first_refreshes_run_one_full_resync(tmp_path):
+    calendar = _FakeCalendar([_event("a", "2024-01-15T09:00:00Z", "2024-01-15T10:00:00Z")])
+    calendar.delay = 0.05
+    store = _store(tmp_path)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(store.refresh(calendar.calendar_service(), "u1")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calendar.requests) == 1
+    assert sum(result is not None for result in results) == 1
+
+
+def test_stores_without_a_recorded_bound_resync(tmp_path):
+    path = str(tmp_path / "events.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE calendar_sync_state (user_id TEXT NOT NULL, calendar_id TEXT NOT NULL, "
+        "sync_token TEXT, synced_at INTEGER NOT NULL, PRIMARY KEY (user_id, calendar_id))"
+    )
+    conn.execute("INSERT INTO calendar_sync_state VALUES ('u1', 'primary', 'v1-0', ?)", (int(time.time() * 1000),))
+    conn.commit()
+    conn.close()
+
+    store = CalendarEventStore(path, KEY)
+    assert not store.covers("u1", int(time.time() * 1000))
+    assert store.refresh(_FakeCalendar([]).calendar_service(), "u1")["full_resync"] is True
+
+
+def test_agent_reads_windows_older_than_the_store_from_the_api(tmp_path):
+    from hushh_mcp.agents.schedule_agent.index import ScheduleAgent
+
+    now = int(time.time() * 1000)
+    calendar = _FakeCalendar([_event("recent", "2024-01-15T09:00:00Z", "2024-01-15T10:00:00Z")], page_size_cap=100)
+    agent = ScheduleAgent.__new__(ScheduleAgent)
+    agent.event_store = _store(tmp_path)
+    service = calendar.calendar_service()
+
+    agent.list_events(service, "u1", now - 24 * 60 * 60 * 1000, now)
+    assert len(calendar.requests) == 1 and "timeMax" not in calendar.requests[0]  # the full resync
+
+    old = agent.list_events(service, "u1", parse_instant("2020-01-01T00:00:00Z"), now)
+    assert [e["id"] for e in old] == ["recent"]
+    assert calendar.requests[-1]["timeMax"] is not None and calendar.requests[-1]["orderBy"] == "startTime"
+
+    streamed = list(agent.iter_events(service, "u1", parse_instant("2020-01-01T00:00:00Z"), now))
+    assert [e["id"] for e in streamed] == ["recent"] and len(calendar.requests) == 3
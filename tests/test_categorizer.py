@@ -0,0 +1,62 @@
+# tests/test_categorizer.py
+
+import json
+
+from hushh_mcp.agents.inbox_agent.categorizer import EmailCategorizer, compile_keywords, load_categorizer
+
+RULES = [
+    {"name": "Meeting", "keywords": ["meeting", "invite", "invitation", "call at"]},
+    {"name": "Finance", "keywords": ["invoice", "bill", "billing@"]},
+    {"name": "Urgent", "keywords": ["urgent", "asap"], "weight": 2.0},
+]
+
+
+def test_trie_pattern_matches_longest_keyword_at_word_start():
+    pattern = compile_keywords(["invite", "invitation", "bill", "billing@", "call at"])
+    text = "invitation to call at noon; billing@acme.com; rebill; invited"
+    assert [m.group() for m in pattern.finditer(text)] == ["invitation", "call at", "billing@", "invite"]
+
+
+def test_fields_are_weighted_and_default_applies():
+    categorizer = EmailCategorizer(RULES)
+    results = categorizer.classify_many([
+        {"id": "1", "subject": "Team meeting", "from": "a@x.com", "body": "invoice attached"},
+        {"id": "2", "subject": "Hello", "from": "billing@acme.com", "body": ""},
+        {"id": "3", "subject": "Lunch?", "from": "b@x.com", "body": "nothing to see"},
+        {"id": "4", "subject": "Invoice", "from": "c@x.com", "body": "urgent"},
+    ])
+    assert [r["category"] for r in results] == ["Meeting", "Finance", "General", "Finance"]
+    assert results[0]["confidence"] == 0.75  # 3 (subject) vs 1 (body)
+    assert results[2]["confidence"] == 0.5
+
+
+def test_repeated_keyword_counts_once_per_field_and_ties_keep_rule_order():
+    categorizer = EmailCategorizer(RULES)
+    result = categorizer.classify({"subject": "invoice", "body": "meeting " * 50 + "urgent"})
+    # subject invoice = 3, body meeting = 1 (once), body urgent = 2
+    assert result["category"] == "Finance"
+
+    tie = categorizer.classify({"subject": "meeting invoice"})
+    assert tie["category"] == "Meeting"
+
+
+def test_batch_matches_per_email_even_with_case_changing_characters():
+    categorizer = EmailCategorizer(RULES)
+    emails = [
+        {"id": "a", "subject": "İİİ weekly MEETING", "body": ""},
+        {"id": "b", "subject": "", "body": ""},
+        {"id": "c", "subject": "ASAP please", "body": "ÇİFT invoice"},
+        {"id": "d", "subject": "bill", "from": None},
+    ]
+    assert categorizer.classify_many(emails) == [categorizer.classify(e) for e in emails]
+    assert [r["category"] for r in categorizer.classify_many(emails)] == ["Meeting", "General", "Urgent", "Finance"]
+
+
+def test_rules_load_from_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"default": "Other", "fields": {"subject": 1.0}, "categories": RULES}))
+    categorizer = load_categorizer(str(path))
+    assert categorizer.classify({"subject": "hi", "body": "urgent"})["category"] == "Other"
+
+    shipped = load_categorizer()
+    assert "Meeting" in shipped.names and shipped.default == "General"
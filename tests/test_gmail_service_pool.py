@@ -0,0 +1,129 @@
+# tests/test_gmail_service_pool.py
+
+import json
+import threading
+from datetime import datetime, timedelta
+import pytest
+from hushh_mcp.agents.inbox_agent.service_pool import GmailServicePool
+from hushh_mcp.vault.encrypt import seal_record
+from hushh_mcp.vault.store import CredentialStore
+from hushh_mcp.config import VAULT_ENCRYPTION_KEY
+
+SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
+
+
+def _creds_json(expires_in: timedelta) -> str:
+    return json.dumps({
+        "token": "access",
+        "refresh_token": "refresh",
+        "client_id": "client",
+        "client_secret": "secret",
+        "expiry": (datetime.utcnow() + expires_in).isoformat() + "Z"
+    })
+
+
+@pytest.fixture
+def pool(tmp_path):
+    store = CredentialStore(str(tmp_path / "tokens.sqlite3"))
+    builds = []
+    p = GmailServicePool(
+        store, VAULT_ENCRYPTION_KEY, SCOPES,
+        build_service=lambda creds: builds.append(creds) or object(),
+        refresh_interval_s=0
+    )
+    p.builds = builds
+    yield p
+    p.close()
+    store.close()
+
+
+def _fake_refresh(pool, new_lifetime: timedelta):
+    def refresh(user_id, creds):
+        creds.expiry = datetime.utcnow() + new_lifetime
+        return pool.store.put(user_id, seal_record(creds.to_json(), VAULT_ENCRYPTION_KEY))
+    pool._refresh_and_save = refresh
+
+
+def test_service_is_built_once_per_credential_version(pool):
+    pool.store.put("alice", seal_record(_creds_json(timedelta(hours=1)), VAULT_ENCRYPTION_KEY))
+
+    first = pool.get("alice")
+    assert pool.get("alice") is first
+    assert len(pool.builds) == 1
+
+    # New credentials (e.g. re-authorization) produce a new version and a fresh build
+    pool.store.put("alice", seal_record(_creds_json(timedelta(hours=1)), VAULT_ENCRYPTION_KEY))
+    assert pool.get("alice") is not first
+    assert len(pool.builds) == 2
+    assert pool.stats()["size"] == 1
+
+
+def test_unknown_user_raises_lookup_error(pool):
+    with pytest.raises(LookupError):
+        pool.get("nobody")
+
+
+def test_background_refresh_keeps_pooled_service(pool):
+    _fake_refresh(pool, timedelta(hours=1))
+    pool.refresh_margin_ms = 10 * 60 * 1000
+    pool.store.put("alice", seal_record(_creds_json(timedelta(minutes=6)), VAULT_ENCRYPTION_KEY))
+    service = pool.get("alice")
+
+    assert pool.refresh_due() == 1
+    assert pool.store.version("alice") == 2
+    assert pool.get("alice") is service
+    assert len(pool.builds) == 1
+    assert pool.refresh_due() == 0
+
+
+def test_expired_credentials_are_refreshed_inline(pool):
+    _fake_refresh(pool, timedelta(hours=1))
+    pool.store.put("alice", seal_record(_creds_json(timedelta(hours=-1)), VAULT_ENCRYPTION_KEY))
+
+    pool.get("alice")
+    assert pool.store.version("alice") == 2
+    assert not pool.builds[0].expired
+
+
+def test_slow_refresh_for_one_user_does_not_block_others(pool):
+    release = threading.Event()
+    refreshing = threading.Event()
+
+    def slow_refresh(user_id, creds):
+        refreshing.set()
+        release.wait(5)
+        creds.expiry = datetime.utcnow() + timedelta(hours=1)
+        return pool.store.put(user_id, seal_record(creds.to_json(), VAULT_ENCRYPTION_KEY))
+    pool._refresh_and_save = slow_refresh
+    pool.refresh_margin_ms = 10 * 60 * 1000
+    pool.store.put("alice", seal_record(_creds_json(timedelta(minutes=6)), VAULT_ENCRYPTION_KEY))
+    pool.store.put("bob", seal_record(_creds_json(timedelta(hours=1)), VAULT_ENCRYPTION_KEY))
+    pool.get("alice")
+
+    refresher = threading.Thread(target=pool.refresh_due)
+    refresher.start()
+    assert refreshing.wait(5)
+    try:
+        # bob's pool miss builds while alice's refresh is still in flight
+        loaded = []
+        getter = threading.Thread(target=lambda: loaded.append(pool.get("bob")))
+        getter.start()
+        getter.join(2)
+        assert loaded and len(pool.builds) == 2
+    finally:
+        release.set()
+        refresher.join()
+
+
+def test_credentials_saved_during_refresh_are_reloaded(pool):
+    def racing_refresh(user_id, creds):
+        pool.store.put(user_id, seal_record(_creds_json(timedelta(hours=2)), VAULT_ENCRYPTION_KEY))  # another worker
+        creds.expiry = datetime.utcnow() + timedelta(hours=1)
+        return pool.store.put(user_id, seal_record(creds.to_json(), VAULT_ENCRYPTION_KEY))
+    pool._refresh_and_save = racing_refresh
+    pool.refresh_margin_ms = 10 * 60 * 1000
+    pool.store.put("alice", seal_record(_creds_json(timedelta(minutes=6)), VAULT_ENCRYPTION_KEY))
+    first = pool.get("alice")
+
+    assert pool.refresh_due() == 0
+    assert pool.get("alice") is not first and len(pool.builds) == 2
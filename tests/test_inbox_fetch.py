@@ -0,0 +1,93 @@
+# tests/test_inbox_fetch.py
+
+from hushh_mcp.agents.inbox_agent.fetch import fetch_messages, iter_parsed_messages
+
+
+class _FakeGet:
+    def __init__(self, service, message_id):
+        self.service = service
+        self.message_id = message_id
+
+    def execute(self):
+        self.service.single_calls.append(self.message_id)
+        if self.message_id in self.service.missing:
+            raise RuntimeError("404")
+        return {"id": self.message_id}
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append(len(self.requests))
+        for request_id, request in self.requests:
+            if request_id in self.service.flaky or request_id in self.service.missing:
+                self.callback(request_id, None, RuntimeError("429"))
+            else:
+                self.callback(request_id, {"id": request_id}, None)
+
+
+class _FakeService:
+    def __init__(self, flaky=(), missing=()):
+        self.flaky = set(flaky)
+        self.missing = set(missing)
+        self.batches = []
+        self.single_calls = []
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, format, **kwargs):
+        return _FakeGet(self, id)
+
+
+def test_messages_are_fetched_in_batches_and_keep_order():
+    service = _FakeService()
+    ids = [f"m{i}" for i in range(120)]
+    results = fetch_messages(service, ids)
+
+    assert [r["id"] for r in results] == ids
+    assert service.batches == [50, 50, 20]
+    assert service.single_calls == []
+
+
+def test_partial_failures_fall_back_per_message():
+    service = _FakeService(flaky={"m1"}, missing={"m2"})
+    results = fetch_messages(service, ["m0", "m1", "m2"])
+
+    assert results[0] == {"id": "m0"}
+    assert results[1] == {"id": "m1"}  # recovered by the single-request retry
+    assert results[2] is None
+    assert sorted(service.single_calls) == ["m1", "m2"]
+
+
+def test_iter_parsed_messages_yields_cache_hits_first():
+    class _Cache:
+        def __init__(self):
+            self.stored = {"m2": {"id": "m2"}}
+
+        def get_many(self, user_id, ids):
+            return {i: self.stored[i] for i in ids if i in self.stored}
+
+        def put(self, user_id, message_id, parsed):
+            self.stored[message_id] = parsed
+
+    cache = _Cache()
+    service = _FakeService(missing={"m1"})
+    results = list(iter_parsed_messages(service, "alice", ["m0", "m1", "m2"], cache, parse=lambda m: m))
+
+    assert results[0] == (2, "m2", {"id": "m2"})
+    assert sorted(results[1:], key=lambda r: r[0]) == [(0, "m0", {"id": "m0"}), (1, "m1", None)]
+    assert "m0" in cache.stored and "m1" not in cache.stored
@@ -0,0 +1,85 @@
+# tests/test_inbox_search.py
+
+import random
+import time
+
+from hushh_mcp.agents.inbox_agent.message_cache import MessageCache
+from hushh_mcp.agents.inbox_agent.search import SearchIndex, tokenize
+
+KEY = "test-master-key"
+
+
+def _message(subject, sender="alice@example.com", body=""):
+    return {"subject": subject, "from": sender, "body": body, "date": "Mon, 1 Jan 2024", "snippet": body[:40]}
+
+
+def _index(tmp_path):
+    return SearchIndex(str(tmp_path / "search.sqlite3"), KEY)
+
+
+def test_tokenize_drops_stopwords_and_single_characters():
+    assert tokenize("Re: The Q3 invoice, and a PDF!") == ["q3", "invoice", "pdf"]
+
+
+def test_ranking_prefers_subject_and_rarer_terms(tmp_path):
+    index = _index(tmp_path)
+    index.add_many("u1", {
+        "m1": _message("Quarterly invoice", body="Please find the numbers attached."),
+        "m2": _message("Lunch", body="The invoice is on my desk, also lunch at noon."),
+        "m3": _message("Lunch plans", body="Lunch at noon tomorrow?"),
+    })
+    results = index.search("u1", "invoice")
+    assert [r["id"] for r in results] == ["m1", "m2"]
+    assert results[0]["subject"] == "Quarterly invoice" and results[0]["from"] == "alice@example.com"
+
+    # Documents matching more query terms rank higher
+    assert index.search("u1", "lunch invoice")[0]["id"] == "m2"
+    assert index.search("u1", "nothing-matches-this") == []
+    assert index.search("u1", "the a") == []
+
+
+def test_users_are_isolated_and_nothing_is_stored_in_clear(tmp_path):
+    index = _index(tmp_path)
+    index.add("u1", "m1", _message("Secret merger plans", body="confidential"))
+    index.add("u2", "m9", _message("Merger newsletter"))
+    assert [r["id"] for r in index.search("u1", "merger")] == ["m1"]
+    assert [r["id"] for r in index.search("u2", "merger")] == ["m9"]
+
+    raw = open(tmp_path / "search.sqlite3", "rb").read()
+    for path in tmp_path.glob("search.sqlite3*"):
+        raw += path.read_bytes()
+    assert b"merger" not in raw.lower() and b"confidential" not in raw
+
+
+def test_reindex_and_remove_keep_stats_consistent(tmp_path):
+    index = _index(tmp_path)
+    index.add("u1", "m1", _message("Budget draft"))
+    index.add("u1", "m1", _message("Budget final"))
+    assert index.count("u1") == 1
+    assert index.search("u1", "draft") == []
+    assert index.search("u1", "final")[0]["id"] == "m1"
+
+    assert index.remove("u1", ["m1", "unknown"]) == 1
+    assert index.count("u1") == 0
+    assert index.search("u1", "budget") == []
+
+
+def test_message_cache_feeds_the_index(tmp_path):
+    index = _index(tmp_path)
+    cache = MessageCache(str(tmp_path / "cache.sqlite3"), KEY, on_store=index.add_many)
+    cache.put("u1", "m1", _message("Flight itinerary", body="Lisbon, gate 12"))
+    assert index.search("u1", "lisbon")[0]["id"] == "m1"
+
+
+def test_queries_stay_fast_on_a_large_mailbox(tmp_path):
+    rng = random.Random(3)
+    words = [f"word{i}" for i in range(3000)]
+    index = _index(tmp_path)
+    index.add_many("u1", {
+        f"m{n}": _message(" ".join(rng.choices(words, k=6)), body=" ".join(rng.choices(words, k=120)))
+        for n in range(1000)
+    })
+    started = time.perf_counter()
+    for _ in range(20):
+        index.search("u1", "word17 word2048 word999")
+    assert (time.perf_counter() - started) / 20 < 0.05
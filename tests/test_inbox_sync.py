@@ -0,0 +1,215 @@
+# tests/test_inbox_sync.py
+
+import sqlite3
+import threading
+import time
+
+import httplib2
+from googleapiclient.errors import HttpError
+from hushh_mcp.agents.inbox_agent.sync import InboxSync, is_index_cursor
+
+
+class _Call:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return self.fn()
+
+
+class _FakeGmail:
+    def __init__(self, inbox, history_id="100"):
+        self.inbox = list(inbox)  # newest first
+        self.history_id = history_id
+        self.history = []
+        self.history_expired = False
+        self.list_calls = 0
+        self.profile_calls = 0
+        self.delay = 0
+
+    def getProfile(self, userId):
+        def run():
+            self.profile_calls += 1
+            time.sleep(self.delay)
+            return {"historyId": self.history_id}
+        return _Call(run)
+
+    def list(self, userId, labelIds=None, maxResults=500, pageToken=None, **kwargs):
+        def run():
+            self.list_calls += 1
+            start = int(pageToken or 0)
+            page = self.inbox[start:start + maxResults]
+            result = {"messages": [{"id": m} for m in page]}
+            if start + maxResults < len(self.inbox):
+                result["nextPageToken"] = str(start + maxResults)
+            return result
+        return _Call(run)
+
+    def history_list(self, userId, startHistoryId, historyTypes=None, pageToken=None):
+        def run():
+            if self.history_expired:
+                raise HttpError(httplib2.Response({"status": 404}), b"history expired")
+            return {"history": self.history, "historyId": self.history_id}
+        return _Call(run)
+
+
+class _FakeHistory:
+    def __init__(self, gmail):
+        self.gmail = gmail
+
+    def list(self, **kwargs):
+        return self.gmail.history_list(**kwargs)
+
+
+class _Service:
+    """users() returns an object exposing messages(), history() and getProfile()."""
+    def __init__(self, gmail):
+        self.gmail = gmail
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self.gmail
+
+    def history(self):
+        return _FakeHistory(self.gmail)
+
+    def getProfile(self, userId):
+        return self.gmail.getProfile(userId)
+
+
+class _Cache:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, user_id, message_ids=None):
+        self.invalidated.append(None if message_ids is None else sorted(message_ids))
+
+
+def test_first_sync_is_full_then_incremental(tmp_path):
+    gmail = _FakeGmail([f"m{i}" for i in range(5, 0, -1)])
+    service = _Service(gmail)
+    sync = InboxSync(str(tmp_path / "sync.sqlite3"), list_page_size=2)
+
+    assert sync.sync(service, "alice")["full_resync"] is True
+    assert sync.history_id("alice") == "100"
+    assert sync.count("alice") == 2 and not sync.is_complete("alice")
+    assert sync.backfill(service, "alice") == 2
+    assert sync.count("alice") == 5 and sync.is_complete("alice")
+
+    gmail.history_id = "105"
+    gmail.history = [
+        {"id": "101", "messagesAdded": [{"message": {"id": "m6", "labelIds": ["INBOX", "UNREAD"]}}]},
+        {"id": "102", "labelsRemoved": [{"message": {"id": "m5"}, "labelIds": ["INBOX"]}]},
+        {"id": "103", "messagesAdded": [{"message": {"id": "d1", "labelIds": ["DRAFT"]}}]}
+    ]
+    list_calls = gmail.list_calls
+    changes = sync.sync(service, "alice")
+
+    assert changes == {"full_resync": False, "added": 1, "removed": 1, "changed": 1}
+    assert gmail.list_calls == list_calls  # no re-listing
+    assert sync.history_id("alice") == "105"
+    ids, _ = sync.page("alice", 10)
+    assert ids == ["m6", "m4", "m3", "m2", "m1"]
+    sync.close()
+
+
+def test_pages_are_stable_when_mail_arrives(tmp_path):
+    gmail = _FakeGmail([f"m{i}" for i in range(5, 0, -1)])
+    service = _Service(gmail)
+    sync = InboxSync(str(tmp_path / "sync.sqlite3"))
+    sync.sync(service, "alice")
+
+    first, cursor = sync.page("alice", 2)
+    assert first == ["m5", "m4"] and is_index_cursor(cursor)
+
+    gmail.history = [{"id": "101", "messagesAdded": [{"message": {"id": "m6", "labelIds": ["INBOX"]}}]}]
+    sync.sync(service, "alice")
+
+    second, cursor = sync.page("alice", 2, cursor)
+    third, cursor = sync.page("alice", 2, cursor)
+    assert second == ["m3", "m2"]
+    assert third == ["m1"] and cursor is None
+    sync.close()
+
+
+def test_expired_history_triggers_full_resync(tmp_path):
+    gmail = _FakeGmail(["m2", "m1"])
+    service = _Service(gmail)
+    cache = _Cache()
+    sync = InboxSync(str(tmp_path / "sync.sqlite3"), message_cache=cache)
+    sync.sync(service, "alice")
+
+    gmail.history_expired = True
+    gmail.inbox = ["m3", "m1"]
+    gmail.history_id = "200"
+    assert sync.sync(service, "alice")["full_resync"] is True
+    assert sync.page("alice", 10)[0] == ["m3", "m1"]
+    assert sync.history_id("alice") == "200"
+    assert cache.invalidated[-1] is None
+    sync.close()
+
+
+def test_resync_seeds_one_page_and_backfills_in_order(tmp_path):
+    gmail = _FakeGmail([f"m{i}" for i in range(10, 0, -1)])
+    service = _Service(gmail)
+    sync = InboxSync(str(tmp_path / "sync.sqlite3"), list_page_size=3)
+
+    sync.sync(service, "alice")
+    assert gmail.list_calls == 1 and gmail.profile_calls == 1
+    assert sync.page("alice", 10)[0] == ["m10", "m9", "m8"]
+
+    # Mail arriving mid-backfill shifts Gmail's pages; overlaps keep their first position
+    gmail.history = [{"id": "101", "messagesAdded": [{"message": {"id": "m11", "labelIds": ["INBOX"]}}]}]
+    sync.sync(service, "alice")
+    gmail.inbox.insert(0, "m11")
+    assert sync.backfill(service, "alice", max_pages=1) == 1 and not sync.is_complete("alice")
+    sync.backfill(service, "alice")
+
+    assert sync.is_complete("alice")
+    assert sync.page("alice", 20)[0] == ["m11"] + [f"m{i}" for i in range(10, 0, -1)]
+    assert sync.backfill(service, "alice") == 0
+    sync.close()
+
+
+def test_concurrent_first_syncs_seed_once(tmp_path):
+    gmail = _FakeGmail(["m2", "m1"])
+    gmail.delay = 0.05
+    service = _Service(gmail)
+    sync = InboxSync(str(tmp_path / "sync.sqlite3"))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(sync.sync(service, "alice"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert gmail.profile_calls == 1
+    assert sum(result["full_resync"] for result in results) == 1
+    sync.close()
+
+
+def test_background_backfill(tmp_path):
+    gmail = _FakeGmail([f"m{i}" for i in range(7, 0, -1)])
+    service = _Service(gmail)
+    sync = InboxSync(str(tmp_path / "sync.sqlite3"), list_page_size=2)
+    sync.sync(service, "alice")
+    assert sync.start_backfill(service, "alice") is True
+    deadline = time.time() + 5
+    while not sync.is_complete("alice") and time.time() < deadline:
+        time.sleep(0.01)
+    assert sync.count("alice") == 7
+    sync.close()
+
+
+def test_indexes_from_before_backfill_count_as_complete(tmp_path):
+    path = str(tmp_path / "sync.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sync_state (user_id TEXT PRIMARY KEY, history_id TEXT NOT NULL, synced_at INTEGER NOT NULL)")
+    conn.execute("INSERT INTO sync_state VALUES ('alice', '100', 0)")
+    conn.commit()
+    conn.close()
+
+    sync = InboxSync(path)
+    assert sync.is_complete("alice") and not sync.is_complete("bob")
+    sync.close()
@@ -0,0 +1,101 @@
+# tests/test_llm_cache.py
+
+import asyncio
+import time
+
+from hushh_mcp.config import VAULT_ENCRYPTION_KEY
+from hushh_mcp.llm.cache import LLMResponseCache, cache_key
+from hushh_mcp.llm.client import FakeLLMBackend, LLMClient
+
+
+def _cache(tmp_path, **kwargs):
+    return LLMResponseCache(str(tmp_path / "llm.sqlite3"), VAULT_ENCRYPTION_KEY, **kwargs)
+
+
+def test_key_normalizes_whitespace_but_not_parameters():
+    a = cache_key("m", [{"role": "user", "content": "\n    Summarize   this\n  "}], {"temperature": 0.3})
+    b = cache_key("m", [{"role": "user", "content": "Summarize this"}], {"temperature": 0.3})
+    assert a == b
+    assert a != cache_key("m", [{"role": "user", "content": "Summarize this"}], {"temperature": 0.7})
+    assert a != cache_key("other", [{"role": "user", "content": "Summarize this"}], {"temperature": 0.3})
+    assert a != cache_key("m", [{"role": "system", "content": "Summarize this"}], {"temperature": 0.3})
+
+
+def test_entries_are_encrypted_and_counted(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("k", "secret reply", latency_ms=1200)
+    raw = cache._conn.execute("SELECT data FROM llm_responses").fetchone()[0]
+    assert b"secret reply" not in raw
+
+    assert cache.get("k") == "secret reply"
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["saved_ms"]) == (1, 1, 1200)
+
+
+def test_ttl_expiry(tmp_path):
+    cache = _cache(tmp_path, ttl_ms=1)
+    cache.put("k", "reply")
+    time.sleep(0.01)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_bound_evicts_least_recently_read(tmp_path):
+    cache = _cache(tmp_path, max_bytes=3 * 200)
+    for name in ["a", "b", "c"]:
+        cache.put(name, name * 150)
+    cache.get("a")
+    cache.put("d", "d" * 150)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_client_serves_repeats_from_cache(tmp_path):
+    backend = FakeLLMBackend()
+    client = LLMClient(backend, cache=_cache(tmp_path))
+    messages = [{"role": "user", "content": "analyze these emails"}]
+
+    async def run():
+        first = await client.complete(messages, temperature=0.3)
+        second = await client.complete(messages, temperature=0.3)
+        fresh = await client.complete(messages, temperature=0.3, use_cache=False)
+        other = await client.complete(messages, temperature=0.9)
+        return first, second, fresh, other
+
+    first, second, fresh, other = asyncio.run(run())
+    assert first == second == fresh
+    assert len(backend.calls) == 3
+    assert "use_cache" not in backend.calls[-1].params
+    assert client.stats()["cache"]["hits"] == 1
+
+
+def test_cache_failures_fall_through_to_the_backend(tmp_path):
+    messages = [{"role": "user", "content": "summarize"}]
+    asyncio.run(LLMClient(FakeLLMBackend(), cache=_cache(tmp_path)).complete(messages))
+
+    # Rows written under another key can't be decrypted: treated as a miss, then overwritten
+    rotated = LLMResponseCache(str(tmp_path / "llm.sqlite3"), "cd" * 32)
+    backend = FakeLLMBackend()
+    client = LLMClient(backend, cache=rotated)
+    assert asyncio.run(client.complete(messages)).startswith("[fake")
+    assert asyncio.run(client.complete(messages)).startswith("[fake") and len(backend.calls) == 1
+
+    class _Broken:
+        def get(self, key):
+            raise RuntimeError("database is locked")
+
+        def put(self, key, response, latency_ms=0):
+            raise RuntimeError("database is locked")
+
+    backend = FakeLLMBackend()
+    client = LLMClient(backend, cache=_Broken())
+
+    async def run():
+        text = await client.complete(messages)
+        streamed = [delta async for delta in client.stream(messages)]
+        return text, streamed
+
+    text, streamed = asyncio.run(run())
+    assert text.startswith("[fake") and "".join(streamed) == text and len(backend.calls) == 2
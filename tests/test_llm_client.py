@@ -0,0 +1,175 @@
+# tests/test_llm_client.py
+
+import asyncio
+
+import pytest
+
+from hushh_mcp.llm.client import FakeLLMBackend, LLMClient, LLMUnavailable
+
+
+class _Transient(Exception):
+    status_code = 503
+
+
+def _tracking_backend(delay_s=0.02):
+    state = {"active": 0, "peak": 0, "per_user": {}, "per_user_peak": {}}
+
+    async def respond(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        user = request.user_id
+        state["per_user"][user] = state["per_user"].get(user, 0) + 1
+        state["per_user_peak"][user] = max(state["per_user_peak"].get(user, 0), state["per_user"][user])
+        await asyncio.sleep(delay_s)
+        state["active"] -= 1
+        state["per_user"][user] -= 1
+        return "ok"
+
+    return FakeLLMBackend(respond), state
+
+
+def _ask(client, user_id=None):
+    return client.complete([{"role": "user", "content": "hi"}], user_id=user_id)
+
+
+def test_complete_returns_backend_text():
+    backend = FakeLLMBackend()
+    client = LLMClient(backend)
+    text = asyncio.run(client.complete([{"role": "user", "content": "hello   there"}], temperature=0.1))
+    assert text == "[fake gpt-3.5-turbo] hello there"
+    assert backend.calls[0].params == {"temperature": 0.1}
+
+
+def test_global_and_per_user_concurrency_limits():
+    backend, state = _tracking_backend()
+    client = LLMClient(backend, max_concurrency=3, per_user_concurrency=2)
+
+    async def run():
+        users = ["alice"] * 6 + ["bob"] * 6 + ["carol"] * 6
+        return await asyncio.gather(*(_ask(client, user) for user in users))
+
+    assert asyncio.run(run()) == ["ok"] * 18
+    assert state["peak"] == 3
+    assert max(state["per_user_peak"].values()) == 2
+    assert client.stats()["in_flight"] == 0
+    assert client._users == {}
+
+
+def test_timeout_is_retried_then_succeeds():
+    attempts = []
+
+    async def respond(request):
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(1)
+        return "done"
+
+    client = LLMClient(FakeLLMBackend(respond), timeout_s=0.05, max_retries=2, backoff_s=0.001)
+    assert asyncio.run(_ask(client)) == "done"
+    stats = client.stats()
+    assert stats["timeouts"] == 1 and stats["retries"] == 1 and stats["calls"] == 2
+
+
+def test_transient_errors_give_up_after_max_retries():
+    def respond(request):
+        raise _Transient("unavailable")
+
+    backend = FakeLLMBackend(respond)
+    client = LLMClient(backend, max_retries=2, backoff_s=0.001)
+    with pytest.raises(_Transient):
+        asyncio.run(_ask(client))
+    assert len(backend.calls) == 3
+    assert client.stats()["failures"] == 1
+
+
+def test_non_retryable_error_raises_immediately():
+    def respond(request):
+        raise ValueError("bad request")
+
+    backend = FakeLLMBackend(respond)
+    client = LLMClient(backend, max_retries=3, backoff_s=0.001)
+    with pytest.raises(ValueError):
+        asyncio.run(_ask(client))
+    assert len(backend.calls) == 1
+
+
+def test_unavailable_without_backend():
+    client = LLMClient(None)
+    assert not client.available
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(_ask(client))
+
+
+def _collect(client, **kwargs):
+    async def run():
+        return [delta async for delta in client.stream([{"role": "user", "content": "hello there friend"}], **kwargs)]
+    return asyncio.run(run())
+
+
+def test_stream_yields_deltas_and_counts_one_call():
+    client = LLMClient(FakeLLMBackend())
+    deltas = _collect(client)
+    assert len(deltas) > 1
+    assert "".join(deltas) == "[fake gpt-3.5-turbo] hello there friend"
+    assert client.stats()["calls"] == 1
+
+
+def test_stream_retries_only_before_first_delta():
+    class FlakyBackend(FakeLLMBackend):
+        def __init__(self, fail_after):
+            super().__init__(lambda request: "one two three")
+            self.fail_after = fail_after
+            self.attempts = 0
+
+        async def stream(self, request):
+            self.attempts += 1
+            sent = 0
+            async for delta in super().stream(request):
+                if self.attempts == 1 and sent == self.fail_after:
+                    raise _Transient("dropped")
+                sent += 1
+                yield delta
+
+    early = FlakyBackend(fail_after=0)
+    assert "".join(_collect(LLMClient(early, backoff_s=0.001))) == "one two three"
+    assert early.attempts == 2
+
+    late = FlakyBackend(fail_after=1)
+    with pytest.raises(_Transient):
+        _collect(LLMClient(late, backoff_s=0.001))
+    assert late.attempts == 1
+
+
+def test_closing_stream_releases_slot_and_upstream():
+    closed = []
+
+    class SlowBackend(FakeLLMBackend):
+        async def stream(self, request):
+            try:
+                for i in range(100):
+                    await asyncio.sleep(0.001)
+                    yield f"tok{i} "
+            finally:
+                closed.append(True)
+
+    client = LLMClient(SlowBackend(), max_concurrency=1)
+
+    async def run():
+        stream = client.stream([{"role": "user", "content": "hi"}], user_id="alice")
+        first = await stream.__anext__()
+        await stream.aclose()
+        # The single global slot is free again
+        second = await asyncio.wait_for(stream_first(client), 1)
+        return first, second
+
+    async def stream_first(client):
+        stream = client.stream([{"role": "user", "content": "hi"}], user_id="alice")
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    assert asyncio.run(run()) == ("tok0 ", "tok0 ")
+    assert closed == [True, True]
+    assert client.stats()["in_flight"] == 0
+    assert client._users == {}
@@ -0,0 +1,100 @@
+# tests/test_llm_mapreduce.py
+
+import asyncio
+
+from hushh_mcp.llm.client import FakeLLMBackend, LLMClient
+from hushh_mcp.llm.mapreduce import estimate_tokens, map_reduce, pack_batches, truncate_to_tokens
+
+
+def _prompt(request):
+    return request.messages[-1]["content"]
+
+
+def test_pack_batches_keeps_order_and_budget():
+    items = [f"email {i} " + "x" * 100 for i in range(20)]
+    batches = pack_batches(items, budget_tokens=100)
+    assert [item for batch in batches for item in batch] == items
+    assert all(sum(estimate_tokens(i) for i in batch) <= 100 for batch in batches)
+    assert len(batches) > 1
+
+    # Oversized items still get a batch of their own
+    assert pack_batches(["y" * 1000, "z"], budget_tokens=10) == [["y" * 1000], ["z"]]
+
+
+def test_truncate_to_tokens():
+    text = "word " * 1000
+    assert truncate_to_tokens(text, 50) != text
+    assert estimate_tokens(truncate_to_tokens(text, 50)) <= 50
+    assert truncate_to_tokens("short", 50) == "short"
+
+
+def test_small_input_is_a_single_direct_call():
+    backend = FakeLLMBackend(lambda request: "final")
+    client = LLMClient(backend)
+    result = asyncio.run(map_reduce(
+        client, ["a", "b"],
+        map_prompt=lambda text: f"MAP {text}",
+        reduce_prompt=lambda text: f"REDUCE {text}",
+        direct_prompt=lambda text: f"DIRECT {text}",
+        batch_tokens=1000
+    ))
+    assert result == "final"
+    assert [_prompt(c).split()[0] for c in backend.calls] == ["DIRECT"]
+
+
+def test_large_input_maps_every_item_in_parallel_then_reduces():
+    active = {"now": 0, "peak": 0}
+
+    async def respond(request):
+        prompt = _prompt(request)
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if prompt.startswith("MAP"):
+            return "partial(" + ",".join(line for line in prompt.split() if line.startswith("email")) + ")"
+        return "final"
+
+    backend = FakeLLMBackend(respond)
+    client = LLMClient(backend, max_concurrency=8)
+    items = [f"email{i} " + "body " * 40 for i in range(200)]
+    result = asyncio.run(map_reduce(
+        client, items,
+        map_prompt=lambda text: f"MAP {text}",
+        reduce_prompt=lambda text: f"REDUCE {text}",
+        batch_tokens=600,
+        user_id=None
+    ))
+
+    assert result == "final"
+    map_calls = [c for c in backend.calls if _prompt(c).startswith("MAP")]
+    mapped = " ".join(_prompt(c) for c in map_calls)
+    assert all(f"email{i} " in mapped for i in range(200))
+    assert len(map_calls) > 1
+    assert active["peak"] > 1
+    assert all(c.params["max_tokens"] == 600 for c in map_calls)
+    assert _prompt(backend.calls[-1]).startswith("REDUCE")
+
+
+def test_reduce_runs_in_rounds_until_partials_fit():
+    def respond(request):
+        prompt = _prompt(request)
+        if prompt.startswith(("MAP", "COMBINE")):
+            return "p" * 400  # ~100 tokens per partial
+        return "final"
+
+    backend = FakeLLMBackend(respond)
+    client = LLMClient(backend)
+    items = ["i" * 400 for _ in range(30)]
+    result = asyncio.run(map_reduce(
+        client, items,
+        map_prompt=lambda text: f"MAP {text}",
+        combine_prompt=lambda text: f"COMBINE {text}",
+        reduce_prompt=lambda text: f"REDUCE {text}",
+        batch_tokens=250
+    ))
+
+    kinds = [_prompt(c).split()[0] for c in backend.calls]
+    assert result == "final"
+    assert "COMBINE" in kinds
+    assert kinds[-1] == "REDUCE" and kinds.count("REDUCE") == 1
@@ -0,0 +1,65 @@
+# tests/test_message_cache.py
+
+from hushh_mcp.agents.inbox_agent.message_cache import MessageCache
+from hushh_mcp.agents.inbox_agent.fetch import fetch_parsed_messages
+from hushh_mcp.config import VAULT_ENCRYPTION_KEY
+
+
+def _message(i: int, body: str = "hello") -> dict:
+    return {"id": f"m{i}", "subject": f"Subject {i}", "from": "a@b.c", "body": body, "labels": ["INBOX"]}
+
+
+def test_roundtrip_is_encrypted_at_rest(tmp_path):
+    path = str(tmp_path / "messages.sqlite3")
+    cache = MessageCache(path, VAULT_ENCRYPTION_KEY)
+    cache.put("alice", "m1", _message(1, body="secret quarterly numbers"))
+
+    assert cache.get("alice", "m1")["body"] == "secret quarterly numbers"
+    assert cache.get("bob", "m1") is None
+    cache.close()
+
+    with open(path, "rb") as f:
+        assert b"secret quarterly numbers" not in f.read()
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = MessageCache(str(tmp_path / "messages.sqlite3"), VAULT_ENCRYPTION_KEY, max_bytes=2000)
+    for i in range(3):
+        cache.put("alice", f"m{i}", _message(i, body="x" * 500))
+    cache.get("alice", "m0")  # m0 becomes most recently used
+    cache.put("alice", "m3", _message(3, body="x" * 500))
+
+    assert cache.stats()["bytes"] <= 2000
+    assert cache.get("alice", "m0") is not None
+    assert cache.get("alice", "m1") is None
+    cache.close()
+
+
+def test_invalidate_drops_entries(tmp_path):
+    cache = MessageCache(str(tmp_path / "messages.sqlite3"), VAULT_ENCRYPTION_KEY)
+    cache.put_many("alice", {"m1": _message(1), "m2": _message(2)})
+    assert cache.invalidate("alice", ["m1"]) == 1
+    assert set(cache.get_many("alice", ["m1", "m2"])) == {"m2"}
+    assert cache.invalidate("alice") == 1
+    cache.close()
+
+
+def test_fetch_parsed_messages_only_fetches_misses(tmp_path, monkeypatch):
+    cache = MessageCache(str(tmp_path / "messages.sqlite3"), VAULT_ENCRYPTION_KEY)
+    cache.put("alice", "m1", _message(1))
+    requested = []
+
+    def fake_fetch(service, ids, **kwargs):
+        requested.extend(ids)
+        return [{"id": i} for i in ids]
+
+    monkeypatch.setattr("hushh_mcp.agents.inbox_agent.fetch.fetch_messages", fake_fetch)
+    parse = lambda message: _message(int(message["id"][1:]))
+
+    results = fetch_parsed_messages(None, "alice", ["m1", "m2"], cache, parse)
+    assert [r["id"] for r in results] == ["m1", "m2"]
+    assert requested == ["m2"]
+
+    fetch_parsed_messages(None, "alice", ["m1", "m2"], cache, parse)
+    assert requested == ["m2"]
+    cache.close()
@@ -0,0 +1,65 @@
+# tests/test_mime.py
+
+import base64
+from hushh_mcp.agents.inbox_agent.mime import extract_body, html_to_text
+
+
+def _part(mime_type: str, data: bytes, charset: str = None, **extra) -> dict:
+    content_type = f"{mime_type}; charset={charset}" if charset else mime_type
+    part = {
+        "mimeType": mime_type,
+        "headers": [{"name": "Content-Type", "value": content_type}],
+        "body": {"data": base64.urlsafe_b64encode(data).decode().rstrip("="), "size": len(data)}
+    }
+    part.update(extra)
+    return part
+
+
+def _multipart(subtype: str, *parts) -> dict:
+    return {"mimeType": f"multipart/{subtype}", "headers": [], "body": {"size": 0}, "parts": list(parts)}
+
+
+def test_finds_plain_text_at_any_depth():
+    payload = _multipart("mixed", _multipart("related", _multipart("alternative", _multipart(
+        "alternative", _part("text/html", b"<p>html</p>"), _part("text/plain", b"deep plain")
+    ))))
+    assert extract_body(payload) == "deep plain"
+
+
+def test_falls_back_to_html_and_skips_attachments():
+    payload = _multipart(
+        "mixed",
+        _part("text/plain", b"not the body", filename="notes.txt"),
+        _part("text/html", b"<html><style>p{}</style><p>Hello&nbsp;<b>there</b></p><p>Line 2</p></html>")
+    )
+    assert extract_body(payload) == "Hello there\nLine 2"
+
+
+def test_respects_declared_charset():
+    payload = _part("text/plain", "Café crème".encode("iso-8859-1"), charset='"ISO-8859-1"')
+    assert extract_body(payload) == "Café crème"
+
+
+def test_byte_cap_does_not_split_characters():
+    payload = _part("text/plain", ("é" * 1000).encode("utf-8"), charset="utf-8")
+    capped = extract_body(payload, max_bytes=11)
+    assert capped == "é" * 5
+    assert extract_body(payload, max_bytes=10_000) == "é" * 1000
+
+
+def test_html_to_text_drops_scripts_and_comments():
+    markup = "<div>a<script>alert(1)</script></div><!-- hidden --><div>b &amp; c</div>"
+    assert html_to_text(markup) == "a\nb & c"
+
+
+def test_byte_cap_inside_a_script_does_not_leak_source():
+    markup = b"<p>Hi <b>there</b></p><script>var secret = 'tracking-id';</script><p>after</p>"
+    payload = _part("text/html", markup)
+    cut = markup.index(b"secret")
+    assert extract_body(payload, max_bytes=cut) == "Hi there"
+    assert extract_body(payload, max_bytes=markup.index(b"<p>after")) == "Hi there"
+    assert extract_body(payload, max_bytes=markup.index(b"</b>") + 2) == "Hi there"  # half a tag
+    assert extract_body(payload, max_bytes=len(markup)) == "Hi there\nafter"
+
+    styled = b"<style>p{}</style><p>Body</p><style>.x { color: red"
+    assert extract_body(_part("text/html", styled), max_bytes=len(styled)) == "Body"
@@ -0,0 +1,139 @@
+# tests/test_revocation.py
+
+import threading
+import time
+import pytest
+from hushh_mcp.consent.revocation import (
+    MemoryRevocationStore,
+    LogRevocationStore,
+    SQLiteRevocationStore,
+    BloomRevocationStore,
+    create_revocation_store
+)
+from hushh_mcp.consent.token import issue_token, validate_token, revoke_token, set_revocation_store
+from hushh_mcp.constants import ConsentScope
+
+
+def _future(ms: int = 60_000) -> int:
+    return int(time.time() * 1000) + ms
+
+
+def _past(ms: int = 1000) -> int:
+    return int(time.time() * 1000) - ms
+
+
+@pytest.fixture(params=["memory", "log", "sqlite"])
+def store(request, tmp_path):
+    path = str(tmp_path / f"revoked.{request.param}")
+    s = create_revocation_store(request.param, path)
+    yield s
+    s.close()
+
+
+def test_revoke_and_lookup(store):
+    store.revoke("HCT:token-a", _future())
+    assert store.is_revoked("HCT:token-a") is True
+    assert "HCT:token-b" not in store
+
+
+def test_expired_entries_are_garbage_collected(store):
+    store.revoke("HCT:old", _past())
+    store.revoke("HCT:live", _future())
+
+    assert store.is_revoked("HCT:old") is False
+    assert store.purge_expired() == 1
+    assert len(list(store.live_keys())) == 1
+
+
+def test_log_store_persists_and_compacts(tmp_path):
+    path = str(tmp_path / "revoked.log")
+    first = LogRevocationStore(path)
+    first.revoke("HCT:keep", _future())
+    for i in range(10):
+        first.revoke(f"HCT:gone-{i}", _past())
+
+    # A second worker sees the same log
+    second = LogRevocationStore(path)
+    assert second.is_revoked("HCT:keep") is True
+
+    first.purge_expired()
+    with open(path) as f:
+        assert len(f.read().splitlines()) == 1
+
+    # ...and notices the compaction
+    second.revoke("HCT:later", _future())
+    assert first.is_revoked("HCT:later") is True
+    assert second.is_revoked("HCT:keep") is True
+
+
+def test_sqlite_store_shared_between_instances(tmp_path):
+    path = str(tmp_path / "revoked.sqlite3")
+    a = SQLiteRevocationStore(path)
+    b = SQLiteRevocationStore(path)
+    a.revoke("HCT:shared", _future())
+    assert b.is_revoked("HCT:shared") is True
+    assert b.poll()
+    a.close()
+    b.close()
+
+
+def test_bloom_front_skips_backend_for_unknown_tokens():
+    backend = MemoryRevocationStore()
+    lookups = []
+    original = backend._lookup
+    backend._lookup = lambda key: lookups.append(key) or original(key)
+
+    bloom = BloomRevocationStore(backend, capacity=1000)
+    bloom.revoke("HCT:revoked", _future())
+
+    assert bloom.is_revoked("HCT:revoked") is True
+    misses = sum(bloom.is_revoked(f"HCT:other-{i}") for i in range(200))
+    assert misses == 0
+    assert len(lookups) < 10
+
+
+def test_revocation_during_bloom_rebuild_is_kept():
+    backend = MemoryRevocationStore()
+    bloom = BloomRevocationStore(backend, capacity=1000)
+    bloom.revoke("HCT:before", _future())
+
+    snapshot = backend.live_keys
+    revoker = threading.Thread(target=lambda: bloom.revoke("HCT:during", _future()))
+
+    def slow_live_keys():
+        keys = list(snapshot())
+        revoker.start()
+        time.sleep(0.05)  # the revoke lands after the snapshot, before the new filter is swapped in
+        return iter(keys)
+    backend.live_keys = slow_live_keys
+
+    bloom.purge_expired()
+    revoker.join()
+    assert bloom.is_revoked("HCT:before") is True
+    assert bloom.is_revoked("HCT:during") is True
+
+
+def test_bloom_front_picks_up_other_workers(tmp_path):
+    path = str(tmp_path / "revoked.sqlite3")
+    bloom = BloomRevocationStore(SQLiteRevocationStore(path), refresh_interval_ms=0)
+    other = SQLiteRevocationStore(path)
+
+    other.revoke("HCT:elsewhere", _future())
+    assert bloom.is_revoked("HCT:elsewhere") is True
+    bloom.close()
+    other.close()
+
+
+def test_token_module_uses_configured_store(tmp_path):
+    set_revocation_store(SQLiteRevocationStore(str(tmp_path / "revoked.sqlite3")))
+    try:
+        token = issue_token("user_rev", "agent_rev", ConsentScope.VAULT_READ_EMAIL)
+        revoke_token(token.token)
+
+        # Fresh store on the same file, as after a restart
+        set_revocation_store(SQLiteRevocationStore(str(tmp_path / "revoked.sqlite3")))
+        valid, reason, _ = validate_token(token.token, ConsentScope.VAULT_READ_EMAIL)
+        assert valid is False
+        assert reason == "Token has been revoked"
+    finally:
+        set_revocation_store(MemoryRevocationStore())
@@ -0,0 +1,63 @@
+# tests/test_schedule_analytics.py
+
+from datetime import timedelta
+
+from hushh_mcp.agents.schedule_agent.analytics import schedule_analysis, scheduling_patterns
+from hushh_mcp.agents.schedule_agent.event_store import normalize_event
+
+
+def _event(start, end):
+    return normalize_event({"id": start, "start": {"dateTime": start}, "end": {"dateTime": end}})
+
+
+def _day_of_meetings(count):
+    # Hour-long meetings every two hours from 2024-01-15 00:00 UTC
+    for i in range(count):
+        day, hour = divmod(2 * i, 24)
+        start = f"2024-01-{15 + day:02d}T{hour:02d}:00:00Z"
+        end = f"2024-01-{15 + day:02d}T{hour:02d}:59:00Z"
+        yield _event(start, end)
+
+
+def test_schedule_analysis_counts_every_event_and_gap():
+    analysis = schedule_analysis([
+        _event("2024-01-15T09:00:00Z", "2024-01-15T10:00:00Z"),
+        _event("2024-01-15T10:15:00Z", "2024-01-15T11:00:00Z"),  # 15 min gap: too short
+        _event("2024-01-15T13:00:00+02:00", "2024-01-15T14:30:00+02:00"),
+    ])
+    assert analysis["meeting_count"] == 3
+    assert analysis["total_duration"] == timedelta(minutes=60 + 45 + 90)
+    assert analysis["gap_count"] == 0
+
+    analysis = schedule_analysis([
+        _event("2024-01-15T09:00:00Z", "2024-01-15T10:00:00Z"),
+        _event("2024-01-15T13:00:00+02:00", "2024-01-15T14:00:00+02:00"),
+    ])
+    assert analysis["gaps"] == [
+        {"start": "2024-01-15T10:00:00+00:00", "end": "2024-01-15T13:00:00+02:00", "duration": 60.0}
+    ]
+
+
+def test_schedule_analysis_consumes_a_generator_and_caps_listed_gaps():
+    analysis = schedule_analysis(_day_of_meetings(12 * 12), max_gaps=5)
+    assert analysis["meeting_count"] == 12 * 12
+    assert analysis["gap_count"] == 12 * 12 - 1 and len(analysis["gaps"]) == 5
+
+
+def test_scheduling_patterns_skip_all_day_events():
+    events = [
+        _event("2024-01-15T10:00:00+05:30", "2024-01-15T10:30:00+05:30"),
+        _event("2024-01-16T10:00:00+05:30", "2024-01-16T11:30:00+05:30"),
+        _event("2024-01-16T15:00:00Z", "2024-01-16T16:00:00Z"),
+        normalize_event({"id": "holiday", "start": {"date": "2024-01-17"}, "end": {"date": "2024-01-18"}}),
+    ]
+    patterns = scheduling_patterns(iter(events))
+    assert patterns == {
+        "most_common_hour": 10,
+        "most_common_day": "Tuesday",
+        "avg_duration_minutes": 60,
+        "total_events": 4,
+        "hour_distribution": {10: 2, 15: 1},
+        "day_distribution": {"Monday": 1, "Tuesday": 2}
+    }
+    assert scheduling_patterns([])["most_common_hour"] == 9
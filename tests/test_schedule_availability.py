@@ -0,0 +1,80 @@
+# tests/test_schedule_availability.py
+
+import random
+from datetime import timedelta, timezone
+
+from hushh_mcp.agents.schedule_agent.availability import (
+    MINUTE_MS,
+    complement,
+    format_instant,
+    free_slots,
+    intersect,
+    merge_intervals,
+    overlaps_any,
+    parse_instant,
+    parse_intervals
+)
+
+H = 60 * MINUTE_MS
+
+
+def test_parse_instant_handles_z_offsets_naive_and_dates():
+    assert parse_instant("2024-01-15T10:00:00Z") == parse_instant("2024-01-15T15:30:00+05:30")
+    assert parse_instant("2024-01-15T10:00:00") == parse_instant("2024-01-15T10:00:00+00:00")
+    ist = timezone(timedelta(hours=5, minutes=30))
+    assert parse_instant("2024-01-15T15:30:00", ist) == parse_instant("2024-01-15T10:00:00Z")
+    assert parse_instant("2024-01-15") == parse_instant("2024-01-15T00:00:00Z")
+    assert format_instant(parse_instant("2024-01-15T10:00:00Z")) == "2024-01-15T10:00:00+00:00"
+
+
+def test_parse_intervals_drops_empty_ranges():
+    items = [
+        {"start": "2024-01-15T10:00:00Z", "end": "2024-01-15T11:00:00Z"},
+        {"start": "2024-01-15T12:00:00Z", "end": "2024-01-15T12:00:00Z"},
+        {"start": "2024-01-15T14:00:00Z", "end": "2024-01-15T13:00:00Z"},
+    ]
+    assert len(parse_intervals(items)) == 1
+
+
+def test_merge_complement_and_intersect():
+    assert merge_intervals([(5, 7), (1, 3), (2, 4), (4, 5), (9, 10)]) == [(1, 7), (9, 10)]
+    assert complement([(1, 7), (9, 10)], 0, 12) == [(0, 1), (7, 9), (10, 12)]
+    assert complement([(0, 20)], 5, 10) == []
+    assert intersect([(0, 5), (8, 12)], [(3, 9), (11, 20)]) == [(3, 5), (8, 9), (11, 12)]
+
+
+def test_overlaps_any_against_merged_intervals():
+    merged = [(1, 3), (5, 7)]
+    assert overlaps_any(merged, 2, 4) and overlaps_any(merged, 4, 6) and overlaps_any(merged, 0, 10)
+    assert not overlaps_any(merged, 3, 5) and not overlaps_any(merged, 7, 9) and not overlaps_any(merged, 0, 1)
+    assert not overlaps_any([], 0, 10)
+
+
+def test_free_slots_respect_grid_busy_and_preferred_windows():
+    busy = [(1 * H, 2 * H), (int(1.5 * H), int(2.5 * H))]
+    slots = free_slots(busy, 0, 4 * H, H)
+    # Busy 1:00-2:30 merged; slots start on the 30-minute grid
+    assert slots == [(0, H), (int(2.5 * H), int(3.5 * H)), (3 * H, 4 * H)]
+
+    preferred = [(int(2.25 * H), 4 * H)]
+    assert free_slots(busy, 0, 4 * H, H, preferred=preferred) == [(int(2.5 * H), int(3.5 * H)), (3 * H, 4 * H)]
+    assert free_slots(busy, 0, 4 * H, H, preferred=[]) == []
+
+
+def test_free_slots_match_brute_force_on_random_calendars():
+    rng = random.Random(11)
+    step, duration, end = 30 * MINUTE_MS, 45 * MINUTE_MS, 48 * H
+    for _ in range(25):
+        busy = []
+        for _ in range(rng.randint(0, 40)):
+            start = rng.randrange(0, end, 5 * MINUTE_MS)
+            busy.append((start, start + rng.randrange(5, 180, 5) * MINUTE_MS))
+        preferred = [(d * 24 * H + 9 * H, d * 24 * H + 17 * H) for d in range(2)]
+
+        expected = [
+            (s, s + duration) for s in range(0, end, step)
+            if s + duration <= end
+            and not any(s < b_end and s + duration > b_start for b_start, b_end in busy)
+            and any(s >= p_start and s + duration <= p_end for p_start, p_end in preferred)
+        ]
+        assert free_slots(busy, 0, end, duration, step, preferred) == expected
@@ -0,0 +1,141 @@
+# tests/test_schedule_bitmap.py
+
+import random
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from hushh_mcp.agents.schedule_agent import bitmap
+from hushh_mcp.agents.schedule_agent.availability import MINUTE_MS, parse_instant
+from hushh_mcp.agents.schedule_agent.bitmap import SlotGrid, find_group_slots, preference_weights
+
+H = 60 * MINUTE_MS
+MONDAY = parse_instant("2024-01-15T00:00:00Z")
+
+ENGINES = [False] + ([True] if bitmap.np is not None else [])
+
+
+@pytest.mark.parametrize("use_numpy", ENGINES)
+def test_intersects_busy_time_and_working_hours_across_timezones(use_numpy):
+    participants = [
+        {"busy": [(MONDAY + 9 * H, MONDAY + 11 * H)], "timezone": "UTC"},
+        # 14:00-22:00 UTC on weekdays
+        {"busy": [], "timezone": "America/New_York"},
+    ]
+    slots = find_group_slots(participants, MONDAY, 1, 60, max_results=50, use_numpy=use_numpy)
+    # UTC 9-17 and New York 9-17 (UTC 14-22) overlap at 14:00-17:00
+    assert [s["start"] for s in slots] == [
+        "2024-01-15T14:00:00+00:00", "2024-01-15T14:30:00+00:00", "2024-01-15T15:00:00+00:00",
+        "2024-01-15T15:30:00+00:00", "2024-01-15T16:00:00+00:00"
+    ]
+
+    participants[1]["busy"] = [(MONDAY + 14 * H + 10 * MINUTE_MS, MONDAY + 15 * H)]
+    slots = find_group_slots(participants, MONDAY, 1, 60, max_results=50, use_numpy=use_numpy)
+    assert slots[0]["start"] == "2024-01-15T15:00:00+00:00"
+
+
+@pytest.mark.parametrize("use_numpy", ENGINES)
+def test_weekends_and_no_working_hours(use_numpy):
+    saturday = parse_instant("2024-01-20T00:00:00Z")
+    assert find_group_slots([{"busy": []}], saturday, 2, 30, use_numpy=use_numpy) == []
+    anytime = find_group_slots([{"busy": [], "working_hours": None}], saturday, 2, 30, max_results=500, use_numpy=use_numpy)
+    assert len(anytime) == 2 * 48
+
+
+@pytest.mark.parametrize("use_numpy", ENGINES)
+def test_candidates_are_ranked_by_preferred_hours_and_days(use_numpy):
+    preferences = {"hour_distribution": {"15": 4, "10": 1}, "day_distribution": {"Wednesday": 3}}
+    slots = find_group_slots([{"busy": []}], MONDAY, 5, 60, preferences=preferences, max_results=3,
+                             use_numpy=use_numpy)
+    assert [s["start"] for s in slots] == [
+        "2024-01-17T15:00:00+00:00",  # Wednesday, 15h
+        "2024-01-17T15:30:00+00:00",
+        "2024-01-15T15:00:00+00:00",  # the earliest 15h on another day
+    ]
+    assert slots[0]["score"] >= slots[1]["score"] > slots[2]["score"]
+
+    # Preferences are read in the user's timezone
+    local = find_group_slots([{"busy": [], "working_hours": None}], MONDAY, 1, 60, preferences=preferences,
+                             timezone_name="Asia/Kolkata", max_results=1, use_numpy=use_numpy)
+    assert local[0]["start"] == "2024-01-15T15:00:00+05:30"
+
+
+def test_preference_weights_normalize_distributions():
+    hours, days = preference_weights({"hour_distribution": {9: 2, 10: 4}, "day_distribution": {"Friday": 5}})
+    assert hours[10] == 1.0 and hours[9] == 0.5 and days[4] == 1.0
+    assert preference_weights(None) == ([0.0] * 24, [0.0] * 7)
+
+
+def test_working_hours_follow_daylight_saving():
+    grid = SlotGrid(parse_instant("2024-03-08T00:00:00Z"), 4)
+    intervals = grid.working_intervals(bitmap.resolve_timezone("America/New_York"), (9, 17), range(7))
+    starts = {datetime.fromtimestamp(s / 1000, timezone.utc).strftime("%m-%d %H") for s, _ in intervals}
+    assert {"03-08 14", "03-09 14", "03-10 13", "03-11 13"} <= starts  # clocks moved forward on 2024-03-10
+
+
+def _random_team(rng, size, days):
+    team = []
+    zones = ["UTC", "Europe/Berlin", "America/New_York", "Asia/Kolkata"]
+    for _ in range(size):
+        busy = []
+        for _ in range(rng.randint(20, 80)):
+            start = MONDAY + rng.randrange(0, days * 24 * 4) * 15 * MINUTE_MS
+            busy.append((start, start + rng.choice([15, 30, 60, 90]) * MINUTE_MS))
+        team.append({"busy": busy, "timezone": rng.choice(zones), "working_hours": (7, 20)})
+    return team
+
+
+@pytest.mark.skipif(bitmap.np is None, reason="NumPy not installed")
+def test_numpy_and_bitset_engines_agree():
+    rng = random.Random(4)
+    preferences = {"hour_distribution": {h: rng.randint(0, 5) for h in range(24)}, "day_distribution": {"Tuesday": 2}}
+    for _ in range(5):
+        team = _random_team(rng, 6, 14)
+        kwargs = dict(preferences=preferences, timezone_name="Europe/Berlin", max_results=40)
+        assert (find_group_slots(team, MONDAY, 14, 45, use_numpy=True, **kwargs)
+                == find_group_slots(team, MONDAY, 14, 45, use_numpy=False, **kwargs))
+
+
+def test_fifty_participants_over_thirty_days_is_fast():
+    team = _random_team(random.Random(9), 50, 30)
+    for participant in team:
+        participant["busy"] = participant["busy"][:10]
+    started = time.perf_counter()
+    find_group_slots(team, MONDAY, 30, 30)
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.mark.parametrize("use_numpy", ENGINES)
+def test_invalid_durations_and_empty_teams_are_rejected(use_numpy):
+    for kwargs in ({"duration_minutes": 0}, {"duration_minutes": -30}, {"duration_minutes": 30, "step_minutes": 0},
+                   {"duration_minutes": 30, "slot_minutes": 0}):
+        with pytest.raises(ValueError):
+            find_group_slots([{"busy": []}], MONDAY, 1, use_numpy=use_numpy, **kwargs)
+    with pytest.raises(ValueError):
+        find_group_slots([], MONDAY, 1, 30, use_numpy=use_numpy)
+
+
+def test_agent_returns_400_and_keeps_requester_working_hours():
+    import asyncio
+    import logging
+    from hushh_mcp.agents.schedule_agent.index import ScheduleAgent
+
+    class _Request:
+        def __init__(self, body):
+            self.body = body
+
+        async def json(self):
+            return self.body
+
+    agent = ScheduleAgent.__new__(ScheduleAgent)
+    agent.logger = logging.getLogger("test")
+    for duration in (0, -15, "soon"):
+        response = asyncio.run(agent.suggest_meeting_time(_Request({"duration": duration, "engine": "bitmap"})))
+        assert response.status_code == 400
+
+    # No other participants: slots still follow the requester's own working hours
+    slots = asyncio.run(agent._suggest_group_times(
+        {"duration": 60, "preferences": {}, "max_results": 100}, "u1", [], {}, MONDAY, 2
+    ))["available_times"]
+    assert slots and all("09:00" <= s["start"][11:16] <= "16:00" for s in slots)
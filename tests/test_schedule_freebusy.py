@@ -0,0 +1,83 @@
+# tests/test_schedule_freebusy.py
+
+from datetime import datetime, timezone
+
+from hushh_mcp.agents.schedule_agent.freebusy import FREEBUSY_MAX_ITEMS, FreeBusyCache, default_window
+
+WINDOW = ("2024-01-15T09:00:00+00:00", "2024-01-22T09:00:00+00:00")
+
+
+class FakeCalendarService:
+    """Answers freebusy queries; calendars named 'missing*' come back with errors."""
+
+    def __init__(self):
+        self.bodies = []
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.bodies.append(body)
+        calendars = {}
+        for item in body["items"]:
+            if item["id"].startswith("missing"):
+                calendars[item["id"]] = {"busy": [], "errors": [{"domain": "global", "reason": "notFound"}]}
+            else:
+                calendars[item["id"]] = {"busy": [{"start": body["timeMin"], "end": body["timeMin"]}]}
+        self._response = {"calendars": calendars}
+        return self
+
+    def execute(self):
+        return self._response
+
+
+def test_calendars_are_fetched_in_batches_up_to_the_api_limit():
+    service, cache = FakeCalendarService(), FreeBusyCache()
+    ids = [f"user{n}@example.com" for n in range(120)]
+    result = cache.query(service, "u1", ids + ids[:5], *WINDOW)
+    assert list(result) == ids
+    assert [len(b["items"]) for b in service.bodies] == [FREEBUSY_MAX_ITEMS, FREEBUSY_MAX_ITEMS, 20]
+
+
+def test_cached_windows_are_reused_and_only_misses_are_queried():
+    service, cache = FakeCalendarService(), FreeBusyCache()
+    cache.query(service, "u1", ["a", "b"], *WINDOW)
+    assert cache.query(service, "u1", ["b", "a", "c"], *WINDOW).keys() == {"a", "b", "c"}
+    assert [[i["id"] for i in b["items"]] for b in service.bodies] == [["a", "b"], ["c"]]
+
+    # Another window or another user is a separate entry
+    cache.query(service, "u1", ["a"], WINDOW[0], "2024-01-16T09:00:00+00:00")
+    cache.query(service, "u2", ["a"], *WINDOW)
+    assert len(service.bodies) == 4
+    assert cache.stats()["queries"] == 4
+
+
+def test_errors_are_not_cached_and_invalidation_forces_a_refetch():
+    service, cache = FakeCalendarService(), FreeBusyCache()
+    assert cache.query(service, "u1", ["missing-room"], *WINDOW)["missing-room"]["errors"]
+    cache.query(service, "u1", ["missing-room"], *WINDOW)
+    assert len(service.bodies) == 2
+
+    cache.query(service, "u1", ["a"], *WINDOW)
+    cache.query(service, "u2", ["a"], *WINDOW)
+    cache.invalidate("u1")
+    cache.query(service, "u1", ["a"], *WINDOW)
+    cache.query(service, "u2", ["a"], *WINDOW)
+    assert len(service.bodies) == 5
+
+    cache.invalidate()
+    cache.query(service, "u2", ["a"], *WINDOW)
+    assert len(service.bodies) == 6
+
+
+def test_zero_ttl_always_queries():
+    service, cache = FakeCalendarService(), FreeBusyCache(ttl_ms=0)
+    cache.query(service, "u1", ["a"], *WINDOW)
+    cache.query(service, "u1", ["a"], *WINDOW)
+    assert len(service.bodies) == 2
+
+
+def test_default_window_is_stable_within_the_hour():
+    early = default_window(7, datetime(2024, 1, 15, 9, 1, tzinfo=timezone.utc))
+    late = default_window(7, datetime(2024, 1, 15, 9, 59, 30, tzinfo=timezone.utc))
+    assert early == late == WINDOW
@@ -2,9 +2,11 @@
 
 import pytest
 import time
+from hushh_mcp.consent import token as token_module
 from hushh_mcp.consent.token import (
     issue_token,
     validate_token,
+    validate_tokens_batch,
     revoke_token,
     is_token_revoked
 )
@@ -59,3 +61,76 @@ def test_signature_tampering():
     valid, reason, _ = validate_token(tampered, VALID_SCOPE)
     assert valid is False
     assert "Malformed token" in reason or "Invalid token prefix" in reason
+
+
+def test_validate_tokens_batch():
+    # Tokens issued in the same millisecond with identical claims are identical strings,
+    # so use an agent no revocation test touches.
+    good = issue_token(USER_ID, "agent_batch", VALID_SCOPE).token
+    expired = issue_token(USER_ID, "agent_batch", VALID_SCOPE, expires_in_ms=-1000).token
+
+    results = validate_tokens_batch([good, expired, "garbage", good], VALID_SCOPE)
+    assert [valid for valid, _, _ in results] == [True, False, False, True]
+    assert results[1][1] == "Token expired"
+    assert results[3][2].user_id == USER_ID
+
+
+def test_verified_token_cache_skips_resigning(monkeypatch):
+    token_obj = issue_token(USER_ID, AGENT_ID, VALID_SCOPE)
+    calls = []
+    original_mac = token_module._mac
+    monkeypatch.setattr(token_module, "_mac", lambda data: calls.append(data) or original_mac(data))
+
+    for _ in range(5):
+        valid, _, _ = validate_token(token_obj.token, VALID_SCOPE)
+        assert valid is True
+    assert len(calls) <= 1
+
+    # Cached entries still honour the scope check
+    valid, reason, _ = validate_token(token_obj.token, ConsentScope.VAULT_READ_PHONE)
+    assert valid is False
+    assert reason == "Scope mismatch"
+
+
+def test_revocation_evicts_cached_token():
+    token_obj = issue_token(USER_ID, "agent_evict", VALID_SCOPE)
+    assert validate_token(token_obj.token, VALID_SCOPE)[0] is True
+
+    revoke_token(token_obj.token)
+    assert token_obj.token not in token_module._verified_tokens
+
+    valid, reason, _ = validate_token(token_obj.token, VALID_SCOPE)
+    assert valid is False
+    assert reason == "Token has been revoked"
+
+
+def test_v1_tokens_still_validate():
+    token_obj = issue_token(USER_ID, AGENT_ID, VALID_SCOPE, version=1)
+    assert "." in token_obj.token
+
+    valid, reason, parsed = validate_token(token_obj.token, VALID_SCOPE)
+    assert valid is True
+    assert parsed.expires_at == token_obj.expires_at
+
+
+def test_v2_token_is_compact_and_roundtrips():
+    v1 = issue_token(USER_ID, AGENT_ID, VALID_SCOPE, version=1)
+    v2 = issue_token(USER_ID, AGENT_ID, VALID_SCOPE, version=2)
+    assert v2.token.startswith("HCT:")
+    assert len(v2.token) < len(v1.token) / 2
+
+    valid, _, parsed = validate_token(v2.token, VALID_SCOPE)
+    assert valid is True
+    assert parsed.agent_id == AGENT_ID
+    assert parsed.issued_at == v2.issued_at
+    assert parsed.expires_at == v2.expires_at
+
+
+def test_v2_signature_tampering():
+    token_obj = issue_token(USER_ID, "agent_beta", VALID_SCOPE, version=2)
+    body = token_obj.token[len("HCT:"):]
+    flipped = body[:10] + ("A" if body[10] != "A" else "B") + body[11:]
+
+    valid, reason, _ = validate_token("HCT:" + flipped, VALID_SCOPE)
+    assert valid is False
+    assert reason == "Invalid signature" or "Malformed token" in reason
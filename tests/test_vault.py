@@ -3,7 +3,26 @@
 import pytest
 import json
 import base64
-from hushh_mcp.vault.encrypt import encrypt_data, decrypt_data
+import io
+import hashlib
+import os
+import struct
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from hushh_mcp.vault.encrypt import (
+    encrypt_data,
+    decrypt_data,
+    encrypt_many,
+    decrypt_many,
+    encrypt_bytes,
+    decrypt_bytes,
+    pack_payload,
+    unpack_payload,
+    seal_record,
+    open_record,
+    encrypt_stream,
+    decrypt_stream,
+    STREAM_MAX_CHUNK_SIZE
+)
 from hushh_mcp.config import VAULT_ENCRYPTION_KEY
 from hushh_mcp.types import EncryptedPayload
 
@@ -47,3 +66,100 @@ def test_decryption_fails_with_tampered_data():
 
     with pytest.raises(Exception, match="Decryption failed"):
         decrypt_data(corrupted, VAULT_ENCRYPTION_KEY)
+
+
+def test_encrypt_many_decrypt_many_with_passphrase_key():
+    key = "default-key-change-in-production"  # not hex: derived via SHA-256
+    records = [json.dumps({"user": i}) for i in range(20)]
+
+    payloads = encrypt_many(records, key)
+    assert len({p.iv for p in payloads}) == len(records)
+    assert decrypt_many(payloads, key) == records
+    assert decrypt_data(payloads[3], key) == records[3]
+
+
+def test_decrypts_payloads_written_by_legacy_cipher_path():
+    iv = os.urandom(12)
+    key = hashlib.sha256(b"legacy-master-key").digest()
+    encryptor = Cipher(algorithms.AES(key), modes.GCM(iv)).encryptor()
+    ciphertext = encryptor.update(b"stored credentials") + encryptor.finalize()
+
+    legacy = EncryptedPayload(
+        ciphertext=base64.b64encode(ciphertext).decode(),
+        iv=base64.b64encode(iv).decode(),
+        tag=base64.b64encode(encryptor.tag).decode(),
+        encoding="base64",
+        algorithm="aes-256-gcm"
+    )
+    assert decrypt_data(legacy, "legacy-master-key") == "stored credentials"
+
+
+def test_compact_payload_roundtrip_and_conversion():
+    blob = encrypt_bytes(b"compact record", VAULT_ENCRYPTION_KEY)
+    assert len(blob) == 12 + len(b"compact record") + 16
+
+    # Decrypt straight out of a larger buffer without slicing copies
+    buffer = bytearray(b"xx" + blob)
+    assert decrypt_bytes(memoryview(buffer)[2:], VAULT_ENCRYPTION_KEY) == b"compact record"
+
+    as_json = unpack_payload(blob)
+    assert decrypt_data(as_json, VAULT_ENCRYPTION_KEY) == "compact record"
+    assert pack_payload(as_json) == blob
+
+
+def test_seal_record_switch_reads_both_forms():
+    compact = seal_record("creds", VAULT_ENCRYPTION_KEY, compact=True)
+    legacy = seal_record("creds", VAULT_ENCRYPTION_KEY, compact=False)
+    assert isinstance(compact, bytes)
+    assert isinstance(legacy, EncryptedPayload)
+    assert open_record(compact, VAULT_ENCRYPTION_KEY) == open_record(legacy, VAULT_ENCRYPTION_KEY) == "creds"
+
+
+def _stream_roundtrip(data: bytes, chunk_size: int = 64) -> bytes:
+    sealed = io.BytesIO()
+    assert encrypt_stream(io.BytesIO(data), sealed, VAULT_ENCRYPTION_KEY, chunk_size=chunk_size) == len(data)
+    return sealed.getvalue()
+
+
+@pytest.mark.parametrize("size", [0, 1, 64, 65, 1000])
+def test_stream_roundtrip(size):
+    data = bytes(range(256)) * 4
+    data = data[:size]
+    sealed = _stream_roundtrip(data)
+
+    out = io.BytesIO()
+    assert decrypt_stream(io.BytesIO(sealed), out, VAULT_ENCRYPTION_KEY) == size
+    assert out.getvalue() == data
+
+
+def test_stream_detects_tampering_and_truncation():
+    sealed = _stream_roundtrip(b"mailbox dump " * 50)
+
+    tampered = bytearray(sealed)
+    tampered[40] ^= 0x01
+    with pytest.raises(ValueError, match="Invalid authentication tag"):
+        decrypt_stream(io.BytesIO(bytes(tampered)), io.BytesIO(), VAULT_ENCRYPTION_KEY)
+
+    # Dropping the final segment must not silently yield a shorter plaintext
+    segment = 5 + 64 + 16
+    with pytest.raises(RuntimeError, match="truncated"):
+        decrypt_stream(io.BytesIO(sealed[:15 + segment]), io.BytesIO(), VAULT_ENCRYPTION_KEY)
+
+
+def test_stream_detects_reordered_segments():
+    sealed = _stream_roundtrip(b"A" * 64 + b"B" * 64 + b"C" * 10)
+    segment = 5 + 64 + 16
+    header, first, second, rest = sealed[:15], sealed[15:15 + segment], sealed[15 + segment:15 + 2 * segment], sealed[15 + 2 * segment:]
+
+    with pytest.raises(ValueError, match="Invalid authentication tag"):
+        decrypt_stream(io.BytesIO(header + second + first + rest), io.BytesIO(), VAULT_ENCRYPTION_KEY)
+
+
+def test_stream_rejects_unauthenticated_chunk_sizes():
+    sealed = _stream_roundtrip(b"x" * 100)
+    for chunk_size in (0, STREAM_MAX_CHUNK_SIZE + 1, 0xFFFFFFFF):
+        forged = sealed[:4] + struct.pack(">I", chunk_size) + sealed[8:]
+        with pytest.raises(RuntimeError, match="not a vault stream"):
+            decrypt_stream(io.BytesIO(forged), io.BytesIO(), VAULT_ENCRYPTION_KEY)
+    with pytest.raises(RuntimeError, match="chunk_size"):
+        encrypt_stream(io.BytesIO(b"x"), io.BytesIO(), VAULT_ENCRYPTION_KEY, chunk_size=STREAM_MAX_CHUNK_SIZE + 1)
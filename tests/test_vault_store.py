@@ -0,0 +1,52 @@
+# tests/test_vault_store.py
+
+import pickle
+from hushh_mcp.vault.encrypt import seal_record, open_record
+from hushh_mcp.vault.store import CredentialStore
+from hushh_mcp.config import VAULT_ENCRYPTION_KEY
+
+
+def test_store_roundtrips_both_record_forms(tmp_path):
+    store = CredentialStore(str(tmp_path / "tokens.sqlite3"))
+    store["alice"] = seal_record('{"token": "a"}', VAULT_ENCRYPTION_KEY, compact=True)
+    store["bob"] = seal_record('{"token": "b"}', VAULT_ENCRYPTION_KEY, compact=False)
+
+    assert "alice" in store and "carol" not in store
+    assert open_record(store["alice"], VAULT_ENCRYPTION_KEY) == '{"token": "a"}'
+    assert open_record(store["bob"], VAULT_ENCRYPTION_KEY) == '{"token": "b"}'
+    assert sorted(store.keys()) == ["alice", "bob"]
+    assert store.get("carol") is None
+    store.close()
+
+
+def test_upsert_bumps_version_and_is_visible_to_other_instances(tmp_path):
+    path = str(tmp_path / "tokens.sqlite3")
+    a = CredentialStore(path)
+    b = CredentialStore(path)
+
+    assert a.put("alice", b"v1") == 1
+    assert a.put("alice", b"v2") == 2
+    assert b.get_versioned("alice") == (b"v2", 2)
+    assert len(b) == 1
+
+    del b["alice"]
+    assert a.version("alice") is None
+    a.close()
+    b.close()
+
+
+def test_legacy_pickle_is_imported_once(tmp_path):
+    legacy_path = tmp_path / "user_tokens_inbox.pkl"
+    legacy = {"alice": seal_record("creds", VAULT_ENCRYPTION_KEY, compact=False)}
+    legacy_path.write_bytes(pickle.dumps(legacy))
+
+    db_path = str(tmp_path / "tokens.sqlite3")
+    store = CredentialStore(db_path, legacy_pickle_path=str(legacy_path))
+    assert open_record(store["alice"], VAULT_ENCRYPTION_KEY) == "creds"
+    store["alice"] = b"newer"
+    store.close()
+
+    # Reopening must not clobber newer rows with the stale pickle
+    store = CredentialStore(db_path, legacy_pickle_path=str(legacy_path))
+    assert store["alice"] == b"newer"
+    store.close()